@@ -0,0 +1,281 @@
+import numpy as np
+
+from Source.Layers import LayerStack, blend
+from Source.Tiles import TiledImage
+from Source.Transform import transform_image
+from Source.Transforms import Transforms
+
+# How long a frame is shown by default, in milliseconds
+FRAME_DURATION = 100
+
+# The opacity of the previous and next frames shown under the current one
+ONION_OPACITY = 0.3
+
+
+class Frame:
+    """
+    This class is a frame of the animation, its layers and how long it is shown.
+    The layers of a frame can be made only when they are first needed, like the frames of an opened animation.
+    """
+
+    def __init__(self, layers: LayerStack = None, duration: int = FRAME_DURATION, loader=None):
+        """
+        Class constructor.
+
+        :param layers: the layers of the frame, None if they are made by the loader
+        :param duration: how long the frame is shown, in milliseconds
+        :param loader: the function that makes the layers, called once
+        """
+
+        self.loaded_layers = layers
+        self.duration = duration
+        self.loader = loader
+
+    @property
+    def loaded(self) -> bool:
+        """
+        Function used to know if the layers of the frame were already made.
+
+        :return: self explanatory
+        """
+
+        return self.loaded_layers is not None
+
+    @property
+    def layers(self) -> LayerStack:
+        """
+        Function used to get the layers of the frame, they are made the first time.
+
+        :return: the layer stack
+        """
+
+        if self.loaded_layers is None:
+            self.loaded_layers = self.loader()
+            self.loader = None
+
+        return self.loaded_layers
+
+
+class Animation:
+    """
+    This class holds the frames of the drawing, every frame has its own layers and only the current one is drawn on.
+    A copied frame shares the tiles of the frame it was copied from, so identical frames don't use more memory.
+    The previous and next frames can be shown faded under the current one, their blend is kept until one of them
+    changes.
+    """
+
+    def __init__(self, layers: LayerStack, duration: int = FRAME_DURATION):
+        """
+        Class constructor.
+
+        :param layers: the layers of the first frame
+        :param duration: how long the first frame is shown, in milliseconds
+        """
+
+        self.frames = [Frame(layers, duration)]
+        self.current = 0
+
+        # Show the previous and next frames under the current one
+        self.onion_skin = False
+
+        # The blend of the previous and next frames and the versions of the layers it was made from
+        self.onion = None
+        self.onion_key = None
+
+    @property
+    def layers(self) -> LayerStack:
+        """
+        Function used to get the layers of the current frame, the ones that are drawn on.
+
+        :return: the layer stack
+        """
+
+        return self.frames[self.current].layers
+
+    def stacks(self) -> list:
+        """
+        Function used to get the layers of every frame, the frames that weren't loaded yet are loaded.
+
+        :return: a list of layer stacks, from the first frame
+        """
+
+        return [frame.layers for frame in self.frames]
+
+    def append_frame(self, loader, duration: int = FRAME_DURATION) -> None:
+        """
+        Function used to add a frame at the end whose layers are made only when they are first needed.
+
+        :param loader: the function that makes the layers of the frame
+        :param duration: how long the frame is shown, in milliseconds
+        :return: None
+        """
+
+        self.frames.append(Frame(None, duration, loader))
+
+    def add_frame(self, copy: bool = True) -> None:
+        """
+        Function used to add a frame after the current one, the new frame becomes the current one.
+
+        :param copy: start from the pixels of the current frame, they are shared until they are changed
+        :return: None
+        """
+
+        frame = self.frames[self.current]
+
+        self.current += 1
+        self.frames.insert(self.current, Frame(frame.layers.duplicate(not copy), frame.duration))
+
+    def remove_frame(self, index: int) -> None:
+        """
+        Function used to delete a frame, the last frame can't be deleted.
+
+        :param index: the index of the frame
+        :return: None
+        """
+
+        if len(self.frames) == 1:
+            return
+
+        del self.frames[index]
+
+        if self.current > index or self.current == len(self.frames):
+            self.current -= 1
+
+    def move_frame(self, index: int, offset: int) -> None:
+        """
+        Function used to move a frame earlier or later in the animation.
+
+        :param index: the index of the frame
+        :param offset: -1 to move it earlier, +1 to move it later
+        :return: None
+        """
+
+        target = index + offset
+
+        if not 0 <= target < len(self.frames):
+            return
+
+        self.frames[index], self.frames[target] = self.frames[target], self.frames[index]
+
+        # The current frame follows its position
+        if self.current == index:
+            self.current = target
+        elif self.current == target:
+            self.current = index
+
+    def set_current(self, index: int) -> None:
+        """
+        Function used to change the frame that is shown and drawn on.
+
+        :param index: the index of the frame
+        :return: None
+        """
+
+        if 0 <= index < len(self.frames):
+            self.current = index
+
+    def neighbours(self) -> list:
+        """
+        Function used to get the layers of the frames before and after the current one.
+
+        :return: a list of up to two layer stacks
+        """
+
+        return [self.frames[index].layers for index in (self.current - 1, self.current + 1)
+                if 0 <= index < len(self.frames)]
+
+    def onion_image(self):
+        """
+        Function used to get the previous and next frames blended together and faded.
+        The blend is made again only if one of these frames changed since the last time.
+
+        :return: the tiled image or None if the onion skin is off or there is no other frame
+        """
+
+        if not self.onion_skin:
+            return None
+
+        neighbours = self.neighbours()
+        if not neighbours:
+            return None
+
+        key = [(stack, stack.version) for stack in neighbours]
+
+        if key != self.onion_key:
+            self.onion = self.blend_frames(neighbours)
+            self.onion_key = key
+
+        return self.onion
+
+    @staticmethod
+    def blend_frames(stacks: list) -> TiledImage:
+        """
+        Function used to fade the composites of some frames and blend them, only their allocated tiles.
+
+        :param stacks: the layer stacks of the frames
+        :return: the tiled image
+        """
+
+        image = TiledImage(stacks[0].width, stacks[0].height)
+
+        keys = set()
+        for stack in stacks:
+            keys.update(stack.composite.tiles)
+
+        for key in keys:
+            x, y, width, height = image.tile_bounds(*key)
+
+            pixels = np.zeros((height, width, 4), np.uint8)
+            for stack in stacks:
+                pixels = blend(pixels, stack.composite.read(x, y, width, height), opacity=ONION_OPACITY)
+
+            image.write(x, y, pixels)
+
+        return image
+
+    def transform(self, transform: Transforms, arguments: tuple, bases: dict = None) -> None:
+        """
+        Function used to flip, rotate, shift or resize every layer of every frame.
+        The layers with the same pixels, like the ones of copied frames, are changed once and share the result.
+
+        :param transform: the transform
+        :param arguments: the arguments of the transform
+        :param bases: the images a resize pastes the pixels of some layers into, by layer
+        :return: None
+        """
+
+        bases = bases or {}
+        results = {}
+
+        def transformed(layer) -> TiledImage:
+            # A layer with its own base doesn't give the same result as the others
+            contents = layer.image.contents() if layer not in bases else None
+
+            if contents is None:
+                return transform_image(layer.image, transform, arguments, bases.get(layer))
+
+            if contents in results:
+                return results[contents].share()
+
+            results[contents] = transform_image(layer.image, transform, arguments)
+
+            return results[contents]
+
+        for stack in self.stacks():
+            stack.transform(transformed)
+
+    def set_palette_color(self, index: int, color: tuple) -> None:
+        """
+        Function used to change a color of the palette shared by the frames, every loaded frame is blended again.
+        The other frames are blended with the new color when they are loaded.
+
+        :param index: the index of the entry
+        :param color: the (r, g, b, a) new color
+        :return: None
+        """
+
+        self.layers.set_palette_color(index, color)
+
+        for frame in self.frames:
+            if frame.loaded and frame.layers is not self.layers:
+                frame.layers.rebuild()
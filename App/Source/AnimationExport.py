@@ -0,0 +1,251 @@
+import os
+
+import numpy as np
+
+from Source.Export import BAND_BYTES, PALETTE_COLORS, binary_alpha, image_palette, indexed_bands
+from Source.Gif import DISPOSE_CLEAR, DISPOSE_KEEP, write_gif
+from Source.Png import COMPRESSION_LEVEL, write_apng
+from Source.PngFilters import PngFilters
+from Source.Quantize import ALPHA_THRESHOLD, quantize
+from Source.Quantizers import Quantizers
+from Source.Scale import as_words
+from Source.Tiles import TiledImage
+
+# The longest a frame can be shown, in milliseconds, the delay of an animated PNG frame is a 16 bit number
+MAX_FRAME_DURATION = 65535
+
+
+def union_box(box, other):
+    """
+    Function used to find the smallest box around two boxes.
+
+    :param box: (left, top, right, bottom) or None
+    :param other: (left, top, right, bottom) or None
+    :return: (left, top, right, bottom) or None if both are None
+    """
+
+    if box is None or other is None:
+        return box or other
+
+    return min(box[0], other[0]), min(box[1], other[1]), max(box[2], other[2]), max(box[3], other[3])
+
+
+def mask_box(mask: np.ndarray, x: int, y: int):
+    """
+    Function used to find the box around the true values of a mask.
+
+    :param mask: a boolean array with the shape (height, width)
+    :param x: the left of the mask in the image
+    :param y: the top of the mask in the image
+    :return: (left, top, right, bottom) in the image or None if nothing is true
+    """
+
+    columns = np.flatnonzero(mask.any(axis=0))
+    if not len(columns):
+        return None
+
+    rows = np.flatnonzero(mask.any(axis=1))
+
+    return x + columns[0], y + rows[0], x + columns[-1] + 1, y + rows[-1] + 1
+
+
+def compare_frames(previous: TiledImage, image: TiledImage) -> tuple:
+    """
+    Function used to find what changed between two frames, tile by tile.
+    The tiles that are missing in both frames, or that are the same tile, are not even read.
+
+    :param previous: the frame shown before
+    :param image: the frame shown after
+    :return: (changed, cleared) the boxes around the pixels that changed and around the visible pixels that
+    became transparent, as (left, top, right, bottom) or None
+    """
+
+    changed = cleared = None
+
+    for key in set(previous.tiles) | set(image.tiles):
+        if previous.tiles.get(key) is image.tiles.get(key):
+            continue
+
+        x, y, width, height = image.tile_bounds(*key)
+        before = previous.read(x, y, width, height)
+        after = image.read(x, y, width, height)
+
+        changed = union_box(changed, mask_box(as_words(before) != as_words(after), x, y))
+        cleared = union_box(cleared, mask_box((before[..., 3] >= ALPHA_THRESHOLD) &
+                                              (after[..., 3] < ALPHA_THRESHOLD), x, y))
+
+    return changed, cleared
+
+
+def frame_boxes(frames, whole_first: bool = False, clear: bool = False):
+    """
+    Function used to find the rectangle every frame has to cover, around what changed since the previous frame.
+    A frame the same as the previous one isn't kept, the previous frame is shown longer instead. A frame shown
+    longer than the delay of a frame can hold is repeated, the repeats cover a single pixel.
+    A frame is yielded once the next one is known, that's when it is known if its rectangle has to be cleared.
+
+    :param frames: an iterable of (image, duration) of every frame, the duration in milliseconds
+    :param whole_first: the first frame covers the whole image
+    :param clear: the pixels a frame makes transparent are cleared by clearing the rectangle of the previous frame,
+    which then covers them, else every frame replaces the transparent pixels of its rectangle too
+    :return: a generator of [image, (left, top, right, bottom), duration, cleared] of every frame, cleared is true
+    if its rectangle is cleared after it was shown
+    """
+
+    pending = None
+
+    for image, duration in frames:
+        if pending is None:
+            if whole_first:
+                changed = 0, 0, image.width, image.height
+            else:
+                changed, _ = compare_frames(TiledImage(image.width, image.height), image)
+                changed = changed or (0, 0, 1, 1)
+
+            pending = [image, changed, duration, False]
+            continue
+
+        changed, cleared = compare_frames(pending[0], image)
+
+        if changed is None:
+            pending[2] += duration
+            continue
+
+        if clear and cleared is not None:
+            pending[1] = union_box(pending[1], cleared)
+            pending[3] = True
+            changed = union_box(changed, pending[1])
+
+        yield from split_frame(*pending)
+
+        pending = [image, changed, duration, False]
+
+    if pending is not None:
+        yield from split_frame(*pending)
+
+
+def split_frame(image: TiledImage, box: tuple, duration: int, cleared: bool):
+    """
+    Function used to split a frame shown longer than MAX_FRAME_DURATION into repeats of the same image.
+    The first part covers the rectangle of the frame and the repeats a single pixel, which doesn't change, except
+    the last one when the rectangle is cleared after the frame, so the same rectangle is cleared.
+
+    :param image: the image of the frame
+    :param box: the (left, top, right, bottom) rectangle of the frame
+    :param duration: how long the frame is shown, in milliseconds
+    :param cleared: the rectangle is cleared after the frame was shown
+    :return: a generator of [image, (left, top, right, bottom), duration, cleared] of every part
+    """
+
+    parts = [MAX_FRAME_DURATION] * (duration // MAX_FRAME_DURATION)
+    if duration % MAX_FRAME_DURATION or not parts:
+        parts.append(duration % MAX_FRAME_DURATION)
+
+    for index, part in enumerate(parts):
+        last = index == len(parts) - 1
+        yield [image, box if index == 0 or (last and cleared) else (0, 0, 1, 1), part, cleared and last]
+
+
+def gif_frames(boxes, palette: np.ndarray = None):
+    """
+    Function used to turn the rectangles of the frames into palette indices, one frame at a time.
+    The pixels that didn't change since the previous frame become transparent, when that frame is kept under it,
+    so they compress to almost nothing.
+    Without a shared palette every frame gets its own, with its colors reduced to 255 if there are more.
+
+    :param boxes: the frames, as they come from frame_boxes with clear
+    :param palette: the colors shared by the frames, from image_palette for a GIF, or None
+    :return: a generator of (x, y, indices, palette, duration, disposal) of every frame
+    """
+
+    previous = None
+
+    for image, (left, top, right, bottom), duration, cleared in boxes:
+        pixels = binary_alpha(image.read(left, top, right - left, bottom - top))
+
+        if previous is not None:
+            unchanged = as_words(pixels) == as_words(binary_alpha(previous.read(left, top, right - left,
+                                                                                bottom - top)))
+            pixels[unchanged] = 0
+
+        if palette is None:
+            frame_palette = image_palette([pixels], PALETTE_COLORS, True)
+
+            if frame_palette is None:
+                pixels, _ = quantize(pixels, PALETTE_COLORS - 1, quantizer=Quantizers.MEDIAN_CUT)
+                frame_palette = image_palette([pixels], PALETTE_COLORS, True)
+        else:
+            frame_palette = None
+
+        indices = next(indexed_bands([pixels], palette if frame_palette is None else frame_palette))
+
+        yield left, top, indices, frame_palette, duration, DISPOSE_CLEAR if cleared else DISPOSE_KEEP
+
+        # A cleared rectangle leaves nothing under the next frame
+        previous = None if cleared else image
+
+
+def apng_frames(boxes, palette: np.ndarray = None):
+    """
+    Function used to give the rectangles of the frames to the PNG writer, every frame is read one band of rows
+    at a time while it is written.
+
+    :param boxes: the frames, as they come from frame_boxes
+    :param palette: the colors shared by the frames, from image_palette, or None for RGBA frames
+    :return: a generator of (x, y, width, height, bands, duration) of every frame
+    """
+
+    def frame_bands(image: TiledImage, left: int, top: int, right: int, bottom: int):
+        rows = max(1, BAND_BYTES // ((right - left) * 4))
+
+        for start in range(top, bottom, rows):
+            yield image.read(left, start, right - left, min(start + rows, bottom) - start)
+
+    for image, (left, top, right, bottom), duration, _ in boxes:
+        bands = frame_bands(image, left, top, right, bottom)
+        if palette is not None:
+            bands = indexed_bands(bands, palette)
+
+        yield left, top, right - left, bottom - top, bands, duration
+
+
+def export_animation(path: str, frames: list, indexed: bool = True, loops: int = 0,
+                     level: int = COMPRESSION_LEVEL, png_filter: PngFilters = PngFilters.UP) -> None:
+    """
+    Function used to write the frames of an animation as an animated GIF or an animated PNG, from the extension.
+    Every frame keeps only the rectangle that changed since the previous frame and the frames are encoded one at
+    a time, so the memory used doesn't grow with the number of frames.
+    The frames share a palette if they have few enough colors between them, a GIF keeps only opaque and
+    transparent pixels.
+
+    :param path: the path of the file, ending with .gif for a GIF
+    :param frames: a list of (image, duration) of every frame, the duration in milliseconds
+    :param indexed: save an animated PNG with a palette if its frames have up to 256 colors
+    :param loops: how many times the animation is played, 0 for ever
+    :param level: the zlib level of an animated PNG, from 0 to 9
+    :param png_filter: the filter applied to the rows of an animated PNG before the compression
+    :return: None
+    """
+
+    width, height = frames[0][0].width, frames[0][0].height
+    images = [image for image, _ in frames]
+
+    # The file is written next to the path and moved there once it is whole, an error leaves the old file as it was
+    part_path = f"{path}.part"
+
+    try:
+        if path.lower().endswith(".gif"):
+            palette = image_palette(images, PALETTE_COLORS, True)
+
+            write_gif(part_path, width, height, gif_frames(frame_boxes(frames, clear=True), palette), palette,
+                      loops)
+        else:
+            palette = image_palette(images) if indexed else None
+
+            write_apng(part_path, width, height, apng_frames(frame_boxes(frames, whole_first=True), palette),
+                       palette, loops, level, png_filter)
+
+        os.replace(part_path, path)
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
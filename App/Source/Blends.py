@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class Blends(Enum):
+    NORMAL = 1
+    MULTIPLY = 2
+    SCREEN = 3
+    OVERLAY = 4
+    ADD = 5
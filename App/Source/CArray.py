@@ -0,0 +1,229 @@
+import os
+import re
+
+import numpy as np
+
+from Source.CFormats import CFormats
+from Source.Export import image_palette, indexed_bands
+from Source.Png import pack_rows
+
+# The bits of an index of the indexed formats
+INDEX_BITS = {CFormats.INDEXED_1: 1, CFormats.INDEXED_2: 2, CFormats.INDEXED_4: 4, CFormats.INDEXED_8: 8}
+
+# The C type of the values of every size
+C_TYPES = {np.dtype(np.uint8): "uint8_t", np.dtype(np.uint16): "uint16_t", np.dtype(np.uint32): "uint32_t"}
+
+# The values written on a line of the array
+VALUES_PER_LINE = 16
+
+
+def c_name(path: str) -> str:
+    """
+    Function used to make a C identifier from the name of a file.
+
+    :param path: the path of the file
+    :return: the name without its extension, the characters that can't be in an identifier become underscores
+    and a name that doesn't start with a letter gets image_ in front
+    """
+
+    name = re.sub(r"\W", "_", os.path.splitext(os.path.basename(path))[0])
+
+    return name if name[:1].isalpha() else f"image_{name}"
+
+
+def rgb565(pixels: np.ndarray) -> np.ndarray:
+    """
+    Function used to pack the colors in 16 bits, 5 for the red, 6 for the green and 5 for the blue.
+    The alpha is dropped.
+
+    :param pixels: an array with the shape (..., 4)
+    :return: an array with the shape (...)
+    """
+
+    red, green, blue = (pixels[..., channel].astype(np.uint16) for channel in range(3))
+
+    return (red >> 3) << 11 | (green >> 2) << 5 | blue >> 3
+
+
+def rgba8888(pixels: np.ndarray) -> np.ndarray:
+    """
+    Function used to pack the colors in 32 bits, 0xRRGGBBAA, whatever the byte order of the machine is.
+
+    :param pixels: an array with the shape (..., 4)
+    :return: an array with the shape (...)
+    """
+
+    red, green, blue, alpha = (pixels[..., channel].astype(np.uint32) for channel in range(4))
+
+    return red << 24 | green << 16 | blue << 8 | alpha
+
+
+def pixel_values(pixels: np.ndarray, c_format: CFormats) -> tuple:
+    """
+    Function used to convert the pixels to the values of a format, the indexed formats pack the indices of a row
+    in bytes, the first one in the highest bits, and every row starts on a new byte.
+
+    :param pixels: an array with the shape (height, width, 4)
+    :param c_format: the format
+    :return: (values, palette) a flat array and the colors of the indexed formats as 0xRRGGBBAA, else None
+    """
+
+    if c_format == CFormats.RGB565:
+        return rgb565(pixels).ravel(), None
+
+    if c_format == CFormats.RGBA8888:
+        return rgba8888(pixels).ravel(), None
+
+    bits = INDEX_BITS[c_format]
+
+    palette = image_palette([pixels], 1 << bits)
+    if palette is None:
+        raise ValueError(f"The image has more than {1 << bits} colors, too many for {bits} bit indices")
+
+    indices = next(indexed_bands([pixels], palette))
+
+    return pack_rows(indices, bits).ravel(), rgba8888(palette)
+
+
+def run_length(values: np.ndarray) -> np.ndarray:
+    """
+    Function used to compress values as pairs of a count and a value, of the same type as the values.
+    A run longer than the biggest count is split.
+
+    :param values: a flat array of unsigned integers
+    :return: a flat array of count, value, count, value...
+    """
+
+    if not len(values):
+        return values
+
+    limit = np.iinfo(values.dtype).max
+
+    starts = np.flatnonzero(np.concatenate(([True], values[1:] != values[:-1])))
+    lengths = np.diff(np.append(starts, len(values)))
+
+    # A run is split in pieces of the biggest count, the last piece keeps what is left
+    pieces = -(-lengths // limit)
+    counts = np.full(pieces.sum(), limit, np.int64)
+    counts[np.cumsum(pieces) - 1] = lengths - (pieces - 1) * limit
+
+    pairs = np.empty((len(counts), 2), values.dtype)
+    pairs[:, 0] = counts
+    pairs[:, 1] = np.repeat(values[starts], pieces)
+
+    return pairs.ravel()
+
+
+def c_values(values: np.ndarray) -> str:
+    """
+    Function used to write values as the hexadecimal content of a C array.
+
+    :param values: a flat array of unsigned integers
+    :return: the values, a line every few of them
+    """
+
+    digits = values.dtype.itemsize * 2
+
+    lines = (", ".join(f"0x{value:0{digits}x}" for value in values[start:start + VALUES_PER_LINE].tolist())
+             for start in range(0, len(values), VALUES_PER_LINE))
+
+    return ",\n".join(f"    {line}" for line in lines)
+
+
+def decoder(name: str, c_type: str) -> str:
+    """
+    Function used to write the C function that expands the run-length encoded array.
+
+    :param name: the name of the array
+    :param c_type: the C type of its values
+    :return: the source of the function
+    """
+
+    return f"""/* Expands {name} into {name.upper()}_LENGTH values, the array is made of pairs of a count and a value */
+static void {name}_decode({c_type} *out)
+{{
+    size_t i;
+    {c_type} count;
+
+    for (i = 0; i < sizeof({name}) / sizeof({name}[0]); i += 2)
+        for (count = {name}[i]; count > 0; count--)
+            *out++ = {name}[i + 1];
+}}"""
+
+
+def pixel_reader(name: str, bits: int) -> str:
+    """
+    Function used to write the C function that reads the palette index of a pixel from the packed rows.
+
+    :param name: the name of the array
+    :param bits: the bits of an index
+    :return: the source of the function
+    """
+
+    return f"""/* Reads the palette index of a pixel from the rows of {name}, expanded first if they are compressed */
+static uint8_t {name}_index(const uint8_t *rows, unsigned x, unsigned y)
+{{
+    uint8_t byte = rows[y * {name.upper()}_STRIDE + x * {bits} / 8];
+
+    return (byte >> (8 - {bits} - x * {bits} % 8)) & {(1 << bits) - 1};
+}}"""
+
+
+def write_c_array(path: str, pixels: np.ndarray, c_format: CFormats = CFormats.RGB565, rle: bool = False,
+                  name: str = None) -> None:
+    """
+    Function used to write an image as a C header with its pixels in an array, and its palette in another one
+    for the indexed formats.
+    With the run-length compression the header also has the function that expands the array.
+
+    :param path: the path of the header
+    :param pixels: an array with the shape (height, width, 4)
+    :param c_format: the format of the pixels
+    :param rle: compress the array as pairs of a count and a value
+    :param name: the name of the array, the name of the file if None
+    :return: None
+    """
+
+    height, width = pixels.shape[:2]
+    name = name or c_name(path)
+
+    values, palette = pixel_values(pixels, c_format)
+    c_type = C_TYPES[values.dtype]
+
+    data = run_length(values) if rle else values
+
+    compression = f", run-length encoded from {values.nbytes} bytes" if rle else ""
+    parts = [f"/* {name}: {width}x{height}, {c_format.name}, {data.nbytes} bytes{compression} */",
+             f"#ifndef {name.upper()}_H",
+             f"#define {name.upper()}_H",
+             "",
+             "#include <stddef.h>",
+             "#include <stdint.h>",
+             "",
+             f"#define {name.upper()}_WIDTH {width}",
+             f"#define {name.upper()}_HEIGHT {height}",
+             f"#define {name.upper()}_LENGTH {len(values)}"]
+
+    if palette is not None:
+        bits = INDEX_BITS[c_format]
+        parts += [f"#define {name.upper()}_STRIDE {-(-width * bits // 8)}",
+                  "",
+                  "/* The colors as 0xRRGGBBAA */",
+                  f"static const uint32_t {name}_palette[{len(palette)}] = {{",
+                  c_values(palette),
+                  "};"]
+
+    parts += ["",
+              f"static const {c_type} {name}[{len(data)}] = {{",
+              c_values(data),
+              "};"]
+
+    if rle:
+        parts += ["", decoder(name, c_type)]
+    if palette is not None:
+        parts += ["", pixel_reader(name, INDEX_BITS[c_format])]
+
+    parts += ["", f"#endif /* {name.upper()}_H */", ""]
+
+    with open(path, "w") as file:
+        file.write("\n".join(parts))
@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class CFormats(Enum):
+    RGB565 = 1
+    RGBA8888 = 2
+    INDEXED_1 = 3
+    INDEXED_2 = 4
+    INDEXED_4 = 5
+    INDEXED_8 = 6
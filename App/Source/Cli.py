@@ -0,0 +1,175 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+from PyQt5.QtGui import QImage
+
+from Source.CArray import write_c_array
+from Source.CFormats import CFormats
+from Source.Export import export_scales
+from Source.Png import COMPRESSION_LEVEL
+from Source.PngFilters import PngFilters
+from Source.Scalers import Scalers
+from Source.Svg import write_svg
+from Source.UI.CanvasWidget import image_to_array
+
+
+def read_image(path: str) -> np.ndarray:
+    """
+    Function used to read an image file into an RGBA array.
+
+    :param path: the path of the image
+    :return: an array with the shape (height, width, 4)
+    """
+
+    image = QImage(path)
+
+    if image.isNull():
+        raise SystemExit(f"Can't read the image {path}")
+
+    return image_to_array(image)
+
+
+def upscale(arguments: argparse.Namespace) -> None:
+    """
+    Function used to write the scaled copies of an image.
+
+    :param arguments: the parsed arguments of the command
+    :return: None
+    """
+
+    paths = export_scales(arguments.output, read_image(arguments.input), arguments.scales,
+                          Scalers[arguments.scaler.upper()], indexed=not arguments.rgba, level=arguments.level,
+                          png_filter=PngFilters[arguments.filter.upper()], optimize=arguments.optimize)
+
+    for path in paths:
+        print(path)
+
+
+def svg(arguments: argparse.Namespace) -> None:
+    """
+    Function used to write an image as an SVG, with a single path of rectangles for every color.
+
+    :param arguments: the parsed arguments of the command
+    :return: None
+    """
+
+    write_svg(arguments.output, read_image(arguments.input))
+
+    print(arguments.output)
+
+
+def image_paths(paths: list) -> list:
+    """
+    Function used to list the images to convert, a folder stands for the PNG files in it.
+
+    :param paths: the paths of images or folders
+    :return: the paths of the images
+    """
+
+    images = []
+
+    for path in paths:
+        if os.path.isdir(path):
+            images += sorted(os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(".png"))
+        else:
+            images.append(path)
+
+    return images
+
+
+def c_array(arguments: argparse.Namespace) -> None:
+    """
+    Function used to write images as C headers, next to them or in the output folder.
+    The images that don't fit the format are reported and the command ends with an error.
+
+    :param arguments: the parsed arguments of the command
+    :return: None
+    """
+
+    c_format = CFormats[arguments.format.upper()]
+    failed = False
+
+    for path in image_paths(arguments.inputs):
+        folder = arguments.output or os.path.dirname(path)
+        header = os.path.join(folder, os.path.splitext(os.path.basename(path))[0] + ".h")
+
+        # An image that doesn't fit the format is skipped, the others are still converted
+        try:
+            write_c_array(header, read_image(path), c_format, arguments.rle)
+        except ValueError as error:
+            print(f"{path}: {error}", file=sys.stderr)
+            failed = True
+            continue
+
+        print(header)
+
+    if failed:
+        raise SystemExit(1)
+
+
+def parser() -> argparse.ArgumentParser:
+    """
+    Function used to describe the commands and their arguments.
+
+    :return: the parser of the command line
+    """
+
+    main_parser = argparse.ArgumentParser(prog="python -m Source.Cli",
+                                          description="Pixel Art Designer commands that don't need the window.")
+    commands = main_parser.add_subparsers(dest="command", required=True)
+
+    upscale_parser = commands.add_parser("upscale", help="write integer scaled copies of an image")
+    upscale_parser.add_argument("input", help="the image to scale")
+    upscale_parser.add_argument("output", help="the PNG to write, the copies above 1x get @2x, @4x... in the name")
+    upscale_parser.add_argument("--scales", type=int, nargs="+", default=[2], help="the integer scales (default 2)")
+    upscale_parser.add_argument("--scaler", choices=[scaler.name.lower() for scaler in Scalers], default="nearest",
+                                help="the filter, scale_nx is Scale2x/Scale3x and xbr smooths the edges")
+    upscale_parser.add_argument("--level", type=int, choices=range(10), default=COMPRESSION_LEVEL, metavar="0-9",
+                                help=f"the zlib level (default {COMPRESSION_LEVEL})")
+    upscale_parser.add_argument("--filter", choices=[png_filter.name.lower() for png_filter in PngFilters],
+                                default="up", help="the PNG filter of the rows (default up)")
+    upscale_parser.add_argument("--optimize", action="store_true",
+                                help="try every filter at the best level and keep the smallest file")
+    upscale_parser.add_argument("--rgba", action="store_true",
+                                help="don't use a palette even if the image has 256 colors or less")
+    upscale_parser.set_defaults(function=upscale)
+
+    svg_parser = commands.add_parser("svg", help="write an image as an SVG of rectangles of a single color")
+    svg_parser.add_argument("input", help="the image to convert")
+    svg_parser.add_argument("output", help="the SVG to write")
+    svg_parser.set_defaults(function=svg)
+
+    c_parser = commands.add_parser("carray", help="write images as C headers for the embedded targets")
+    c_parser.add_argument("inputs", nargs="+", help="the images, or folders of PNG files, to convert")
+    c_parser.add_argument("--format", choices=[c_format.name.lower() for c_format in CFormats], default="rgb565",
+                          help="the format of the pixels, the indexed ones add a palette (default rgb565)")
+    c_parser.add_argument("--rle", action="store_true",
+                          help="compress the pixels as pairs of a count and a value, with the function to expand them")
+    c_parser.add_argument("--output", help="the folder of the headers, next to the images if it isn't given")
+    c_parser.set_defaults(function=c_array)
+
+    return main_parser
+
+
+def main(argv: list = None) -> int:
+    """
+    Function used to run a command.
+
+    :param argv: the arguments of the command line, the ones of the process if None
+    :return: the exit code
+    """
+
+    arguments = parser().parse_args(argv)
+
+    if any(scale < 1 for scale in getattr(arguments, "scales", [])):
+        raise SystemExit("The scales must be at least 1")
+
+    arguments.function(arguments)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+import numpy as np
+
+from Source.Tiles import TiledImage
+
+# The number of tiles counted together by a full scan, it bounds the memory of the scan
+SCAN_TILES = 1024
+
+# The alpha channel of a color as a 32 bit word
+ALPHA_MASK = 0xFF000000
+
+
+def word_to_color(word: int) -> tuple:
+    """
+    Function used to convert a color kept as a 32 bit word to its channels.
+
+    :param word: the color as a little-endian RGBA word
+    :return: the (r, g, b, a) color
+    """
+
+    return word & 0xFF, (word >> 8) & 0xFF, (word >> 16) & 0xFF, word >> 24
+
+
+class ColorUsage:
+    """
+    This class counts the pixels of every color of an image, the transparent pixels aren't counted.
+    The counts of every tile are kept, so when some tiles change only these tiles are counted again
+    and their old counts are taken away from the totals.
+    """
+
+    def __init__(self):
+        """
+        Class constructor.
+        """
+
+        # The image that is counted, another image is counted from scratch
+        self.image = None
+
+        # The (words, counts) of the colors of every tile and the totals of every color
+        self.tiles = {}
+        self.counts = {}
+
+    def update(self, image: TiledImage) -> bool:
+        """
+        Function used to bring the counts up to date with the image, the changed tiles are the dirty ones.
+        The counts take the dirty tiles of the image, nobody else should use them.
+
+        :param image: the image
+        :return: True if the counts were changed
+        """
+
+        if image is not self.image:
+            self.scan(image)
+            return True
+
+        if not image.dirty:
+            return False
+
+        for key in image.dirty:
+            self.count_tile(image, key)
+
+        image.dirty.clear()
+
+        return True
+
+    def scan(self, image: TiledImage) -> None:
+        """
+        Function used to count all the tiles of an image.
+        The colors are prefixed with the number of their tile, so a single np.unique counts every color of every tile
+        for a group of tiles at once.
+
+        :param image: the image
+        :return: None
+        """
+
+        self.image = image
+        self.tiles = {}
+        self.counts = {}
+
+        image.dirty.clear()
+
+        keys = list(image.tiles)
+
+        for start in range(0, len(keys), SCAN_TILES):
+            group = keys[start:start + SCAN_TILES]
+
+            words = np.stack([image.tiles[key] for key in group]).view(np.uint32).reshape(len(group), -1)
+            pairs = (np.arange(len(group), dtype=np.uint64)[:, None] << np.uint64(32)) | words.astype(np.uint64)
+
+            unique, counts = np.unique(pairs, return_counts=True)
+
+            # The transparent pixels aren't colors
+            opaque = (unique & np.uint64(ALPHA_MASK)) != 0
+            unique, counts = unique[opaque], counts[opaque]
+
+            tiles = (unique >> np.uint64(32)).astype(np.int64)
+            colors = (unique & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+            # Split the colors by tile, they are sorted by tile
+            bounds = np.flatnonzero(np.diff(tiles)) + 1
+            for part in np.split(np.arange(len(tiles)), bounds):
+                if len(part):
+                    self.tiles[group[tiles[part[0]]]] = (colors[part], counts[part])
+
+            # Add up the colors of all the tiles of the group
+            totals, inverse = np.unique(colors, return_inverse=True)
+            sums = np.bincount(inverse, counts)
+
+            for word, count in zip(totals.tolist(), sums.tolist()):
+                self.counts[word] = self.counts.get(word, 0) + int(count)
+
+    def count_tile(self, image: TiledImage, key: tuple) -> None:
+        """
+        Function used to count again the colors of a tile.
+
+        :param image: the image
+        :param key: the (tx, ty) of the tile
+        :return: None
+        """
+
+        # Take away the old counts of the tile
+        old = self.tiles.pop(key, None)
+
+        if old is not None:
+            for word, count in zip(old[0].tolist(), old[1].tolist()):
+                left = self.counts[word] - count
+                if left:
+                    self.counts[word] = left
+                else:
+                    del self.counts[word]
+
+        tile = image.tiles.get(key)
+
+        if tile is None:
+            return
+
+        words, counts = np.unique(tile.view(np.uint32), return_counts=True)
+
+        opaque = (words & ALPHA_MASK) != 0
+        words, counts = words[opaque], counts[opaque]
+
+        self.tiles[key] = (words, counts)
+
+        for word, count in zip(words.tolist(), counts.tolist()):
+            self.counts[word] = self.counts.get(word, 0) + count
+
+    def most_used(self, limit: int = None) -> list:
+        """
+        Function used to get the colors from the most used to the least used.
+
+        :param limit: the number of colors, all of them if None
+        :return: a list of ((r, g, b, a), count)
+        """
+
+        items = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+        return [(word_to_color(word), count) for word, count in items]
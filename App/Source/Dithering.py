@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class Dithering(Enum):
+    NONE = 1
+    ORDERED = 2
+    FLOYD_STEINBERG = 3
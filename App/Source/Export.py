@@ -0,0 +1,244 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from Source.Png import COMPRESSION_LEVEL, write_png
+from Source.PngFilters import PngFilters
+from Source.Quantize import ALPHA_THRESHOLD
+from Source.Scale import HALO, as_words, scale_pixels
+from Source.Scalers import Scalers
+from Source.Tiles import TiledImage
+
+# The scales offered by the export, the copies of a sprite for the store listings
+EXPORT_SCALES = (1, 2, 4, 8)
+
+# The size of a band of upscaled rows, it bounds the memory used by every copy while it is written
+BAND_BYTES = 16 * 1024 * 1024
+
+# The most colors of a palette, an image with more colors is saved as RGBA
+PALETTE_COLORS = 256
+
+# The filters tried by the optimization, the smallest file is kept
+OPTIMIZE_FILTERS = (PngFilters.NONE, PngFilters.SUB, PngFilters.UP, PngFilters.PAETH, PngFilters.ADAPTIVE)
+
+
+def scaled_path(path: str, scale: int) -> str:
+    """
+    Function used to get the path of a scaled copy, the copy at 1x keeps the path and the others get @2x, @4x...
+
+    :param path: the path of the image
+    :param scale: the factor
+    :return: the path of the copy
+    """
+
+    if scale == 1:
+        return path
+
+    root, extension = os.path.splitext(path)
+
+    return f"{root}@{scale}x{extension}"
+
+
+def image_size(image) -> tuple:
+    """
+    Function used to get the size of an image, either an array or the tiles of a drawing.
+
+    :param image: an array with the shape (height, width, 4) or a tiled image
+    :return: (height, width)
+    """
+
+    if isinstance(image, TiledImage):
+        return image.height, image.width
+
+    return image.shape[:2]
+
+
+def read_rows(image, start: int, stop: int) -> np.ndarray:
+    """
+    Function used to read some rows of an image, either an array or the tiles of a drawing.
+
+    :param image: an array with the shape (height, width, 4) or a tiled image
+    :param start: the first row
+    :param stop: the row after the last one
+    :return: an array with the shape (stop - start, width, 4)
+    """
+
+    if isinstance(image, TiledImage):
+        return image.read(0, start, image.width, stop - start)
+
+    return image[start:stop]
+
+
+def scaled_bands(image, scale: int, scaler: Scalers = Scalers.NEAREST):
+    """
+    Function used to upscale an image one band of rows at a time, so the scaled image is never whole in memory.
+    The rows of a band are read only when the band is needed, so the tiles of a drawing are never copied whole.
+    The filters look at the neighbours of the pixels, so a band is scaled with some rows around it which are
+    then cut, and the result is the same as scaling the whole image.
+
+    :param image: an array with the shape (height, width, 4) or a tiled image
+    :param scale: the factor
+    :param scaler: the filter
+    :return: a generator of arrays with the shape (rows, width * scale, 4)
+    """
+
+    height, width = image_size(image)
+    rows = max(1, BAND_BYTES // (width * 4 * scale * scale))
+    halo = 0 if scaler == Scalers.NEAREST else HALO
+
+    for top in range(0, height, rows):
+        start, stop = max(top - halo, 0), min(top + rows + halo, height)
+
+        band = scale_pixels(read_rows(image, start, stop), scale, scaler)
+
+        yield band[(top - start) * scale:(min(top + rows, height) - start) * scale]
+
+
+def binary_alpha(pixels: np.ndarray) -> np.ndarray:
+    """
+    Function used to make the pixels less opaque than half fully transparent and the others opaque.
+    Every transparent pixel becomes the same transparent black.
+
+    :param pixels: an array with the shape (height, width, 4)
+    :return: a new array with the shape (height, width, 4)
+    """
+
+    opaque = pixels[..., 3] >= ALPHA_THRESHOLD
+
+    result = np.where(opaque[..., None], pixels, 0).astype(np.uint8)
+    result[..., 3] = np.where(opaque, 255, 0)
+
+    return result
+
+
+def image_palette(images: list, limit: int = PALETTE_COLORS, binary: bool = False):
+    """
+    Function used to find the colors of some images if there are few enough of them for a single palette.
+    The colors are gathered one band of rows at a time and the search stops as soon as there are too many.
+
+    :param images: arrays with the shape (height, width, 4) or tiled images
+    :param limit: the most colors of the palette
+    :param binary: keep only opaque or transparent pixels with binary_alpha, the transparent black is then always
+    the first color, even if no pixel is transparent
+    :return: an array with the shape (colors, 4), the transparent colors first, or None if there are too many
+    """
+
+    words = np.zeros(1 if binary else 0, np.uint32)
+
+    for image in images:
+        height, width = image_size(image)
+        rows = max(1, BAND_BYTES // (width * 4))
+
+        for top in range(0, height, rows):
+            band = read_rows(image, top, min(top + rows, height))
+            words = np.union1d(words, as_words(binary_alpha(band) if binary else band))
+
+            if len(words) > limit:
+                return None
+
+    colors = words.view(np.uint8).reshape(-1, 4)
+
+    # Only the colors up to the last transparent one get an alpha in the file, so they come first
+    return colors[np.argsort(colors[:, 3] == 255, kind="stable")]
+
+
+def indexed_bands(bands, palette: np.ndarray):
+    """
+    Function used to replace the colors of some bands of rows by their index in a palette.
+
+    :param bands: an iterable of arrays with the shape (rows, width, 4) whose colors are all in the palette
+    :param palette: an array with the shape (colors, 4)
+    :return: a generator of arrays with the shape (rows, width)
+    """
+
+    words = as_words(palette[None])[0]
+
+    # The colors are looked up in sorted order and then mapped back to their place in the palette
+    order = np.argsort(words)
+    keys = words[order]
+
+    for band in bands:
+        yield order[np.searchsorted(keys, as_words(band))].astype(np.uint8)
+
+
+def keep_smallest(path: str, candidates: list) -> None:
+    """
+    Function used to keep the smallest of some files written for the same image and delete the others.
+
+    :param path: the path the smallest file is moved to
+    :param candidates: the paths of the files
+    :return: None
+    """
+
+    smallest = min(candidates, key=os.path.getsize)
+
+    for candidate in candidates:
+        if candidate != smallest:
+            os.remove(candidate)
+
+    os.replace(smallest, path)
+
+
+def export_scales(path: str, image, scales=EXPORT_SCALES, scaler: Scalers = Scalers.NEAREST,
+                  workers: int = None, indexed: bool = True, level: int = COMPRESSION_LEVEL,
+                  png_filter: PngFilters = PngFilters.UP, optimize: bool = False) -> list:
+    """
+    Function used to write several integer scaled copies of an image at once, every copy on its own thread.
+    The copies are read from the same image, which isn't changed while they are written, and the compression
+    lets the other threads run, so writing all of them takes about as long as writing the biggest one.
+    Every copy keeps only a band of rows in memory, whatever its size is.
+    An image with few colors is saved with a palette, unless xBR blends new colors in the copies.
+
+    :param path: the path of the image, the scaled copies are written next to it
+    :param image: an array with the shape (height, width, 4) or a tiled image
+    :param scales: the factors
+    :param scaler: the filter used to scale the pixels
+    :param workers: the number of threads, one for every copy if None
+    :param indexed: save the image with a palette if it has up to 256 colors
+    :param level: the zlib level, from 0 to 9
+    :param png_filter: the filter applied to the rows before the compression
+    :param optimize: write every copy with every filter at the best level, on the threads, and keep the smallest
+    :return: the paths of the copies
+    """
+
+    height, width = image_size(image)
+    paths = [scaled_path(path, scale) for scale in scales]
+
+    palette = image_palette([image]) if indexed and scaler != Scalers.XBR else None
+
+    filters = OPTIMIZE_FILTERS if optimize else (png_filter,)
+    level = 9 if optimize else level
+
+    def write_copy(copy_path: str, scale: int, copy_filter: PngFilters) -> None:
+        bands = scaled_bands(image, scale, scaler)
+        if palette is not None:
+            bands = indexed_bands(bands, palette)
+
+        write_png(copy_path, width * scale, height * scale, bands, palette, level, copy_filter)
+
+    # Every filter of a copy is written to its own file next to it when several are tried
+    candidates = {copy_path: [copy_path if len(filters) == 1 else f"{copy_path}.{copy_filter.name.lower()}"
+                              for copy_filter in filters] for copy_path in paths}
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers or len(scales)) as pool:
+            futures = [pool.submit(write_copy, candidate, scale, copy_filter)
+                       for copy_path, scale in zip(paths, scales)
+                       for candidate, copy_filter in zip(candidates[copy_path], filters)]
+
+            # Wait for every copy, an error of a copy is raised here
+            for future in futures:
+                future.result()
+
+        if len(filters) > 1:
+            for copy_path in paths:
+                keep_smallest(copy_path, candidates[copy_path])
+    finally:
+        # Nothing is left behind by an error
+        for copy_path in paths:
+            for candidate in candidates[copy_path]:
+                if candidate != copy_path and os.path.exists(candidate):
+                    os.remove(candidate)
+
+    return paths
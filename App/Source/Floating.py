@@ -0,0 +1,64 @@
+import numpy as np
+
+from Source.Selection import Selection
+
+
+class Floating:
+    """
+    This class holds pixels that float over the canvas, after they were pasted or lifted to be moved,
+    until they are put into a layer. Moving them only changes their position, the pixels are never copied
+    and pasting the same pixels again shares them.
+    """
+
+    def __init__(self, pixels: np.ndarray, mask: np.ndarray, x: int, y: int):
+        """
+        Class constructor.
+
+        :param pixels: an array with the shape (height, width, 4), transparent outside the mask
+        :param mask: a boolean array with the shape (height, width) with the pixels that float
+        :param x: the left of the pixels on the canvas
+        :param y: the top of the pixels on the canvas
+        """
+
+        self.pixels = pixels
+        self.mask = mask
+
+        self.x = x
+        self.y = y
+
+        self.height, self.width = mask.shape
+
+        # The border of the mask, relative to its top left corner
+        self.outline = Selection.from_mask(self.width, self.height, 0, 0, mask).outline()
+
+    def move(self, dx: int, dy: int) -> None:
+        """
+        Function used to move the pixels.
+
+        :param dx: the horizontal offset
+        :param dy: the vertical offset
+        :return: None
+        """
+
+        self.x += dx
+        self.y += dy
+
+    def contains(self, x: int, y: int) -> bool:
+        """
+        Function used to check if a point of the canvas is over the floating pixels.
+
+        :param x: self explanatory
+        :param y: self explanatory
+        :return: True if the point is inside the rectangle of the pixels
+        """
+
+        return self.x <= x < self.x + self.width and self.y <= y < self.y + self.height
+
+    def rect(self) -> tuple:
+        """
+        Function used to get the rectangle covered by the pixels.
+
+        :return: (x, y, width, height)
+        """
+
+        return self.x, self.y, self.width, self.height
@@ -0,0 +1,241 @@
+import struct
+
+import numpy as np
+
+# The LZW codes have up to 12 bits, the table of codes starts again when it is full
+MAX_CODE = 4096
+MAX_CODE_SIZE = 12
+
+# A frame stays under the next one, or its rectangle is cleared to transparent once it was shown
+DISPOSE_KEEP = 1
+DISPOSE_CLEAR = 2
+
+# The index of the transparent color in every palette
+TRANSPARENT_INDEX = 0
+
+
+def table_bits(colors: int) -> int:
+    """
+    Function used to find the bits of the size of a color table, a table has a power of two colors.
+
+    :param colors: the number of colors, up to 256
+    :return: from 1 to 8
+    """
+
+    return max(1, (colors - 1).bit_length())
+
+
+def color_table(palette: np.ndarray) -> bytes:
+    """
+    Function used to build a color table, completed with black up to its size.
+
+    :param palette: an array with the shape (colors, 3) or (colors, 4), the alpha is left out
+    :return: the RGB bytes of the table
+    """
+
+    table = np.zeros((1 << table_bits(len(palette)), 3), np.uint8)
+    table[:len(palette)] = palette[:, :3]
+
+    return table.tobytes()
+
+
+def lzw_compress(indices: np.ndarray, depth: int) -> bytes:
+    """
+    Function used to compress palette indices with the variable length LZW codes of GIF.
+    The strings of indices are found in a table keyed by their prefix code and their last index,
+    then the codes are packed in bits all at once.
+
+    :param indices: an array of palette indices, at least one
+    :param depth: the minimum code size, the bits of an index but at least 2
+    :return: the compressed bytes
+    """
+
+    clear = 1 << depth
+    end = clear + 1
+
+    codes = [clear]
+    sizes = [depth + 1]
+
+    table = {}
+    next_code = end + 1
+    size = depth + 1
+
+    data = indices.tobytes()
+    prefix = data[0]
+
+    for index in data[1:]:
+        key = prefix << 8 | index
+
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+
+        codes.append(prefix)
+        sizes.append(size)
+
+        # The table is full, the decoder is told to start again
+        if next_code == MAX_CODE:
+            codes.append(clear)
+            sizes.append(size)
+
+            table = {}
+            next_code = end + 1
+            size = depth + 1
+        else:
+            table[key] = next_code
+            next_code += 1
+
+            # The decoder adds its codes one step later, so the size grows once the last code doesn't fit
+            if next_code - 1 == 1 << size and size < MAX_CODE_SIZE:
+                size += 1
+
+        prefix = index
+
+    codes += [prefix, end]
+    sizes += [size, size]
+
+    # The codes are written from their lowest bit, one after the other
+    codes = np.array(codes, np.uint32)
+    positions = np.arange(MAX_CODE_SIZE)
+    bits = ((codes[:, None] >> positions) & 1).astype(np.uint8)
+
+    return np.packbits(bits[positions < np.array(sizes)[:, None]], bitorder="little").tobytes()
+
+
+def sub_blocks(data: bytes) -> bytes:
+    """
+    Function used to split data in the blocks of up to 255 bytes of GIF, ended by an empty block.
+
+    :param data: self explanatory
+    :return: the blocks, each one after its length
+    """
+
+    blocks = [bytes([len(data[start:start + 255])]) + data[start:start + 255] for start in range(0, len(data), 255)]
+
+    return b"".join(blocks) + b"\x00"
+
+
+def write_gif(path: str, width: int, height: int, frames, palette: np.ndarray = None, loops: int = 0) -> None:
+    """
+    Function used to write an animated GIF from its frames, as they are produced.
+    Every frame covers only a rectangle of the animation, its transparent pixels show the previous frames.
+    The index 0 of every palette is the transparent color.
+
+    :param path: the path of the file
+    :param width: the width of the animation
+    :param height: the height of the animation
+    :param frames: an iterable of (x, y, indices, palette, duration, disposal) of every frame, the indices are an
+    array with the shape (height, width), the palette is None to use the global one, the duration is in
+    milliseconds and the disposal tells what is done with the rectangle after the frame was shown
+    :param palette: an array with the shape (colors, 3) or (colors, 4) of up to 256 colors shared by the frames,
+    None if every frame has its own
+    :param loops: how many times the animation is played, 0 for ever
+    :return: None
+    """
+
+    with open(path, "wb") as file:
+        file.write(b"GIF89a")
+
+        if palette is None:
+            file.write(struct.pack("<HHBBB", width, height, 0, 0, 0))
+        else:
+            bits = table_bits(len(palette))
+            file.write(struct.pack("<HHBBB", width, height, 0xf0 | (bits - 1), TRANSPARENT_INDEX, 0))
+            file.write(color_table(palette))
+
+        # The application extension that plays the animation again
+        file.write(b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", loops) + b"\x00")
+
+        for x, y, indices, frame_palette, duration, disposal in frames:
+            frame_height, frame_width = indices.shape
+
+            # The graphic control extension, with the delay in hundredths of a second
+            file.write(b"!\xf9\x04" + struct.pack("<BHB", disposal << 2 | 1, round(duration / 10), TRANSPARENT_INDEX)
+                       + b"\x00")
+
+            if frame_palette is None:
+                file.write(b"," + struct.pack("<HHHHB", x, y, frame_width, frame_height, 0))
+                bits = table_bits(len(palette))
+            else:
+                bits = table_bits(len(frame_palette))
+                file.write(b"," + struct.pack("<HHHHB", x, y, frame_width, frame_height, 0x80 | (bits - 1)))
+                file.write(color_table(frame_palette))
+
+            depth = max(2, bits)
+            file.write(bytes([depth]) + sub_blocks(lzw_compress(indices, depth)))
+
+        file.write(b";")
+
+
+def skip_sub_blocks(file) -> None:
+    """
+    Function used to move a file past blocks of data, every block starts with its length and an empty one ends them.
+
+    :param file: the file, at the length of the first block
+    :return: None
+    """
+
+    length = file.read(1)
+
+    while length and length[0]:
+        file.seek(length[0], 1)
+        length = file.read(1)
+
+
+def gif_delays(path: str) -> list:
+    """
+    Function used to find the delay of every frame of a GIF without decoding them, only the blocks are walked,
+    so it is quick even for a long animation. A file cut short keeps the frames before the cut.
+
+    :param path: the path of the file
+    :return: the delay of every frame in milliseconds, 0 if a frame has none
+    """
+
+    delays = []
+    delay = 0
+
+    with open(path, "rb") as file:
+        header = file.read(13)
+        if len(header) < 13 or not header.startswith(b"GIF"):
+            return delays
+
+        # Skip the global color table
+        if header[10] & 0x80:
+            file.seek(3 << ((header[10] & 7) + 1), 1)
+
+        introducer = file.read(1)
+
+        while introducer and introducer != b";":
+            if introducer == b"!":
+                label = file.read(1)
+
+                # The graphic control extension holds the delay of the next frame, in hundredths of a second,
+                # its terminator is read with the other blocks
+                if label == b"\xf9":
+                    block = file.read(5)
+                    if len(block) == 5:
+                        delay = struct.unpack("<H", block[2:4])[0] * 10
+
+                skip_sub_blocks(file)
+
+            elif introducer == b",":
+                descriptor = file.read(9)
+                if len(descriptor) < 9:
+                    break
+
+                # Skip the local color table and the compressed indices
+                if descriptor[8] & 0x80:
+                    file.seek(3 << ((descriptor[8] & 7) + 1), 1)
+                file.read(1)
+                skip_sub_blocks(file)
+
+                delays.append(delay)
+                delay = 0
+
+            else:
+                break
+
+            introducer = file.read(1)
+
+    return delays
@@ -0,0 +1,110 @@
+from collections import deque
+
+from Source.Transforms import Transforms
+
+# The number of operations that can be undone
+HISTORY_LIMIT = 100
+
+
+class Operation:
+    """
+    This class is a change of the drawing kept in the history as the transform and its arguments, not as the pixels.
+    A transform is undone by its inverse, only the pixels cropped by a resize are kept to bring them back.
+    """
+
+    def __init__(self, transform: Transforms, arguments: tuple, size: tuple):
+        """
+        Class constructor.
+
+        :param transform: the transform
+        :param arguments: the arguments of the transform
+        :param size: the (width, height) of the drawing before the transform
+        """
+
+        self.transform = transform
+        self.arguments = arguments
+        self.size = size
+
+        # The pixels of every layer cropped by the transform and by its inverse, for a resize
+        self.cropped = {}
+        self.restored = {}
+
+
+class History:
+    """
+    This class holds the operations that can be undone and the undone operations that can be done again.
+    """
+
+    def __init__(self, limit: int = HISTORY_LIMIT):
+        """
+        Class constructor.
+
+        :param limit: the number of operations that can be undone, the oldest ones are forgotten
+        """
+
+        self.done = deque(maxlen=limit)
+        self.undone = []
+
+    def record(self, operation: Operation) -> None:
+        """
+        Function used to add an operation that was just done, the undone operations can't be done again anymore.
+        Shifts in a row are kept as a single shift.
+
+        :param operation: the operation
+        :return: None
+        """
+
+        self.undone.clear()
+
+        last = self.done[-1] if self.done else None
+
+        if last is not None and last.transform == operation.transform == Transforms.SHIFT and \
+                last.size == operation.size:
+            width, height = last.size
+            last.arguments = ((last.arguments[0] + operation.arguments[0]) % width,
+                              (last.arguments[1] + operation.arguments[1]) % height)
+
+            # Shifts that add up to nothing are forgotten
+            if last.arguments == (0, 0):
+                self.done.pop()
+            return
+
+        self.done.append(operation)
+
+    def undo(self):
+        """
+        Function used to take the last operation to undo it.
+
+        :return: the operation or None if there is nothing to undo
+        """
+
+        if not self.done:
+            return None
+
+        self.undone.append(self.done.pop())
+
+        return self.undone[-1]
+
+    def redo(self):
+        """
+        Function used to take the last undone operation to do it again.
+
+        :return: the operation or None if there is nothing to redo
+        """
+
+        if not self.undone:
+            return None
+
+        self.done.append(self.undone.pop())
+
+        return self.done[-1]
+
+    def clear(self) -> None:
+        """
+        Function used to forget all the operations, when another drawing is started.
+
+        :return: None
+        """
+
+        self.done.clear()
+        self.undone.clear()
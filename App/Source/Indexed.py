@@ -0,0 +1,120 @@
+import numpy as np
+
+from Source.Palette import Palette
+from Source.Tiles import MappedTileStore, TiledImage, TILE_SIZE
+
+
+class IndexedImage(TiledImage):
+    """
+    This class holds the pixels of a canvas as indices into a palette, one byte per pixel instead of four.
+    The pixels are read as RGBA through the palette, so changing a color of the palette changes every pixel
+    that uses it without touching the tiles.
+    """
+
+    # The shape of a pixel in the tiles, a single index
+    pixel_shape = ()
+
+    def __init__(self, width: int, height: int, palette: Palette, tile_size: int = TILE_SIZE, mapped: bool = False):
+        """
+        Class constructor.
+
+        :param width: the width of the image in pixels
+        :param height: the height of the image in pixels
+        :param palette: the palette of the image, shared with the other layers
+        :param tile_size: the size of the side of a tile in pixels
+        :param mapped: keep the tiles in a memory-mapped scratch file instead of memory
+        """
+
+        super(IndexedImage, self).__init__(width, height, tile_size, mapped)
+
+        self.palette = palette
+
+    @classmethod
+    def from_array(cls, pixels: np.ndarray, palette: Palette, tile_size: int = TILE_SIZE,
+                   mapped: bool = False) -> "IndexedImage":
+        """
+        Function used to split an RGBA array into tiles of indices, the colors are added to the palette.
+
+        :param pixels: an array with the shape (height, width, 4)
+        :param palette: the palette of the image
+        :param tile_size: the size of the side of a tile in pixels
+        :param mapped: keep the tiles in a memory-mapped scratch file instead of memory
+        :return: the indexed image
+        """
+
+        image = cls(pixels.shape[1], pixels.shape[0], palette, tile_size, mapped)
+        image.write(0, 0, pixels)
+
+        return image
+
+    def empty(self, width: int, height: int) -> "IndexedImage":
+        """
+        Function used to create an empty image of the same kind with another size, with the same palette.
+
+        :param width: the width of the image in pixels
+        :param height: the height of the image in pixels
+        :return: the image
+        """
+
+        return type(self)(width, height, self.palette, self.tile_size, isinstance(self.tiles, MappedTileStore))
+
+    def encode(self, pixels: np.ndarray) -> np.ndarray:
+        """
+        Function used to convert RGBA pixels to indices of the palette.
+
+        :param pixels: an array with the shape (height, width, 4)
+        :return: an array of indices with the shape (height, width)
+        """
+
+        return self.palette.encode(pixels)
+
+    def encode_color(self, color: tuple) -> int:
+        """
+        Function used to get the index of a color.
+
+        :param color: the (r, g, b, a) color
+        :return: the index
+        """
+
+        return self.palette.encode_color(color)
+
+    def decode(self, values: np.ndarray) -> np.ndarray:
+        """
+        Function used to convert indices to RGBA pixels through the palette.
+
+        :param values: an array of indices with the shape (height, width)
+        :return: an array with the shape (height, width, 4)
+        """
+
+        return self.palette.decode(values)
+
+    @staticmethod
+    def visible(values: np.ndarray) -> bool:
+        """
+        Function used to check if some indices are not all transparent, the transparent entry is 0.
+
+        :param values: an array of indices
+        :return: True if a pixel is not transparent
+        """
+
+        return values.any()
+
+    def match_mask(self, tile, width: int, height: int, color: tuple, tolerance: int = 0) -> np.ndarray:
+        """
+        Function used to find the pixels of a tile that have a certain color.
+        The entries of the palette are compared with the color once, then the indices just look up the result.
+
+        :param tile: the tile array or None for a transparent tile
+        :param width: the width of the part of the tile inside the image
+        :param height: the height of the part of the tile inside the image
+        :param color: the (r, g, b, a) color
+        :param tolerance: the biggest difference allowed on a channel, between 0 and 255
+        :return: a boolean array with the shape (height, width)
+        """
+
+        entries = TiledImage.match_mask(self.palette.colors[None], len(self.palette.colors), 1, color, tolerance)[0]
+
+        if tile is None:
+            return np.full((height, width), entries[0])
+
+        return entries[tile[:height, :width]]
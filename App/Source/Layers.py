@@ -0,0 +1,522 @@
+import numpy as np
+
+from Source.Blends import Blends
+from Source.Indexed import IndexedImage
+from Source.Palette import Palette
+from Source.Tiles import TiledImage
+
+# The blended color of every mode, from the source and destination colors (floats between 0 and 1)
+BLENDS = {
+    Blends.NORMAL: lambda source, destination: source,
+    Blends.MULTIPLY: lambda source, destination: source * destination,
+    Blends.SCREEN: lambda source, destination: source + destination - source * destination,
+    Blends.OVERLAY: lambda source, destination: np.where(destination <= 0.5,
+                                                         2 * source * destination,
+                                                         1 - 2 * (1 - source) * (1 - destination)),
+    Blends.ADD: lambda source, destination: np.minimum(source + destination, 1)
+}
+
+
+def blend(destination: np.ndarray, source: np.ndarray, mode: Blends = Blends.NORMAL,
+          opacity: float = 1.0) -> np.ndarray:
+    """
+    Function used to put a source image over a destination image with a blend mode.
+
+    :param destination: an RGBA array (the image below)
+    :param source: an RGBA array with the same shape (the image above)
+    :param mode: the blend mode of the source
+    :param opacity: the opacity of the source, between 0 and 1
+    :return: the blended RGBA array
+    """
+
+    # Nothing to do if the source is transparent
+    if opacity <= 0 or not source[..., 3].any():
+        return destination
+
+    # Over a transparent destination the source is used as it is, whatever the mode
+    if not destination[..., 3].any():
+        if opacity >= 1:
+            return source
+        result = source.copy()
+        result[..., 3] = np.rint(source[..., 3] * opacity)
+        return result
+
+    source = source.astype(np.float32) / 255
+    destination = destination.astype(np.float32) / 255
+
+    source_alpha = source[..., 3:] * opacity
+    destination_alpha = destination[..., 3:]
+
+    # Where the destination is transparent the source color is used as it is
+    color = (1 - destination_alpha) * source[..., :3] + \
+        destination_alpha * BLENDS[mode](source[..., :3], destination[..., :3])
+
+    alpha = source_alpha + destination_alpha * (1 - source_alpha)
+
+    color = (source_alpha * color + destination_alpha * (1 - source_alpha) * destination[..., :3]) / \
+        np.maximum(alpha, 1e-6)
+
+    result = np.empty(source.shape, np.uint8)
+    result[..., :3] = np.rint(color * 255)
+    result[..., 3:] = np.rint(alpha * 255)
+
+    return result
+
+
+class Layer:
+    """
+    This class is a layer of the drawing, an image with a name, a visibility, an opacity and a blend mode.
+    """
+
+    def __init__(self, name: str, image: TiledImage):
+        """
+        Class constructor.
+
+        :param name: the name shown in the layers panel
+        :param image: the pixels of the layer
+        """
+
+        self.name = name
+        self.image = image
+
+        self.visible = True
+        self.opacity = 1.0
+        self.blend_mode = Blends.NORMAL
+
+
+class LayerStack:
+    """
+    This class holds the layers of the drawing, from the bottom one to the top one, and their composite.
+    The layers below and above the active layer are kept flattened, so when the active layer is changed only its
+    changed region is blended again, whatever the number of layers is.
+    """
+
+    def __init__(self, width: int, height: int, mapped: bool = False, palette: Palette = None):
+        """
+        Class constructor.
+
+        :param width: the width of the layers
+        :param height: the height of the layers
+        :param mapped: keep the tiles of the layers in memory-mapped scratch files instead of memory
+        :param palette: the palette shared by the layers if they are indexed, None for RGBA layers
+        """
+
+        self.width = width
+        self.height = height
+        self.mapped = mapped
+        self.palette = palette
+
+        self.layers = []
+        self.active = 0
+
+        self.count = 0
+
+        # The selection that the changes of every layer are kept inside, None if there is no selection
+        self.selection = None
+
+        # The flattened layers below and above the active layer and the final image
+        self.below = self.new_image()
+        self.above = self.new_image()
+        self.composite = self.new_image()
+
+        # Counts the changes of the composite, to know if what was made from it is still good
+        self.version = 0
+
+    def new_image(self) -> TiledImage:
+        """
+        Function used to create an empty image with the size of the layers.
+
+        :return: the image
+        """
+
+        return TiledImage(self.width, self.height, mapped=self.mapped)
+
+    def new_layer_image(self) -> TiledImage:
+        """
+        Function used to create an empty image for a layer, indexed if the stack has a palette.
+        The flattened images are always RGBA, they are only read to be painted.
+
+        :return: the image
+        """
+
+        if self.palette is not None:
+            return IndexedImage(self.width, self.height, self.palette, mapped=self.mapped)
+
+        return self.new_image()
+
+    def duplicate(self, empty: bool = False) -> "LayerStack":
+        """
+        Function used to copy the stack with its layers and their properties.
+        The copied layers share their tiles with the layers of the stack, a tile is copied only when it is changed.
+
+        :param empty: copy the layers without their pixels
+        :return: the copy
+        """
+
+        stack = LayerStack(self.width, self.height, self.mapped, self.palette)
+
+        for layer in self.layers:
+            copy = Layer(layer.name, stack.new_layer_image() if empty else layer.image.share())
+            copy.visible, copy.opacity, copy.blend_mode = layer.visible, layer.opacity, layer.blend_mode
+            stack.layers.append(copy)
+
+        stack.active = self.active
+        stack.count = self.count
+
+        stack.rebuild()
+
+        return stack
+
+    @property
+    def active_layer(self) -> Layer:
+        """
+        Function used to get the layer that is drawn on.
+
+        :return: the active layer
+        """
+
+        return self.layers[self.active]
+
+    def add_layer(self, image: TiledImage = None) -> None:
+        """
+        Function used to add a layer above the active layer, the new layer becomes the active one.
+
+        :param image: the pixels of the layer, an empty image if None
+        :return: None
+        """
+
+        self.count += 1
+
+        layer = Layer(f"Layer {self.count}", image if image is not None else self.new_layer_image())
+        layer.image.selection = self.selection
+
+        if not self.layers:
+            self.layers.append(layer)
+        else:
+            self.active += 1
+            self.layers.insert(self.active, layer)
+
+        self.rebuild()
+
+    def set_selection(self, selection) -> None:
+        """
+        Function used to change the selection, the layers can be changed only inside it.
+
+        :param selection: the selection or None to allow the changes everywhere
+        :return: None
+        """
+
+        self.selection = selection
+
+        for layer in self.layers:
+            layer.image.selection = selection
+
+    def transform(self, function) -> None:
+        """
+        Function used to change the geometry of every layer, the size of the stack becomes the size of the new images.
+        The selection is dropped, it doesn't match the new pixels.
+
+        :param function: a function from a layer to its new image
+        :return: None
+        """
+
+        for layer in self.layers:
+            layer.image = function(layer)
+            layer.image.selection = None
+
+        self.selection = None
+        self.width, self.height = self.layers[0].image.width, self.layers[0].image.height
+
+        self.rebuild()
+
+    def set_palette_color(self, index: int, color: tuple) -> None:
+        """
+        Function used to change a color of the palette, the layers keep their indices and only the flattened
+        images are made again.
+
+        :param index: the index of the entry
+        :param color: the (r, g, b, a) new color
+        :return: None
+        """
+
+        if self.palette is None:
+            return
+
+        self.palette.set_color(index, color)
+        self.rebuild()
+
+    def remove_layer(self, index: int) -> None:
+        """
+        Function used to delete a layer, the last layer can't be deleted.
+
+        :param index: the index of the layer
+        :return: None
+        """
+
+        if len(self.layers) == 1:
+            return
+
+        del self.layers[index]
+
+        self.active = min(self.active if self.active < index else self.active - 1, len(self.layers) - 1)
+        self.active = max(self.active, 0)
+
+        self.rebuild()
+
+    def move_layer(self, index: int, offset: int) -> None:
+        """
+        Function used to move a layer up or down in the stack.
+
+        :param index: the index of the layer
+        :param offset: +1 to move it up, -1 to move it down
+        :return: None
+        """
+
+        target = index + offset
+
+        if not 0 <= target < len(self.layers):
+            return
+
+        self.layers[index], self.layers[target] = self.layers[target], self.layers[index]
+
+        # The active layer follows its position
+        if self.active == index:
+            self.active = target
+        elif self.active == target:
+            self.active = index
+
+        self.rebuild()
+
+    def set_active(self, index: int) -> None:
+        """
+        Function used to change the layer that is drawn on.
+
+        :param index: the index of the layer
+        :return: None
+        """
+
+        if index != self.active and 0 <= index < len(self.layers):
+            self.active = index
+            self.rebuild()
+
+    def set_visible(self, index: int, visible: bool) -> None:
+        """
+        Function used to show or hide a layer.
+
+        :param index: the index of the layer
+        :param visible: self explanatory
+        :return: None
+        """
+
+        self.layers[index].visible = visible
+        self.layer_changed(index)
+
+    def set_opacity(self, index: int, opacity: float) -> None:
+        """
+        Function used to change the opacity of a layer.
+
+        :param index: the index of the layer
+        :param opacity: the opacity, between 0 and 1
+        :return: None
+        """
+
+        self.layers[index].opacity = opacity
+        self.layer_changed(index)
+
+    def set_blend_mode(self, index: int, mode: Blends) -> None:
+        """
+        Function used to change how a layer is blended with the layers below.
+
+        :param index: the index of the layer
+        :param mode: the blend mode
+        :return: None
+        """
+
+        self.layers[index].blend_mode = mode
+        self.layer_changed(index)
+
+    def layer_changed(self, index: int) -> None:
+        """
+        Function used to update the composite after a property of a layer was changed.
+        The flattened layers are still good if the active layer changed, it is enough to blend it again.
+
+        :param index: the index of the layer
+        :return: None
+        """
+
+        if index != self.active or not self.above_is_flat():
+            self.rebuild()
+            return
+
+        for x, y, width, height in self.used_tiles():
+            self.refresh(x, y, width, height)
+
+    def above_is_flat(self) -> bool:
+        """
+        Function used to check if the layers above the active layer can be used flattened.
+        Flattening is exact only for normal layers, the other modes depend on the image below them.
+
+        :return: True if all visible layers above the active layer use the normal mode
+        """
+
+        return all(layer.blend_mode == Blends.NORMAL for layer in self.layers[self.active + 1:] if layer.visible)
+
+    def used_keys(self) -> set:
+        """
+        Function used to find the tiles allocated in any layer.
+
+        :return: a set of (tx, ty) of the tiles
+        """
+
+        keys = set()
+        for layer in self.layers:
+            keys.update(layer.image.tiles)
+
+        return keys
+
+    def used_tiles(self):
+        """
+        Function used to find the tiles allocated in any layer.
+
+        :return: a list of (x, y, width, height) of the tiles
+        """
+
+        return [self.composite.tile_bounds(tx, ty) for tx, ty in self.used_keys()]
+
+    def flatten(self, layers: list, x: int, y: int, width: int, height: int) -> np.ndarray:
+        """
+        Function used to blend a list of layers over a rectangle, from the first to the last one.
+
+        :param layers: the layers
+        :param x: the left of the rectangle
+        :param y: the top of the rectangle
+        :param width: self explanatory
+        :param height: self explanatory
+        :return: an RGBA array with the shape (height, width, 4)
+        """
+
+        pixels = np.zeros((height, width, 4), np.uint8)
+
+        for layer in layers:
+            if layer.visible:
+                pixels = blend(pixels, layer.image.read(x, y, width, height), layer.blend_mode, layer.opacity)
+
+        return pixels
+
+    def rebuild(self) -> None:
+        """
+        Function used to flatten again the layers below and above the active layer and the composite.
+        This is done tile by tile, only for the tiles allocated in some layer.
+
+        :return: None
+        """
+
+        self.below = self.new_image()
+        self.above = self.new_image()
+        self.composite = self.new_image()
+        self.version += 1
+
+        flat = self.above_is_flat()
+
+        # All the changes of the layers are part of the new composite
+        for layer in self.layers:
+            layer.image.dirty.clear()
+
+        visible = [layer for layer in self.layers if layer.visible]
+
+        for key in self.used_keys():
+            owners = [layer for layer in visible if key in layer.image.tiles]
+
+            # Where a single opaque layer is visible it is the composite as it is, whatever its blend mode
+            if len(owners) == 1 and owners[0].opacity >= 1:
+                self.copy_tile(owners[0], key, flat)
+                continue
+
+            x, y, width, height = self.composite.tile_bounds(*key)
+
+            self.below.write(x, y, self.flatten(self.layers[:self.active], x, y, width, height))
+
+            if flat:
+                self.above.write(x, y, self.flatten(self.layers[self.active + 1:], x, y, width, height))
+
+            self.refresh(x, y, width, height)
+
+    def copy_tile(self, layer: Layer, key: tuple, flat: bool) -> None:
+        """
+        Function used to use the tile of the only visible layer of a place for the flattened images.
+
+        :param layer: the layer
+        :param key: the (tx, ty) of the tile
+        :param flat: the layers above the active layer are flattened
+        :return: None
+        """
+
+        pixels = layer.image.decode(layer.image.tiles[key])
+        index = self.layers.index(layer)
+
+        self.composite.get_tile(*key, True)[...] = pixels
+        self.composite.dirty.add(key)
+
+        if index < self.active:
+            self.below.get_tile(*key, True)[...] = pixels
+        elif index > self.active and flat:
+            self.above.get_tile(*key, True)[...] = pixels
+
+    def refresh_dirty(self) -> None:
+        """
+        Function used to blend again the tiles of the active layer that were changed since the last call.
+
+        :return: None
+        """
+
+        layer = self.active_layer
+        image = layer.image
+
+        if image.dirty:
+            self.version += 1
+
+        # Where the active layer is alone it is its own composite, as long as it is opaque
+        alone = layer.visible and layer.opacity >= 1
+        others = [other.image.tiles for other in self.layers if other is not layer and other.visible]
+
+        for key in image.dirty:
+            if alone and not any(key in tiles for tiles in others):
+                tile = image.tiles.get(key)
+                if tile is None:
+                    self.composite.tiles.pop(key, None)
+                else:
+                    self.composite.get_tile(*key, True)[...] = image.decode(tile)
+                self.composite.dirty.add(key)
+            else:
+                self.refresh(*image.tile_bounds(*key))
+
+        image.dirty.clear()
+
+    def refresh(self, x: int, y: int, width: int, height: int) -> None:
+        """
+        Function used to blend again a rectangle of the active layer between the flattened layers.
+
+        :param x: the left of the rectangle
+        :param y: the top of the rectangle
+        :param width: self explanatory
+        :param height: self explanatory
+        :return: None
+        """
+
+        layer = self.active_layer
+
+        pixels = self.below.read(x, y, width, height)
+
+        if layer.visible:
+            pixels = blend(pixels, layer.image.read(x, y, width, height), layer.blend_mode, layer.opacity)
+
+        if self.above_is_flat():
+            pixels = blend(pixels, self.above.read(x, y, width, height))
+        else:
+            # The layers above have to be blended one by one
+            for above in self.layers[self.active + 1:]:
+                if above.visible:
+                    pixels = blend(pixels, above.image.read(x, y, width, height), above.blend_mode, above.opacity)
+
+        self.composite.write(x, y, pixels)
+        self.version += 1
@@ -6,7 +6,6 @@ from Source.UI.MainWindow import MainWindow
 
 
 def main():
-    sys.setrecursionlimit(2350)
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
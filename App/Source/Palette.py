@@ -0,0 +1,191 @@
+import numpy as np
+
+# The colors a palette starts with, after the transparent entry
+COLORS = [
+    '#ffffff', '#010000', '#ff0000', '#0000ff', '#00ff00', '#ffff00', '#00ffff', '#ff00ff',
+    '#c0c0c0', '#404040', '#800000', '#000080', '#008000', '#ff4500', '#008080', '#9400d3'
+]
+
+# The number of entries of a palette, an index fits in a byte
+PALETTE_SIZE = 256
+
+# The entry of the transparent pixels, it can't be changed
+TRANSPARENT = 0
+
+# The number of colors compared with the palette at once, it bounds the memory of the distances
+NEAREST_COLORS = 65536
+
+
+def hex_to_rgba(color: str) -> tuple:
+    """
+    Function used to convert a hexadecimal color to an opaque RGBA color.
+
+    :param color: the color as #rrggbb
+    :return: the (r, g, b, a) color
+    """
+
+    return int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16), 255
+
+
+class Palette:
+    """
+    This class holds the colors of an indexed image, up to 256 RGBA colors, as a lookup table from index to color.
+    The first entry is always transparent, so the empty parts of an indexed image are zeros like in an RGBA image.
+    """
+
+    def __init__(self, colors: list = None):
+        """
+        Class constructor.
+
+        :param colors: the (r, g, b, a) colors after the transparent entry
+        """
+
+        # The lookup table, the unused entries are transparent
+        self.colors = np.zeros((PALETTE_SIZE, 4), np.uint8)
+        self.count = 1
+
+        for color in colors or []:
+            self.add(color)
+
+    @classmethod
+    def from_hex(cls, colors: list) -> "Palette":
+        """
+        Function used to create a palette from hexadecimal colors.
+
+        :param colors: the colors as #rrggbb
+        :return: the palette
+        """
+
+        return cls([hex_to_rgba(color) for color in colors])
+
+    @property
+    def words(self) -> np.ndarray:
+        """
+        Function used to get the lookup table with every color as a 32 bit word, a lookup copies 4 bytes at once.
+
+        :return: an array with the shape (256,) that shares the memory of the colors
+        """
+
+        return self.colors.view(np.uint32)[:, 0]
+
+    def color(self, index: int) -> tuple:
+        """
+        Function used to get a color of the palette.
+
+        :param index: the index of the entry
+        :return: the (r, g, b, a) color
+        """
+
+        return tuple(int(channel) for channel in self.colors[index])
+
+    def add(self, color: tuple) -> int:
+        """
+        Function used to add a color at the end of the palette.
+
+        :param color: the (r, g, b, a) color
+        :return: the index of the color, or the index of the nearest color if the palette is full
+        """
+
+        if self.count == PALETTE_SIZE:
+            return self.nearest(np.array([color], np.uint8))[0]
+
+        self.colors[self.count] = color
+        self.count += 1
+
+        return self.count - 1
+
+    def set_color(self, index: int, color: tuple) -> None:
+        """
+        Function used to change an entry of the palette, the pixels with this index change color with it.
+
+        :param index: the index of the entry
+        :param color: the (r, g, b, a) new color
+        :return: None
+        """
+
+        if index != TRANSPARENT and index < self.count:
+            self.colors[index] = color
+
+    def nearest(self, colors: np.ndarray) -> np.ndarray:
+        """
+        Function used to find the entries of the palette closest to some colors.
+
+        :param colors: an array with the shape (n, 4)
+        :return: the indices of the entries, the transparent entry is used only for transparent colors
+        """
+
+        entries = self.colors[1:self.count].astype(np.float32)
+        lengths = (entries ** 2).sum(axis=1)
+
+        indices = np.empty(len(colors), np.uint8)
+
+        # The squared distance between a color and an entry without the length of the color, which is the same for
+        # all the entries, the alpha counts as much as the other channels, the sums are exact in float32
+        for start in range(0, len(colors), NEAREST_COLORS):
+            part = colors[start:start + NEAREST_COLORS].astype(np.float32)
+            distances = lengths[None, :] - 2 * (part @ entries.T)
+            indices[start:start + NEAREST_COLORS] = np.argmin(distances, axis=1) + 1
+
+        indices[colors[:, 3] == 0] = TRANSPARENT
+
+        return indices
+
+    def encode(self, pixels: np.ndarray) -> np.ndarray:
+        """
+        Function used to convert RGBA pixels to indices of the palette.
+        Every distinct color is looked up once, the new colors are added while there is room
+        and the ones that don't fit anymore get the nearest entry.
+
+        :param pixels: an array with the shape (height, width, 4)
+        :return: an array of indices with the shape (height, width)
+        """
+
+        words = np.ascontiguousarray(pixels).view(np.uint32)[..., 0]
+
+        # All transparent pixels are the transparent entry, whatever their color
+        words = np.where(pixels[..., 3] == 0, 0, words)
+
+        unique, inverse = np.unique(words, return_inverse=True)
+
+        # Find the distinct colors that are already in the palette
+        entries = self.words[:self.count]
+        order = np.argsort(entries, kind="stable")
+        positions = np.minimum(np.searchsorted(entries[order], unique), self.count - 1)
+
+        indices = order[positions].astype(np.uint8)
+        found = entries[indices] == unique
+
+        # Add the new colors in the order they were found
+        missing = np.flatnonzero(~found)
+        added = min(len(missing), PALETTE_SIZE - self.count)
+
+        if added:
+            self.colors[self.count:self.count + added] = unique[missing[:added]].view(np.uint8).reshape(-1, 4)
+            indices[missing[:added]] = np.arange(self.count, self.count + added)
+            self.count += added
+
+        if added < len(missing):
+            rest = missing[added:]
+            indices[rest] = self.nearest(unique[rest].view(np.uint8).reshape(-1, 4))
+
+        return indices[inverse].reshape(words.shape)
+
+    def encode_color(self, color: tuple) -> int:
+        """
+        Function used to get the index of a single color.
+
+        :param color: the (r, g, b, a) color
+        :return: the index
+        """
+
+        return int(self.encode(np.array([[color]], np.uint8))[0, 0])
+
+    def decode(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Function used to convert indices of the palette to RGBA pixels, with a single lookup in the table.
+
+        :param indices: an array of indices with the shape (height, width)
+        :return: an array with the shape (height, width, 4)
+        """
+
+        return self.words[indices].view(np.uint8).reshape(indices.shape + (4,))
@@ -0,0 +1,114 @@
+from math import gcd
+
+import numpy as np
+
+from Source.Scale import as_words
+
+# The whole runs each axis needs before its grid is trusted, a few shapes can line up on a grid by chance
+MIN_GRID_RUNS = 4
+
+
+def changes(words: np.ndarray, axis: int) -> np.ndarray:
+    """
+    Function used to find where the color changes along an axis, in any row or column.
+
+    :param words: the pixels as 32 bit words, an array with the shape (height, width)
+    :param axis: 1 to find the columns that differ from the previous one, 0 for the rows
+    :return: the sorted positions of the columns or rows that start a new run of colors
+    """
+
+    if axis == 1:
+        changed = np.any(words[:, 1:] != words[:, :-1], axis=0)
+    else:
+        changed = np.any(words[1:] != words[:-1], axis=1)
+
+    return np.flatnonzero(changed) + 1
+
+
+def detect_grid(images) -> tuple:
+    """
+    Function used to find the scale and the offset of the grid shared by the frames of an upscaled pixel art.
+    Every run of colors between two changes, in the rows and in the columns, is a multiple of the scale, so the scale
+    is the greatest common divisor of the distances between the changes. The changes of every frame sit on the same
+    grid, so the distances are taken from the first change of the first frame, and the frames are looked at until
+    the scale is 1. The runs cut by the edges of the image are left out, so a grid that doesn't start at the corner
+    is found too.
+    A grid found from a few runs is only a guess, a single square or a thick line of a pixel art at 1x can happen to
+    sit on a grid.
+
+    :param images: an iterable of arrays with the shape (height, width, 4), the frames
+    :return: (scale, x offset, y offset, sure) the scale is 1 if the frames aren't made of bigger pixels, sure is True
+    if both axes have at least MIN_GRID_RUNS whole runs
+    """
+
+    # For the columns and the rows, the first change, the gcd of the distances from it and the changes found
+    firsts = [None, None]
+    divisors = [0, 0]
+    found = [set(), set()]
+
+    for pixels in images:
+        words = as_words(pixels)
+
+        for axis, positions in enumerate((changes(words, 1), changes(words, 0))):
+            if not len(positions):
+                continue
+
+            if firsts[axis] is None:
+                firsts[axis] = int(positions[0])
+
+            divisors[axis] = gcd(divisors[axis], int(np.gcd.reduce(np.abs(positions - firsts[axis]))))
+            found[axis].update(positions.tolist())
+
+        # The pixels aren't bigger than 1, the frames left can't change that
+        if gcd(*divisors) == 1:
+            return 1, 0, 0, False
+
+    # An axis with less than two changes tells nothing about the scale
+    scale = gcd(*divisors)
+    if scale == 0:
+        return 1, 0, 0, False
+
+    # Each axis starts its grid at its first change, an axis without changes is a single pixel wide
+    offsets = [first % scale if first is not None else 0 for first in firsts]
+
+    sure = all(len(positions) > MIN_GRID_RUNS for positions in found)
+
+    return (scale, *offsets, sure)
+
+
+def cell_starts(size: int, scale: int, offset: int) -> np.ndarray:
+    """
+    Function used to find the first row or column of every cell of the grid, the cells at the edges can be cut.
+
+    :param size: the width or the height of the image
+    :param scale: the size of the cells
+    :param offset: the start of the first whole cell
+    :return: the positions of the cells
+    """
+
+    starts = np.arange(offset, size, scale)
+
+    return starts if offset == 0 else np.concatenate(([0], starts))
+
+
+def reduce_grid(pixels: np.ndarray, scale: int, offset_x: int = 0, offset_y: int = 0) -> np.ndarray:
+    """
+    Function used to shrink an upscaled pixel art back to one pixel for every cell of its grid.
+    The cells have a single color, so keeping a pixel of every cell loses nothing.
+
+    :param pixels: an array with the shape (height, width, 4)
+    :param scale: the size of the cells
+    :param offset_x: the start of the first whole column of cells
+    :param offset_y: the start of the first whole row of cells
+    :return: an array with the shape (rows of cells, columns of cells, 4)
+    """
+
+    if scale == 1:
+        return pixels
+
+    height, width = pixels.shape[:2]
+
+    rows = cell_starts(height, scale, offset_y)
+    columns = cell_starts(width, scale, offset_x)
+
+    return np.ascontiguousarray(pixels[rows[:, None], columns])
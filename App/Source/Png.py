@@ -0,0 +1,299 @@
+import struct
+import zlib
+
+import numpy as np
+
+from Source.PngFilters import PngFilters
+
+# The zlib level used when none is chosen, 9 is the smallest and the slowest
+COMPRESSION_LEVEL = 6
+
+# The filters that predict a byte from its neighbours, the adaptive filter chooses one of them for every row
+PREDICTORS = (PngFilters.NONE, PngFilters.SUB, PngFilters.UP, PngFilters.AVERAGE, PngFilters.PAETH)
+
+# The bytes every PNG starts with
+SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# The bytes of the IHDR chunk, the animation control of an animated PNG comes right after it
+HEADER_SIZE = 25
+
+# An animated PNG frame leaves its pixels for the next frame and replaces the pixels under it
+APNG_DISPOSE_NONE = 0
+APNG_BLEND_SOURCE = 0
+
+
+def chunk(kind: bytes, data: bytes) -> bytes:
+    """
+    Function used to build a PNG chunk.
+
+    :param kind: the 4 letters type of the chunk
+    :param data: the content of the chunk
+    :return: the chunk with its length and checksum
+    """
+
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+
+
+def bit_depth(colors: int) -> int:
+    """
+    Function used to find the fewest bits that hold the index of every color of a palette.
+
+    :param colors: the number of colors of the palette, up to 256
+    :return: 1, 2, 4 or 8
+    """
+
+    for depth in (1, 2, 4):
+        if colors <= 1 << depth:
+            return depth
+
+    return 8
+
+
+def pack_rows(indices: np.ndarray, depth: int) -> np.ndarray:
+    """
+    Function used to put several palette indices in a byte, the first one in the highest bits.
+
+    :param indices: an array with the shape (rows, width) of indices that fit in the depth
+    :param depth: the bits of every index
+    :return: an array with the shape (rows, bytes of a row)
+    """
+
+    if depth == 8:
+        return indices
+
+    per_byte = 8 // depth
+    rows, width = indices.shape
+
+    # The last byte of a row is completed with zeros
+    padded = np.zeros((rows, -(-width // per_byte) * per_byte), np.uint8)
+    padded[:, :width] = indices
+
+    shifts = np.arange(8 - depth, -1, -depth, dtype=np.uint8)
+
+    return np.bitwise_or.reduce(padded.reshape(rows, -1, per_byte) << shifts, axis=2).astype(np.uint8)
+
+
+def predict(rows: np.ndarray, above: np.ndarray, step: int, png_filter: PngFilters) -> np.ndarray:
+    """
+    Function used to apply a filter to every row of a band at once, the filters only look at the unfiltered bytes.
+
+    :param rows: an array with the shape (rows, bytes of a row)
+    :param above: the same rows moved down by one, the first one is the last row of the previous band
+    :param step: the bytes of a pixel, the byte on the left is this far
+    :param png_filter: the filter, not the adaptive one
+    :return: the filtered rows, without the filter byte
+    """
+
+    if png_filter == PngFilters.NONE:
+        return rows
+
+    if png_filter == PngFilters.UP:
+        return rows - above
+
+    left = np.zeros_like(rows)
+    left[:, step:] = rows[:, :-step]
+
+    if png_filter == PngFilters.SUB:
+        return rows - left
+
+    if png_filter == PngFilters.AVERAGE:
+        return rows - ((left.astype(np.uint16) + above) >> 1).astype(np.uint8)
+
+    upper_left = np.zeros_like(rows)
+    upper_left[:, step:] = above[:, :-step]
+
+    # Paeth predicts with the neighbour closest to left + above - upper left
+    a, b, c = (neighbour.astype(np.int16) for neighbour in (left, above, upper_left))
+    distance_a, distance_b, distance_c = np.abs(b - c), np.abs(a - c), np.abs(a + b - 2 * c)
+
+    prediction = np.where((distance_a <= distance_b) & (distance_a <= distance_c), left,
+                          np.where(distance_b <= distance_c, above, upper_left))
+
+    return rows - prediction
+
+
+def filter_rows(rows: np.ndarray, previous: np.ndarray, step: int, png_filter: PngFilters) -> np.ndarray:
+    """
+    Function used to filter a band of rows and put the type of the filter in front of every row.
+    The adaptive filter keeps, for every row, the filter whose bytes are the closest to zero.
+
+    :param rows: an array with the shape (rows, bytes of a row)
+    :param previous: the last row of the previous band, zeros for the first band
+    :param step: the bytes of a pixel, 1 for the palette indices
+    :param png_filter: the filter
+    :return: an array with the shape (rows, bytes of a row + 1)
+    """
+
+    above = np.empty_like(rows)
+    above[0] = previous
+    above[1:] = rows[:-1]
+
+    filtered = np.empty((len(rows), rows.shape[1] + 1), np.uint8)
+
+    if png_filter != PngFilters.ADAPTIVE:
+        filtered[:, 0] = png_filter.value
+        filtered[:, 1:] = predict(rows, above, step, png_filter)
+        return filtered
+
+    candidates = [predict(rows, above, step, predictor) for predictor in PREDICTORS]
+    scores = np.stack([np.abs(candidate.view(np.int8).astype(np.int32)).sum(axis=1) for candidate in candidates])
+    best = scores.argmin(axis=0)
+
+    filtered[:, 0] = [PREDICTORS[index].value for index in best]
+    for index, candidate in enumerate(candidates):
+        chosen = best == index
+        filtered[chosen, 1:] = candidate[chosen]
+
+    return filtered
+
+
+def header_chunks(width: int, height: int, palette: np.ndarray = None) -> bytes:
+    """
+    Function used to build the chunks that describe the image, the palette and the alpha of its colors.
+
+    :param width: the width of the image
+    :param height: the height of the image
+    :param palette: an array with the shape (colors, 4) of up to 256 RGBA colors, None for an RGBA image
+    :return: the IHDR chunk, followed by the PLTE and tRNS chunks with a palette
+    """
+
+    if palette is None:
+        return chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+
+    chunks = chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, bit_depth(len(palette)), 3, 0, 0, 0))
+    chunks += chunk(b"PLTE", palette[:, :3].astype(np.uint8).tobytes())
+
+    # Only the colors up to the last transparent one need an alpha, the others are opaque
+    transparent = np.flatnonzero(palette[:, 3] < 255)
+    if len(transparent):
+        chunks += chunk(b"tRNS", palette[:transparent[-1] + 1, 3].astype(np.uint8).tobytes())
+
+    return chunks
+
+
+def compressed_rows(width: int, bands, palette: np.ndarray = None, level: int = COMPRESSION_LEVEL,
+                    png_filter: PngFilters = PngFilters.UP):
+    """
+    Function used to filter and compress bands of rows, as they are produced.
+    Every band is compressed before the next one is requested, so the whole image is never in memory.
+
+    :param width: the width of the image
+    :param bands: an iterable of arrays with the shape (rows, width, 4), or (rows, width) with a palette,
+    from top to bottom
+    :param palette: an array with the shape (colors, 4) of up to 256 RGBA colors, None for an RGBA image
+    :param level: the zlib level, from 0 to 9
+    :param png_filter: the filter applied to the rows before the compression
+    :return: a generator of the compressed bytes, the last ones finish the stream
+    """
+
+    if palette is None:
+        depth, stride, step = 8, width * 4, 4
+    else:
+        depth = bit_depth(len(palette))
+        stride, step = -(-width * depth // 8), 1
+
+    compressor = zlib.compressobj(level)
+
+    previous = np.zeros(stride, np.uint8)
+
+    for band in bands:
+        rows = band.reshape(len(band), -1) if palette is None else pack_rows(band, depth)
+
+        filtered = filter_rows(rows, previous, step, png_filter)
+
+        previous = rows[-1].copy()
+
+        # The array is compressed in place, without a copy of its bytes
+        data = compressor.compress(filtered)
+        if data:
+            yield data
+
+    yield compressor.flush()
+
+
+def write_png(path: str, width: int, height: int, bands, palette: np.ndarray = None,
+              level: int = COMPRESSION_LEVEL, png_filter: PngFilters = PngFilters.UP) -> None:
+    """
+    Function used to write a PNG from bands of rows, as they are produced.
+    Every band is filtered and compressed before the next one is requested,
+    so the whole image is never in memory.
+    With a palette the rows are indices into it, packed in as few bits as the number of colors allows,
+    and the alpha of the colors is kept in a tRNS chunk.
+
+    :param path: the path of the file
+    :param width: the width of the image
+    :param height: the height of the image
+    :param bands: an iterable of arrays with the shape (rows, width, 4), or (rows, width) with a palette,
+    from top to bottom
+    :param palette: an array with the shape (colors, 4) of up to 256 RGBA colors, None for an RGBA image
+    :param level: the zlib level, from 0 to 9
+    :param png_filter: the filter applied to the rows before the compression
+    :return: None
+    """
+
+    with open(path, "wb") as file:
+        file.write(SIGNATURE)
+        file.write(header_chunks(width, height, palette))
+
+        for data in compressed_rows(width, bands, palette, level, png_filter):
+            file.write(chunk(b"IDAT", data))
+
+        file.write(chunk(b"IEND", b""))
+
+
+def write_apng(path: str, width: int, height: int, frames, palette: np.ndarray = None, loops: int = 0,
+               level: int = COMPRESSION_LEVEL, png_filter: PngFilters = PngFilters.UP) -> None:
+    """
+    Function used to write an animated PNG from its frames, as they are produced.
+    Every frame covers only a rectangle of the animation and replaces the pixels under it, transparent ones too,
+    the rest of the previous frame is kept. The first frame covers the whole image, it is what is shown by the
+    programs that don't play animations.
+    The number of frames is written at the start of the file once it is known.
+
+    :param path: the path of the file
+    :param width: the width of the image
+    :param height: the height of the image
+    :param frames: an iterable of (x, y, width, height, bands, duration) of every frame, the bands are like the
+    ones of write_png, the duration is in milliseconds
+    :param palette: an array with the shape (colors, 4) of up to 256 RGBA colors shared by the frames,
+    None for RGBA frames
+    :param loops: how many times the animation is played, 0 for ever
+    :param level: the zlib level, from 0 to 9
+    :param png_filter: the filter applied to the rows before the compression
+    :return: None
+    """
+
+    with open(path, "wb") as file:
+        header = header_chunks(width, height, palette)
+
+        file.write(SIGNATURE)
+        file.write(header[:HEADER_SIZE])
+
+        # The animation control is written again at the end, with the number of frames
+        animation_control = file.tell()
+        file.write(chunk(b"acTL", struct.pack(">II", 0, loops)))
+        file.write(header[HEADER_SIZE:])
+
+        # The frame controls and the frame data share the sequence numbers
+        sequence = 0
+        count = 0
+
+        for x, y, frame_width, frame_height, bands, duration in frames:
+            file.write(chunk(b"fcTL", struct.pack(">IIIIIHHBB", sequence, frame_width, frame_height, x, y,
+                                                  duration, 1000, APNG_DISPOSE_NONE, APNG_BLEND_SOURCE)))
+            sequence += 1
+
+            for data in compressed_rows(frame_width, bands, palette, level, png_filter):
+                # The first frame is the image itself
+                if count == 0:
+                    file.write(chunk(b"IDAT", data))
+                else:
+                    file.write(chunk(b"fdAT", struct.pack(">I", sequence) + data))
+                    sequence += 1
+
+            count += 1
+
+        file.write(chunk(b"IEND", b""))
+
+        file.seek(animation_control)
+        file.write(chunk(b"acTL", struct.pack(">II", count, loops)))
@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class PngFilters(Enum):
+    NONE = 0
+    SUB = 1
+    UP = 2
+    AVERAGE = 3
+    PAETH = 4
+    ADAPTIVE = 5
@@ -0,0 +1,341 @@
+import numpy as np
+
+from Source.Dithering import Dithering
+from Source.Quantizers import Quantizers
+
+# The bits kept of every channel by the histogram and the lookup cube, 32 levels per channel
+CUBE_BITS = 5
+CUBE_LEVELS = 1 << CUBE_BITS
+
+# Pixels less opaque than this become transparent, the others opaque
+ALPHA_THRESHOLD = 128
+
+# The thresholds of the ordered dithering, between -0.5 and 0.5
+BAYER = (np.array([
+    [0, 32, 8, 40, 2, 34, 10, 42],
+    [48, 16, 56, 24, 50, 18, 58, 26],
+    [12, 44, 4, 36, 14, 46, 6, 38],
+    [60, 28, 52, 20, 62, 30, 54, 22],
+    [3, 35, 11, 43, 1, 33, 9, 41],
+    [51, 19, 59, 27, 49, 17, 57, 25],
+    [15, 47, 7, 39, 13, 45, 5, 37],
+    [63, 31, 55, 23, 61, 29, 53, 21]
+], np.float32) + 0.5) / 64 - 0.5
+
+
+def cube_bins(rgb: np.ndarray) -> np.ndarray:
+    """
+    Function used to find the cell of the lookup cube of some colors.
+
+    :param rgb: an array with the shape (..., 3) of channels between 0 and 255
+    :return: the index of the cell of every color, with the shape (...)
+    """
+
+    bins = np.zeros(rgb.shape[:-1], np.uint16)
+
+    # Put the high bits of the channels one after the other, a channel at a time to keep the arrays small
+    for channel in range(3):
+        level = rgb[..., channel]
+        if level.dtype != np.uint8:
+            level = level.astype(np.uint8)
+
+        bins <<= CUBE_BITS
+        bins |= level >> (8 - CUBE_BITS)
+
+    return bins
+
+
+def histogram(bins: np.ndarray, rgb: np.ndarray) -> tuple:
+    """
+    Function used to reduce a lot of colors to the cells of the lookup cube they fall in.
+    Every used cell keeps the average color of its pixels, so the palette is found from a few thousand colors
+    whatever the size of the image is.
+
+    :param bins: the cells of the colors
+    :param rgb: an array with the shape (n, 3)
+    :return: (colors, weights) the average color of the used cells as floats and the number of pixels in them
+    """
+
+    size = CUBE_LEVELS ** 3
+
+    counts = np.bincount(bins, minlength=size)
+    used = np.flatnonzero(counts)
+
+    colors = np.stack([np.bincount(bins, rgb[:, channel], size)[used] for channel in range(3)], axis=1)
+
+    return colors / counts[used, None], counts[used].astype(np.float64)
+
+
+def median_cut(colors: np.ndarray, weights: np.ndarray, count: int) -> np.ndarray:
+    """
+    Function used to find a palette by cutting the box with the widest spread of colors at its median,
+    until there are enough boxes, every box gives the average of its colors.
+
+    :param colors: an array with the shape (n, 3)
+    :param weights: the number of pixels of every color
+    :param count: the number of colors of the palette
+    :return: an array with the shape (count, 3) or less if there aren't enough colors
+    """
+
+    boxes = [np.arange(len(colors))]
+
+    while len(boxes) < count:
+        # The box to cut is the one with the widest channel, the wide boxes with many pixels first
+        scores = [np.ptp(colors[box], axis=0).max() * weights[box].sum() if len(box) > 1 else -1 for box in boxes]
+        largest = int(np.argmax(scores))
+
+        if scores[largest] <= 0:
+            break
+
+        box = boxes.pop(largest)
+        channel = int(np.argmax(np.ptp(colors[box], axis=0)))
+
+        # Cut where half of the pixels are on each side
+        box = box[np.argsort(colors[box, channel], kind="stable")]
+        total = np.cumsum(weights[box])
+        middle = int(np.clip(np.searchsorted(total, total[-1] / 2), 0, len(box) - 2)) + 1
+
+        boxes += [box[:middle], box[middle:]]
+
+    return np.array([np.average(colors[box], axis=0, weights=weights[box]) for box in boxes])
+
+
+def nearest(colors: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    """
+    Function used to find the closest color of a palette for many colors at once.
+    The squared distances are computed as |c|^2 - 2 c.p + |p|^2, so most of the work is a matrix product.
+
+    :param colors: an array with the shape (n, 3)
+    :param palette: an array with the shape (k, 3)
+    :return: the index of the closest palette color of every color
+    """
+
+    colors = colors.astype(np.float32)
+    palette = palette.astype(np.float32)
+
+    distances = (palette ** 2).sum(axis=1)[None, :] - 2 * colors @ palette.T
+
+    return np.argmin(distances, axis=1)
+
+
+def k_means(colors: np.ndarray, weights: np.ndarray, palette: np.ndarray, iterations: int = 8) -> np.ndarray:
+    """
+    Function used to improve a palette by moving every palette color to the average of the colors closest to it.
+
+    :param colors: an array with the shape (n, 3)
+    :param weights: the number of pixels of every color
+    :param palette: the starting palette, an array with the shape (k, 3)
+    :param iterations: the number of times the palette colors are moved
+    :return: the palette
+    """
+
+    palette = palette.astype(np.float64)
+
+    for _ in range(iterations):
+        closest = nearest(colors, palette)
+
+        # The weighted average of the colors of every palette color, the ones without colors stay where they are
+        counts = np.bincount(closest, weights, len(palette))
+        sums = np.stack([np.bincount(closest, weights * colors[:, channel], len(palette)) for channel in range(3)],
+                        axis=1)
+
+        used = counts > 0
+        moved = sums[used] / counts[used, None]
+
+        if np.allclose(moved, palette[used], atol=0.5):
+            break
+
+        palette[used] = moved
+
+    return palette
+
+
+def lookup_cube(palette: np.ndarray) -> np.ndarray:
+    """
+    Function used to find the closest palette color for the center of every cell of the cube of colors,
+    then the closest color of any pixel is a single lookup.
+
+    :param palette: an array with the shape (k, 3)
+    :return: an array with the shape (32 ** 3,) with the index of the palette color of every cell
+    """
+
+    levels = (np.arange(CUBE_LEVELS) << (8 - CUBE_BITS)) + (1 << (7 - CUBE_BITS))
+    r, g, b = np.meshgrid(levels, levels, levels, indexing="ij")
+
+    centers = np.stack((r.ravel(), g.ravel(), b.ravel()), axis=1)
+
+    return nearest(centers, palette).astype(np.uint8)
+
+
+def floyd_steinberg(rgb: np.ndarray, palette: np.ndarray, cube: np.ndarray, opaque: np.ndarray) -> np.ndarray:
+    """
+    Function used to map colors to a palette spreading the error of every pixel to the next pixels.
+    A pixel needs the errors of its left neighbour and of the 3 pixels above it, so all the pixels with the same
+    x + 2y are independent and are done together, the image is crossed in width + 2 * height vectorized steps.
+    The pixels of a step are evenly spaced in memory and their errors go only to the next 3 steps,
+    so every step works on strided views and on a few rows of errors.
+
+    :param rgb: an array with the shape (height, width, 3)
+    :param palette: an array with the shape (k, 3)
+    :param cube: the lookup cube of the palette
+    :param opaque: a boolean array with the shape (height, width), only the opaque pixels spread their error
+    :return: the index of the palette color of every pixel, with the shape (height, width)
+    """
+
+    height, width = rgb.shape[:2]
+
+    # The pixels of a step are width - 2 apart, narrow images get some columns more
+    if width < 3:
+        padded = np.zeros((height, 3, 3), np.uint8)
+        padded[:, :width] = rgb
+        return floyd_steinberg(padded, palette, cube, np.pad(opaque, ((0, 0), (0, 3 - width))))[:, :width]
+
+    pixels = np.ascontiguousarray(rgb).reshape(-1, 3)
+    weights = opaque.reshape(-1, 1).astype(np.float32)
+    palette = palette.astype(np.float32)
+
+    indices = np.zeros(height * width, np.uint8)
+
+    # The errors received by the pixels of the next steps, by row
+    errors = np.zeros((4, height + 1, 3), np.float32)
+
+    for step in range(width + 2 * (height - 1)):
+        y0, y1 = max(0, (step - width + 2) // 2), min(height - 1, step // 2) + 1
+        pixel = slice(step + y0 * (width - 2), step + (y1 - 1) * (width - 2) + 1, width - 2)
+
+        # The errors sent out of the image are dropped with the rest once the step is done
+        received = errors[step % 4]
+        value = np.clip(pixels[pixel] + received[y0:y1], 0, 255)
+        received[...] = 0
+
+        chosen = cube[cube_bins(value)]
+        indices[pixel] = chosen
+
+        error = (value - palette[chosen]) * weights[pixel]
+
+        # The pixel on the right is in the next step, the 3 pixels below in the next 3 steps
+        errors[(step + 1) % 4, y0:y1] += error * (7 / 16)
+        errors[(step + 1) % 4, y0 + 1:y1 + 1] += error * (3 / 16)
+        errors[(step + 2) % 4, y0 + 1:y1 + 1] += error * (5 / 16)
+        errors[(step + 3) % 4, y0 + 1:y1 + 1] += error * (1 / 16)
+
+    return indices.reshape(height, width)
+
+
+def remap(rgb: np.ndarray, palette: np.ndarray, dithering: Dithering = Dithering.NONE,
+          opaque: np.ndarray = None) -> np.ndarray:
+    """
+    Function used to replace every color with the closest color of a palette.
+
+    :param rgb: an array with the shape (height, width, 3)
+    :param palette: an array with the shape (k, 3)
+    :param dithering: how the error of the replaced colors is spread
+    :param opaque: a boolean array with the opaque pixels, all of them if None
+    :return: the index of the palette color of every pixel, with the shape (height, width)
+    """
+
+    cube = lookup_cube(palette)
+
+    if dithering == Dithering.FLOYD_STEINBERG:
+        if opaque is None:
+            opaque = np.ones(rgb.shape[:2], bool)
+        return floyd_steinberg(rgb, palette, cube, opaque)
+
+    if dithering == Dithering.ORDERED:
+        # Push every pixel up or down by the threshold of its place in the matrix, about a step between colors
+        height, width = rgb.shape[:2]
+        spread = 255 / np.cbrt(len(palette))
+        offsets = np.rint(np.tile(BAYER * spread, ((height + 7) // 8, (width + 7) // 8))[:height, :width])
+
+        dithered = np.empty(rgb.shape, np.uint8)
+        for channel in range(3):
+            dithered[..., channel] = np.clip(rgb[..., channel] + offsets.astype(np.int16), 0, 255)
+
+        rgb = dithered
+
+    return cube[cube_bins(rgb)]
+
+
+def quantize(pixels: np.ndarray, count: int = 16, palette: list = None, quantizer: Quantizers = Quantizers.K_MEANS,
+             dithering: Dithering = Dithering.NONE) -> tuple:
+    """
+    Function used to reduce the colors of an image, to a number of colors or to the colors of a palette.
+    The pixels less opaque than half become transparent and the others opaque.
+
+    :param pixels: an RGBA array with the shape (height, width, 4)
+    :param count: the number of colors to find, if there is no palette
+    :param palette: the (r, g, b, a) colors to use, None to find them
+    :param quantizer: how the colors are found
+    :param dithering: how the error of the replaced colors is spread
+    :return: (pixels, colors) the new RGBA array and the (r, g, b, a) colors used
+    """
+
+    opaque = pixels[..., 3] >= ALPHA_THRESHOLD
+    rgb = pixels[..., :3]
+
+    if palette is not None:
+        colors = np.array([color[:3] for color in palette], np.float64)
+    elif not opaque.any():
+        colors = np.zeros((1, 3))
+    else:
+        # The palette is found from the histogram of the opaque pixels, about a million of them are enough
+        chosen = np.flatnonzero(opaque)
+        chosen = chosen[::max(1, len(chosen) >> 20)]
+
+        flat = rgb.reshape(-1, 3)[chosen]
+        samples, weights = histogram(cube_bins(flat), flat)
+
+        colors = median_cut(samples, weights, count)
+        if quantizer == Quantizers.K_MEANS:
+            colors = k_means(samples, weights, colors)
+
+    colors = np.clip(np.rint(colors), 0, 255).astype(np.uint8)
+
+    indices = remap(rgb, colors, dithering, opaque)
+    result = to_rgba(indices, colors, opaque)
+
+    # Only the colors that are used are kept
+    used = np.unique(indices[opaque])
+
+    return result, [tuple(int(channel) for channel in colors[index]) + (255,) for index in used]
+
+
+def to_rgba(indices: np.ndarray, colors: np.ndarray, opaque: np.ndarray) -> np.ndarray:
+    """
+    Function used to get the pixels of palette indices, the colors are copied as 32 bit words.
+
+    :param indices: the index of the palette color of every pixel, with the shape (height, width)
+    :param colors: the palette, an array with the shape (k, 3)
+    :param opaque: a boolean array with the opaque pixels, the others are transparent
+    :return: an RGBA array with the shape (height, width, 4)
+    """
+
+    words = np.zeros((len(colors), 4), np.uint8)
+    words[:, :3] = colors
+    words[:, 3] = 255
+
+    result = np.where(opaque, words.view(np.uint32)[indices, 0], 0).astype(np.uint32)
+
+    return result.view(np.uint8).reshape(indices.shape + (4,))
+
+
+def snap(pixels: np.ndarray, colors: np.ndarray) -> np.ndarray:
+    """
+    Function used to replace every color with the closest color of a palette.
+    The closest color is found once for every distinct color, which makes the lookup table of the image,
+    and the pixels take their color from it, so a palette color always stays itself.
+    The pixels less opaque than half become transparent and the others opaque.
+
+    :param pixels: an RGBA array with the shape (height, width, 4)
+    :param colors: the palette, an array with the shape (k, 3)
+    :return: the new RGBA array
+    """
+
+    opaque = pixels[..., 3] >= ALPHA_THRESHOLD
+
+    words = np.ascontiguousarray(pixels).view(np.uint32)[..., 0]
+    unique, inverse = np.unique(words, return_inverse=True)
+
+    table = nearest(unique.view(np.uint8).reshape(-1, 4)[:, :3], colors)
+
+    return to_rgba(table[inverse].reshape(words.shape), colors, opaque)
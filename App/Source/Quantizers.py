@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class Quantizers(Enum):
+    MEDIAN_CUT = 1
+    K_MEANS = 2
@@ -0,0 +1,330 @@
+import numpy as np
+
+# Spans are arrays with the shape (n, 3), every row is (y, x0, x1) and covers the pixels x0 <= x < x1 of the row y
+
+
+def line(x0: int, y0: int, x1: int, y1: int) -> tuple:
+    """
+    Function used to get the pixels of a 1 pixel wide line (Bresenham), computed for all pixels at once.
+    The line goes one pixel at a time along its longer axis and the other axis is rounded with integers only,
+    so the same two points always give the same pixels.
+
+    :param x0: the x of the first point
+    :param y0: the y of the first point
+    :param x1: the x of the second point
+    :param y1: the y of the second point
+    :return: (xs, ys) arrays with the pixels, from the first to the second point
+    """
+
+    dx, dy = x1 - x0, y1 - y0
+    steps = max(abs(dx), abs(dy))
+
+    if steps == 0:
+        return np.array([x0]), np.array([y0])
+
+    i = np.arange(steps + 1)
+
+    # Round the position on the shorter axis half away from the start, with integer arithmetic
+    if abs(dx) >= abs(dy):
+        xs = x0 + np.sign(dx) * i
+        ys = y0 + np.sign(dy) * ((2 * abs(dy) * i + abs(dx)) // (2 * abs(dx)))
+    else:
+        ys = y0 + np.sign(dy) * i
+        xs = x0 + np.sign(dx) * ((2 * abs(dx) * i + abs(dy)) // (2 * abs(dy)))
+
+    return xs, ys
+
+
+def polyline(xs: np.ndarray, ys: np.ndarray, closed: bool = False) -> tuple:
+    """
+    Function used to get the pixels of lines joining many points, all the lines are computed at once.
+    Every line has the same pixels as the one given by line.
+
+    :param xs: the x of the points
+    :param ys: the y of the points
+    :param closed: join the last point with the first one too
+    :return: (xs, ys) arrays with the pixels
+    """
+
+    xs, ys = np.asarray(xs, np.int64), np.asarray(ys, np.int64)
+
+    if closed:
+        xs, ys = np.append(xs, xs[:1]), np.append(ys, ys[:1])
+
+    x0, y0, dx, dy = xs[:-1], ys[:-1], np.diff(xs), np.diff(ys)
+
+    # Every line gives its pixels without the last one, which is the first pixel of the next line
+    steps = np.maximum(np.abs(dx), np.abs(dy))
+    lines = np.repeat(np.arange(len(steps)), steps)
+    i = np.arange(steps.sum()) - np.repeat(np.cumsum(steps) - steps, steps)
+
+    x0, y0, dx, dy, major = x0[lines], y0[lines], dx[lines], dy[lines], steps[lines]
+
+    # The same integer rounding as line, along the longer axis of every line
+    wide = np.abs(dx) >= np.abs(dy)
+    minor = np.where(wide, np.abs(dy), np.abs(dx))
+    rounded = (2 * minor * i + major) // (2 * major)
+
+    pixels_x = x0 + np.sign(dx) * np.where(wide, i, rounded)
+    pixels_y = y0 + np.sign(dy) * np.where(wide, rounded, i)
+
+    return np.append(pixels_x, xs[-1]), np.append(pixels_y, ys[-1])
+
+
+def rectangle(x0: int, y0: int, x1: int, y1: int) -> tuple:
+    """
+    Function used to get the pixels of the outline of a rectangle given by 2 opposite corners.
+
+    :param x0: the x of the first corner
+    :param y0: the y of the first corner
+    :param x1: the x of the second corner
+    :param y1: the y of the second corner
+    :return: (xs, ys) arrays with the pixels
+    """
+
+    sides = [line(x0, y0, x1, y0), line(x1, y0, x1, y1), line(x1, y1, x0, y1), line(x0, y1, x0, y0)]
+
+    return np.concatenate([xs for xs, _ in sides]), np.concatenate([ys for _, ys in sides])
+
+
+def ellipse_extents(rx: int, ry: int) -> tuple:
+    """
+    Function used to find how far an ellipse centered in (0, 0) goes on every row.
+    A pixel is inside when its center is inside the ellipse with the radii grown by half a pixel,
+    so the ellipse touches exactly the pixels at the given radii.
+
+    :param rx: the horizontal radius in pixels
+    :param ry: the vertical radius in pixels
+    :return: (dys, extents) where the row dy covers the pixels -extent <= dx <= extent
+    """
+
+    dys = np.arange(-ry, ry + 1)
+
+    extents = np.floor((rx + 0.5) * np.sqrt(np.maximum(0, 1 - (dys / (ry + 0.5)) ** 2)) + 1e-9).astype(np.int64)
+
+    return dys, extents
+
+
+def ellipse(cx: int, cy: int, rx: int, ry: int) -> np.ndarray:
+    """
+    Function used to get the outline of an ellipse, 1 pixel wide and without gaps.
+    On every row the outline covers the pixels past the end of the next row away from the center,
+    which is what a midpoint ellipse would draw, but it is computed for all rows at once.
+
+    :param cx: the x of the center
+    :param cy: the y of the center
+    :param rx: the horizontal radius in pixels
+    :param ry: the vertical radius in pixels
+    :return: the spans of the outline
+    """
+
+    rx, ry = abs(rx), abs(ry)
+
+    dys, extents = ellipse_extents(rx, ry)
+
+    # The extent of the next row away from the center (the shorter neighbour), -1 outside the ellipse
+    padded = np.concatenate(([-1], extents, [-1]))
+    inner = np.minimum(padded[:-2], padded[2:])
+
+    # The outline starts after that row ends, but always has at least the last pixel
+    starts = np.minimum(inner + 1, extents)
+
+    spans = np.concatenate((
+        np.stack((cy + dys, cx - extents, cx - starts + 1), axis=1),
+        np.stack((cy + dys, cx + starts, cx + extents + 1), axis=1)
+    ))
+
+    return merge_spans(spans)
+
+
+def filled_rectangle(x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+    """
+    Function used to get the spans of a filled rectangle given by 2 opposite corners, one span for every row.
+
+    :param x0: the x of the first corner
+    :param y0: the y of the first corner
+    :param x1: the x of the second corner
+    :param y1: the y of the second corner
+    :return: the spans of the rectangle
+    """
+
+    ys = np.arange(min(y0, y1), max(y0, y1) + 1)
+
+    return np.stack(np.broadcast_arrays(ys, min(x0, x1), max(x0, x1) + 1), axis=1)
+
+
+def filled_ellipse(cx: int, cy: int, rx: int, ry: int) -> np.ndarray:
+    """
+    Function used to get the spans of a filled ellipse, one span for every row.
+    The rows have the same extents as the outline given by ellipse, so the outline fits exactly around it.
+
+    :param cx: the x of the center
+    :param cy: the y of the center
+    :param rx: the horizontal radius in pixels
+    :param ry: the vertical radius in pixels
+    :return: the spans of the ellipse
+    """
+
+    dys, extents = ellipse_extents(abs(rx), abs(ry))
+
+    return np.stack((cy + dys, cx - extents, cx + extents + 1), axis=1)
+
+
+def polygon(xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """
+    Function used to get the spans inside a polygon with the even-odd rule, computed for all edges at once.
+    Every edge gives its crossing with the center of every row it passes, the crossings of a row are sorted
+    and taken in pairs, a pixel is inside when its center is between the crossings of a pair.
+    The vertices are the centers of pixels, so the spans follow the same pixels as the edges drawn with line.
+
+    :param xs: the x of the vertices
+    :param ys: the y of the vertices
+    :return: the spans inside the polygon, sorted by row and by start
+    """
+
+    x0 = np.asarray(xs, np.float64) + 0.5
+    y0 = np.asarray(ys, np.float64) + 0.5
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+
+    # Horizontal edges never cross the center of a row
+    keep = y0 != y1
+    x0, y0, x1, y1 = x0[keep], y0[keep], x1[keep], y1[keep]
+
+    # An edge crosses the rows whose center is in [top, bottom), so a shared vertex is counted once
+    first = np.ceil(np.minimum(y0, y1) - 0.5).astype(np.int64)
+    last = np.ceil(np.maximum(y0, y1) - 0.5).astype(np.int64)
+    counts = np.maximum(last - first, 0)
+
+    edges = np.repeat(np.arange(len(x0)), counts)
+    rows = np.repeat(first, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    crossings = x0[edges] + (rows + 0.5 - y0[edges]) * (x1[edges] - x0[edges]) / (y1[edges] - y0[edges])
+
+    # Every row has an even number of crossings, so after sorting the pairs are consecutive
+    order = np.lexsort((crossings, rows))
+    rows, crossings = rows[order], crossings[order]
+
+    starts = np.ceil(crossings[0::2] - 0.5).astype(np.int64)
+    ends = np.ceil(crossings[1::2] - 0.5).astype(np.int64)
+
+    return merge_spans(np.stack((rows[0::2], starts, ends), axis=1))
+
+
+def stamp(size: int, round_pen: bool = False) -> tuple:
+    """
+    Function used to get the shape of the pen, row by row, relative to the pixel under the cursor.
+
+    :param size: the size of the pen in pixels
+    :param round_pen: a disc if True, a square if False
+    :return: (rows, lefts, rights) arrays, the row rows[i] covers lefts[i] <= dx <= rights[i]
+    """
+
+    offsets = np.arange(size) - (size - 1) // 2
+
+    # Small pens are squares anyway
+    if not round_pen or size <= 2:
+        return offsets, np.full(size, offsets[0]), np.full(size, offsets[-1])
+
+    center = (size - 1) / 2
+    inside = (np.arange(size)[:, None] - center) ** 2 + (np.arange(size)[None, :] - center) ** 2 <= \
+        (size / 2) ** 2 - 0.5
+
+    lefts = np.argmax(inside, axis=1)
+    rights = size - 1 - np.argmax(inside[:, ::-1], axis=1)
+
+    return offsets, offsets[0] + lefts, offsets[0] + rights
+
+
+def stroke(xs: np.ndarray, ys: np.ndarray, size: int, round_pen: bool = False) -> np.ndarray:
+    """
+    Function used to draw a pen over some pixels, the result is given as row spans.
+
+    :param xs: the x of the pixels
+    :param ys: the y of the pixels
+    :param size: the size of the pen in pixels
+    :param round_pen: a disc pen if True, a square pen if False
+    :return: the spans covered by the pen
+    """
+
+    rows, lefts, rights = stamp(size, round_pen)
+
+    xs = np.asarray(xs)[:, None]
+    ys = np.asarray(ys)[:, None]
+
+    spans = np.stack(np.broadcast_arrays(ys + rows, xs + lefts, xs + rights + 1), axis=2).reshape(-1, 3)
+
+    return merge_spans(spans)
+
+
+def spans_to_points(spans: np.ndarray) -> tuple:
+    """
+    Function used to list every pixel covered by some spans.
+
+    :param spans: the spans
+    :return: (xs, ys) arrays with the pixels
+    """
+
+    lengths = spans[:, 2] - spans[:, 1]
+
+    ys = np.repeat(spans[:, 0], lengths)
+    starts = np.repeat(spans[:, 1] - np.cumsum(np.concatenate(([0], lengths[:-1]))), lengths)
+
+    return starts + np.arange(lengths.sum()), ys
+
+
+def merge_spans(spans: np.ndarray) -> np.ndarray:
+    """
+    Function used to join the spans that overlap or touch on the same row.
+
+    :param spans: the spans
+    :return: the merged spans, sorted by row and by start
+    """
+
+    spans = spans[spans[:, 1] < spans[:, 2]]
+
+    if len(spans) == 0:
+        return np.zeros((0, 3), np.int64)
+
+    spans = spans[np.lexsort((spans[:, 1], spans[:, 0]))]
+
+    # Put the rows one after the other on a single axis, far enough from each other to never touch
+    base = spans[:, 1].min()
+    width = spans[:, 2].max() - base + 2
+
+    starts = spans[:, 0] * width + (spans[:, 1] - base)
+    ends = spans[:, 0] * width + (spans[:, 2] - base)
+
+    # A new span begins where it starts after all the previous spans ended
+    reached = np.maximum.accumulate(ends)
+    new = np.concatenate(([True], starts[1:] > reached[:-1]))
+
+    indexes = np.flatnonzero(new)
+
+    merged = spans[indexes].copy()
+    merged[:, 2] = np.maximum.reduceat(spans[:, 2], indexes)
+
+    return merged
+
+
+def spans_to_rects(spans: np.ndarray) -> np.ndarray:
+    """
+    Function used to join the spans of consecutive rows that start and end at the same place into rectangles,
+    so a filled rectangle is painted with a single call instead of one call for every row.
+
+    :param spans: the spans, sorted by row
+    :return: an array with the shape (n, 4), every row is (x, y, width, height)
+    """
+
+    if len(spans) == 0:
+        return np.zeros((0, 4), np.int64)
+
+    # A new rectangle begins where the span is not right below a span with the same extent
+    new = np.ones(len(spans), bool)
+    new[1:] = (spans[1:, 0] != spans[:-1, 0] + 1) | (spans[1:, 1] != spans[:-1, 1]) | (spans[1:, 2] != spans[:-1, 2])
+
+    indexes = np.flatnonzero(new)
+    heights = np.diff(np.append(indexes, len(spans)))
+
+    first = spans[indexes]
+
+    return np.stack((first[:, 1], first[:, 0], first[:, 2] - first[:, 1], heights), axis=1)
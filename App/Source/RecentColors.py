@@ -0,0 +1,98 @@
+import json
+import os
+from collections import OrderedDict
+
+# The number of colors remembered
+RECENT_COLORS = 8
+
+# The small file where the settings are kept between the sessions
+SETTINGS_PATH = os.path.join(os.path.expanduser("~"), ".pixel_art_designer.json")
+
+
+class RecentColors:
+    """
+    This class remembers the last colors used, the least recently used color is forgotten when a new one comes.
+    Using a color moves it to the front in constant time, whatever the number of colors is.
+    """
+
+    def __init__(self, capacity: int = RECENT_COLORS):
+        """
+        Class constructor.
+
+        :param capacity: the number of colors remembered
+        """
+
+        self.capacity = capacity
+
+        # The colors from the least to the most recently used
+        self.colors = OrderedDict()
+
+    def use(self, color: str) -> bool:
+        """
+        Function used to remember that a color was used.
+
+        :param color: the hexadecimal value of the color
+        :return: True if the colors changed, False if the color was already the most recent one
+        """
+
+        if self.colors and next(reversed(self.colors)) == color:
+            return False
+
+        self.colors[color] = None
+        self.colors.move_to_end(color)
+
+        if len(self.colors) > self.capacity:
+            self.colors.popitem(last=False)
+
+        return True
+
+    def recent(self) -> list:
+        """
+        Function used to get the colors from the most recently used one.
+
+        :return: a list of hexadecimal colors
+        """
+
+        return list(reversed(self.colors))
+
+    def load(self, path: str = SETTINGS_PATH) -> None:
+        """
+        Function used to read the colors saved in the settings file, a missing or broken file is ignored.
+
+        :param path: the path of the settings file
+        :return: None
+        """
+
+        try:
+            with open(path) as file:
+                colors = json.load(file).get("recent_colors", [])
+        except (OSError, ValueError, AttributeError):
+            return
+
+        for color in reversed(colors[:self.capacity]):
+            if isinstance(color, str):
+                self.use(color)
+
+    def save(self, path: str = SETTINGS_PATH) -> None:
+        """
+        Function used to write the colors in the settings file, keeping the other settings in it.
+
+        :param path: the path of the settings file
+        :return: None
+        """
+
+        try:
+            with open(path) as file:
+                settings = json.load(file)
+            if not isinstance(settings, dict):
+                settings = {}
+        except (OSError, ValueError):
+            settings = {}
+
+        settings["recent_colors"] = self.recent()
+
+        try:
+            with open(path, "w") as file:
+                json.dump(settings, file, indent=4)
+        except OSError:
+            pass
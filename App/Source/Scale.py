@@ -0,0 +1,428 @@
+import numpy as np
+
+from Source.Scalers import Scalers
+
+# The rows around a band that a filter looks at, enough for the neighbours of every step of the biggest scale
+HALO = 4
+
+# The share of the pixels with another color around them under which the filters pick them out instead of going
+# through all of them
+SPARSE_PIXELS = 0.2
+
+# The weights of the channels in the distance between two colors, the luma matters the most
+YUV = np.array([[0.299, 0.587, 0.114],
+                [-0.169, -0.331, 0.5],
+                [0.5, -0.419, -0.081]], np.float32).T * np.array([48, 7, 6], np.float32)
+
+# The features of a color from its RGBA channels, the YUV weights and a little of the alpha
+FEATURES = np.zeros((4, 4), np.float32)
+FEATURES[:3, :3] = YUV.T
+FEATURES[3, 3] = 0.2
+
+
+def as_words(pixels: np.ndarray) -> np.ndarray:
+    """
+    Function used to view RGBA pixels as 32 bit words, so two colors are compared with a single comparison.
+
+    :param pixels: a contiguous array with the shape (height, width, 4)
+    :return: an array with the shape (height, width)
+    """
+
+    return np.ascontiguousarray(pixels).view(np.uint32)[..., 0]
+
+
+def neighbours(words: np.ndarray, radius: int = 1):
+    """
+    Function used to get the neighbours of every pixel as shifted views of the image, the edges are repeated.
+
+    :param words: an array with the shape (height, width)
+    :param radius: the distance of the farthest neighbours
+    :return: a function from (dx, dy) to the array of the neighbours at that offset
+    """
+
+    height, width = words.shape
+    padded = np.pad(words, radius, mode="edge")
+
+    return lambda dx, dy: padded[radius + dy:radius + dy + height, radius + dx:radius + dx + width]
+
+
+def interleave(parts: list, factor: int) -> np.ndarray:
+    """
+    Function used to put together the sub-pixels of every pixel.
+
+    :param parts: factor * factor arrays with the shape (height, width), row by row
+    :param factor: the number of sub-pixels on a side
+    :return: an array with the shape (height * factor, width * factor)
+    """
+
+    height, width = parts[0].shape
+
+    result = np.empty((height, factor, width, factor), parts[0].dtype)
+    for index, part in enumerate(parts):
+        result[:, index // factor, :, index % factor] = part
+
+    return result.reshape(height * factor, width * factor)
+
+
+def epx(e: np.ndarray, b: np.ndarray, d: np.ndarray, f: np.ndarray, h: np.ndarray) -> list:
+    """
+    Function used to split pixels in 2 by 2 sub-pixels with the Scale2x (EPX) rules, a sub-pixel takes the color
+    of two neighbours when they agree, so the diagonal edges stay sharp instead of becoming stairs.
+
+    :param e: the pixels, an array with the shape (height, width)
+    :param b: the neighbours above
+    :param d: the neighbours on the left
+    :param f: the neighbours on the right
+    :param h: the neighbours below
+    :return: the 4 sub-pixels, row by row
+    """
+
+    # Only where the pixel is not in a straight edge
+    corner = (b != h) & (d != f)
+
+    return [np.where(corner & (d == b), d, e),
+            np.where(corner & (b == f), f, e),
+            np.where(corner & (d == h), d, e),
+            np.where(corner & (h == f), f, e)]
+
+
+def scale2x(pixels: np.ndarray) -> np.ndarray:
+    """
+    Function used to double an image with the Scale2x (EPX) rules.
+
+    :param pixels: an array with the shape (height, width, 4)
+    :return: an array with the shape (height * 2, width * 2, 4)
+    """
+
+    words = as_words(pixels)
+    near = neighbours(words)
+
+    parts = epx(words, near(0, -1), near(-1, 0), near(1, 0), near(0, 1))
+
+    return interleave(parts, 2).view(np.uint8).reshape(pixels.shape[0] * 2, pixels.shape[1] * 2, 4)
+
+
+def scale4x(pixels: np.ndarray) -> np.ndarray:
+    """
+    Function used to scale an image by 4 with the Scale4x rules, Scale2x applied twice, in a single pass.
+    The sub-pixels of the first pass are kept as 4 arrays the size of the image, the neighbours of a sub-pixel are
+    the other sub-pixels of its pixel or the sub-pixels of the pixels around, so the second pass runs on them
+    without putting the doubled image together. Where the 4 neighbours of a pixel have its color, the sub-pixels
+    around it have it too and the second pass can't change it, so only the other pixels go through it.
+
+    :param pixels: an array with the shape (height, width, 4)
+    :return: an array with the shape (height * 4, width * 4, 4)
+    """
+
+    words = as_words(pixels)
+    height, width = words.shape
+    near = neighbours(words)
+
+    b, d, f, h = near(0, -1), near(-1, 0), near(1, 0), near(0, 1)
+    parts = epx(words, b, d, f, h)
+
+    # The pixels that have another color around them
+    changing = (b != words) | (d != words) | (f != words) | (h != words)
+
+    if changing.mean() < SPARSE_PIXELS:
+        # The other pixels keep their color in every sub-pixel
+        result = np.repeat(np.repeat(words, 4, axis=1), 4, axis=0).reshape(height, 4, width, 4)
+
+        indices = np.flatnonzero(changing)
+
+        # The index in the result of the first sub-pixel of every pixel
+        ys, xs = np.divmod(indices, width)
+        corners = ys * (16 * width) + xs * 4
+
+        def take(values):
+            return values.ravel()[indices]
+
+        def put(values, y, x):
+            result.ravel()[corners + (y * width * 4 + x)] = values
+    else:
+        result = np.empty((height, 4, width, 4), np.uint32)
+
+        # Picking the pixels would cost more than it saves, all of them go through the second pass
+        def take(values):
+            return values
+
+        def put(values, y, x):
+            result[:, y, :, x] = values
+
+    def part(row, column):
+        return parts[row * 2 + column]
+
+    def beside(values, edge, dx, dy):
+        # The sub-pixels of the pixels at an offset, past the edges the doubled image repeats its own sub-pixels
+        if dy:
+            rows = (values[1:], edge[-1:]) if dy > 0 else (edge[:1], values[:-1])
+            return np.concatenate(rows, axis=0)
+
+        columns = (values[:, 1:], edge[:, -1:]) if dx > 0 else (edge[:, :1], values[:, :-1])
+        return np.concatenate(columns, axis=1)
+
+    for row in (0, 1):
+        for column in (0, 1):
+            e = part(row, column)
+
+            b = part(0, column) if row else beside(part(1, column), e, 0, -1)
+            h = beside(part(0, column), e, 0, 1) if row else part(1, column)
+            d = part(row, 0) if column else beside(part(row, 1), e, -1, 0)
+            f = beside(part(row, 0), e, 1, 0) if column else part(row, 1)
+
+            quarters = epx(*(take(values) for values in (e, b, d, f, h)))
+
+            # The sub-pixels of the second pass in the quarter of the pixel of the first pass sub-pixel
+            for index, values in enumerate(quarters):
+                put(values, row * 2 + index // 2, column * 2 + index % 2)
+
+    return result.view(np.uint8).reshape(height * 4, width * 4, 4)
+
+
+def scale3x(pixels: np.ndarray) -> np.ndarray:
+    """
+    Function used to triple an image with the Scale3x rules, the extension of Scale2x to 3 by 3 sub-pixels.
+
+    :param pixels: an array with the shape (height, width, 4)
+    :return: an array with the shape (height * 3, width * 3, 4)
+    """
+
+    e = as_words(pixels)
+    near = neighbours(e)
+
+    a, b, c = near(-1, -1), near(0, -1), near(1, -1)
+    d, f = near(-1, 0), near(1, 0)
+    g, h, i = near(-1, 1), near(0, 1), near(1, 1)
+
+    corner = (b != h) & (d != f)
+    db, bf, dh, hf = corner & (d == b), corner & (b == f), corner & (d == h), corner & (h == f)
+
+    parts = [np.where(db, d, e),
+             np.where((db & (e != c)) | (bf & (e != a)), b, e),
+             np.where(bf, f, e),
+             np.where((db & (e != g)) | (dh & (e != a)), d, e),
+             e,
+             np.where((bf & (e != i)) | (hf & (e != c)), f, e),
+             np.where(dh, d, e),
+             np.where((dh & (e != i)) | (hf & (e != g)), h, e),
+             np.where(hf, f, e)]
+
+    return interleave(parts, 3).view(np.uint8).reshape(pixels.shape[0] * 3, pixels.shape[1] * 3, 4)
+
+
+def mix(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """
+    Function used to blend two colors half and half, weighted by their alpha so a transparent color doesn't
+    darken the other one.
+
+    :param first: the channels of the colors, one plane for every channel, an array with the shape (4, colors)
+    :param second: an array with the same shape
+    :return: the blended colors, an array with the shape (colors, 4)
+    """
+
+    weights = first[3] + second[3]
+    color = (first[:3] * first[3] + second[:3] * second[3]) / np.maximum(weights, 1)
+
+    result = np.empty((len(first[0]), 4), np.uint8)
+    result[:, :3] = np.rint(np.where(weights > 0, color, first[:3])).T
+    result[:, 3] = np.rint(weights / 2)
+
+    return result
+
+
+def xbr(pixels: np.ndarray, factor: int = 2) -> np.ndarray:
+    """
+    Function used to scale an image by an even factor with the xBR rules, the edges are followed and smoothed.
+    For every corner of a pixel the differences along the two diagonals through it are compared, and when an edge
+    crosses the corner it cuts the corner of the scaled pixel from the middle of a side to the middle of the other.
+    The sub-pixels past the cut take the color of the closest neighbour on the edge and the sub-pixels on the cut
+    a blend of both, at 2x that's the corner sub-pixel blended.
+    The edges are found once on the pixels of the image, whatever the factor, and the differences between
+    neighbours are computed once for the whole image, the four corners look them up at mirrored offsets. A corner
+    can only be crossed where some colors differ around it, so when few colors differ only those corners are scored.
+
+    :param pixels: an array with the shape (height, width, 4)
+    :param factor: the scale, an even number
+    :return: an array with the shape (height * factor, width * factor, 4)
+    """
+
+    height, width = pixels.shape[:2]
+
+    padded = np.pad(pixels, ((2, 2), (2, 2), (0, 0)), mode="edge")
+
+    # The pixels are looked up by their index in the padded image, a neighbour is at a fixed offset from a pixel
+    stride = width + 4
+    words = as_words(padded).ravel()
+
+    def channels(indices):
+        # The channels of some pixels, one plane for every channel
+        return words[indices].view(np.uint8).reshape(-1, 4).T.astype(np.float32, order="C")
+
+    # The pixels whose neighbour on the right, below, below right or below left has another color, and the
+    # difference between their colors, zero elsewhere. The neighbours past the end of a row wrap around to the next
+    # row, but they are in the padding and never looked up.
+    changes = {}
+    differences = {}
+
+    for step in (1, stride, stride + 1, stride - 1):
+        changes[step] = np.zeros(len(words), bool)
+        np.not_equal(words[:-step], words[step:], out=changes[step][:-step])
+
+    # Picking the pixels where the colors change costs more than it saves when most of them do
+    sparse = changes[1].mean() < SPARSE_PIXELS
+
+    planes = None if sparse else channels(slice(None))
+
+    for step in changes:
+        if sparse:
+            indices = np.flatnonzero(changes[step])
+            first, second = channels(indices), channels(indices + step)
+        else:
+            indices = slice(0, -step)
+            first, second = planes[:, :-step], planes[:, step:]
+
+        delta = FEATURES @ (first - second)
+        np.abs(delta, out=delta)
+
+        differences[step] = np.zeros(len(words), np.float32)
+        differences[step][indices] = delta[0] + delta[1] + delta[2] + delta[3]
+
+    # The pixels from the first one of the image to the last one, the padding between the rows is left out
+    length = (height - 1) * stride + width
+    inside = np.zeros((height, stride), bool)
+    inside[:, :width] = True
+    inside = inside.ravel()[:length]
+
+    def offset(pixel):
+        return pixel[1] * stride + pixel[0]
+
+    def shifted(maps, first, second):
+        step = offset(second) - offset(first)
+
+        # A step to the left or up is the step from the other pixel
+        if step < 0:
+            step, first = -step, second
+
+        start = 2 * stride + 2 + offset(first)
+        return maps[step][start:start + length]
+
+    # The sub-pixels cut by an edge, as steps from the corner towards the middle of the pixel, and if they are
+    # past the cut
+    cut = [(x, y, x + y < factor // 2 - 1) for y in range(factor // 2) for x in range(factor // 2 - y)]
+
+    # Every sub-pixel is the pixel, unless an edge crosses its corner
+    result = np.repeat(np.repeat(as_words(pixels), factor, axis=1), factor, axis=0).reshape(height, factor, width,
+                                                                                          factor)
+
+    for row, sy in enumerate((-1, 1)):
+        for column, sx in enumerate((-1, 1)):
+            e, b, d, f, h = (0, 0), (0, -sy), (-sx, 0), (sx, 0), (0, sy)
+            c, g, i = (sx, -sy), (-sx, sy), (sx, sy)
+            f4, h5, i4, i5 = (2 * sx, 0), (0, 2 * sy), (2 * sx, sy), (sx, 2 * sy)
+
+            across = ((e, i), (h, d), (h, i5), (f, i4), (f, b))
+
+            # The difference across the other diagonal is zero where none of its colors differ, so the edge can't win
+            if sparse:
+                candidates = shifted(changes, *across[0]) & inside
+                for first, second in across[1:]:
+                    candidates |= shifted(changes, first, second)
+
+                picked = np.flatnonzero(candidates & inside)
+            else:
+                picked = slice(None)
+
+            def gather(first, second):
+                return shifted(differences, first, second)[picked]
+
+            # The differences across the edge through the corner and across the other diagonal
+            edge = 4 * gather(h, f)
+            for first, second in ((e, c), (e, g), (i, f4), (i, h5)):
+                edge += gather(first, second)
+
+            other = 4 * gather(e, i)
+            for first, second in across[1:]:
+                other += gather(first, second)
+
+            # Only the crossed corners are cut, with the closest of the two neighbours on the edge
+            indices = picked[edge < other] if sparse else np.flatnonzero((edge < other) & inside)
+            if not len(indices):
+                continue
+
+            closest = shifted(differences, e, f)[indices] <= shifted(differences, e, h)[indices]
+            pixel = indices + 2 * stride + 2
+            partner = pixel + np.where(closest, offset(f), offset(h))
+
+            neighbour = words[partner]
+            blend = as_words(mix(channels(pixel), channels(partner)))
+
+            # The index in the result of the corner sub-pixel
+            ys, xs = np.divmod(indices, stride)
+            corners = ((ys * factor + row * (factor - 1)) * width + xs) * factor + column * (factor - 1)
+
+            for x, y, past in cut:
+                result.ravel()[corners - (sy * y * width * factor + sx * x)] = neighbour if past else blend
+
+    return result.view(np.uint8).reshape(height * factor, width * factor, 4)
+
+
+def factors(scale: int) -> list:
+    """
+    Function used to split a scale into steps of 2 and 3, the filters work by these steps.
+
+    :param scale: the scale
+    :return: the steps, the part of the scale that can't be split is the last one
+    """
+
+    steps = []
+
+    for step in (2, 3):
+        while scale % step == 0:
+            steps.append(step)
+            scale //= step
+
+    if scale > 1:
+        steps.append(scale)
+
+    return steps
+
+
+def scale_pixels(pixels: np.ndarray, scale: int, scaler: Scalers = Scalers.NEAREST) -> np.ndarray:
+    """
+    Function used to scale an image by an integer factor with a pixel art filter.
+    The filters double or triple the image as many times as needed, the part of the scale that isn't made of
+    2 and 3 is done by repeating the pixels, and xBR triples the image with the Scale3x rules.
+    xBR does all the doublings in a single pass and Scale2x two of them at a time, so their rules look at the
+    pixels of the image instead of the doubled ones.
+
+    :param pixels: an array with the shape (height, width, 4)
+    :param scale: the factor
+    :param scaler: the filter
+    :return: an array with the shape (height * scale, width * scale, 4)
+    """
+
+    if scaler == Scalers.NEAREST:
+        steps = [scale] if scale > 1 else []
+    else:
+        steps = factors(scale)
+        doublings = steps.count(2)
+        others = [step for step in steps if step != 2]
+
+        if scaler == Scalers.XBR:
+            steps = ([2 ** doublings] if doublings else []) + others
+        else:
+            steps = [4] * (doublings // 2) + [2] * (doublings % 2) + others
+
+    for step in steps:
+        if scaler == Scalers.XBR and step % 2 == 0:
+            pixels = xbr(pixels, step)
+        elif scaler == Scalers.SCALE_NX and step == 2:
+            pixels = scale2x(pixels)
+        elif scaler == Scalers.SCALE_NX and step == 4:
+            pixels = scale4x(pixels)
+        elif scaler != Scalers.NEAREST and step == 3:
+            pixels = scale3x(pixels)
+        else:
+            pixels = np.repeat(np.repeat(pixels, step, axis=0), step, axis=1)
+
+    return pixels
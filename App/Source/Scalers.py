@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class Scalers(Enum):
+    NEAREST = 1
+    SCALE_NX = 2
+    XBR = 3
@@ -0,0 +1,410 @@
+import numpy as np
+
+from Source.SelectionModes import SelectionModes
+from Source.Tiles import TILE_SIZE, find_runs
+
+
+class Selection:
+    """
+    This class holds the selected pixels of a canvas as bits, split in tiles like the images.
+    Tiles with nothing selected are not stored, fully selected tiles are only remembered by their position
+    and the others keep their mask packed with 8 pixels in a byte, so a selection costs at most one bit per pixel.
+    """
+
+    def __init__(self, width: int, height: int, tile_size: int = TILE_SIZE):
+        """
+        Class constructor.
+
+        :param width: the width of the canvas in pixels
+        :param height: the height of the canvas in pixels
+        :param tile_size: the size of the side of a tile in pixels
+        """
+
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+
+        self.columns = (width + tile_size - 1) // tile_size
+        self.rows = (height + tile_size - 1) // tile_size
+
+        # The fully selected tiles and the packed masks of the partly selected ones
+        self.full = set()
+        self.packed = {}
+
+        self.outline_spans = None
+
+    @classmethod
+    def from_rect(cls, width: int, height: int, x: int, y: int, rect_width: int, rect_height: int,
+                  tile_size: int = TILE_SIZE) -> "Selection":
+        """
+        Function used to select a rectangle.
+
+        :param width: the width of the canvas
+        :param height: the height of the canvas
+        :param x: the left of the rectangle
+        :param y: the top of the rectangle
+        :param rect_width: self explanatory
+        :param rect_height: self explanatory
+        :param tile_size: the size of the side of a tile in pixels
+        :return: the selection
+        """
+
+        selection = cls(width, height, tile_size)
+
+        # Clip the rectangle to the canvas
+        left, top = max(x, 0), max(y, 0)
+        right, bottom = min(x + rect_width, width), min(y + rect_height, height)
+
+        if left >= right or top >= bottom:
+            return selection
+
+        for ty in range(top // tile_size, (bottom - 1) // tile_size + 1):
+            for tx in range(left // tile_size, (right - 1) // tile_size + 1):
+                x0, y0, tile_width, tile_height = selection.tile_bounds(tx, ty)
+
+                # The tiles completely inside the rectangle don't need a mask
+                if left <= x0 and x0 + tile_width <= right and top <= y0 and y0 + tile_height <= bottom:
+                    selection.full.add((tx, ty))
+                    continue
+
+                mask = np.zeros((tile_height, tile_width), bool)
+                mask[max(top - y0, 0):bottom - y0, max(left - x0, 0):right - x0] = True
+                selection.set_mask(tx, ty, mask)
+
+        return selection
+
+    @classmethod
+    def from_masks(cls, width: int, height: int, masks: dict, tile_size: int = TILE_SIZE) -> "Selection":
+        """
+        Function used to select the pixels given by the masks of some tiles.
+
+        :param width: the width of the canvas
+        :param height: the height of the canvas
+        :param masks: a dict from (tx, ty) to a boolean array or to True for a fully selected tile
+        :param tile_size: the size of the side of a tile in pixels
+        :return: the selection
+        """
+
+        selection = cls(width, height, tile_size)
+
+        for (tx, ty), mask in masks.items():
+            selection.set_mask(tx, ty, mask)
+
+        return selection
+
+    @classmethod
+    def from_mask(cls, width: int, height: int, x: int, y: int, mask: np.ndarray,
+                  tile_size: int = TILE_SIZE) -> "Selection":
+        """
+        Function used to select the pixels of a mask placed somewhere on the canvas, the parts outside are cut.
+
+        :param width: the width of the canvas
+        :param height: the height of the canvas
+        :param x: the left of the mask on the canvas
+        :param y: the top of the mask on the canvas
+        :param mask: a boolean array with the shape (mask height, mask width)
+        :param tile_size: the size of the side of a tile in pixels
+        :return: the selection
+        """
+
+        selection = cls(width, height, tile_size)
+
+        # Clip the mask to the canvas
+        left, top = max(x, 0), max(y, 0)
+        right, bottom = min(x + mask.shape[1], width), min(y + mask.shape[0], height)
+
+        if left >= right or top >= bottom:
+            return selection
+
+        for ty in range(top // tile_size, (bottom - 1) // tile_size + 1):
+            for tx in range(left // tile_size, (right - 1) // tile_size + 1):
+                x0, y0, tile_width, tile_height = selection.tile_bounds(tx, ty)
+
+                tile = np.zeros((tile_height, tile_width), bool)
+
+                x1, y1 = min(right, x0 + tile_width), min(bottom, y0 + tile_height)
+                xa, ya = max(left, x0), max(top, y0)
+                tile[ya - y0:y1 - y0, xa - x0:x1 - x0] = mask[ya - y:y1 - y, xa - x:x1 - x]
+
+                selection.set_mask(tx, ty, tile)
+
+        return selection
+
+    @classmethod
+    def from_spans(cls, width: int, height: int, spans: np.ndarray, tile_size: int = TILE_SIZE) -> "Selection":
+        """
+        Function used to select the pixels covered by row spans, one row of tiles at a time.
+
+        :param width: the width of the canvas
+        :param height: the height of the canvas
+        :param spans: an array with the shape (n, 3), the row y is selected for x0 <= x < x1
+        :param tile_size: the size of the side of a tile in pixels
+        :return: the selection
+        """
+
+        selection = cls(width, height, tile_size)
+
+        # Clip the spans to the canvas
+        rows = spans[:, 0]
+        starts = np.clip(spans[:, 1], 0, width)
+        ends = np.clip(spans[:, 2], 0, width)
+
+        keep = (rows >= 0) & (rows < height) & (starts < ends)
+        rows, starts, ends = rows[keep], starts[keep], ends[keep]
+
+        if len(rows) == 0:
+            return selection
+
+        # Group the spans by row of tiles
+        order = np.argsort(rows, kind="stable")
+        rows, starts, ends = rows[order], starts[order], ends[order]
+        groups = np.split(np.arange(len(rows)), np.flatnonzero(np.diff(rows // tile_size)) + 1)
+
+        for group in groups:
+            ty = rows[group[0]] // tile_size
+            _, top, _, band_height = selection.tile_bounds(0, ty)
+
+            left, right = starts[group].min(), ends[group].max()
+
+            # Mark where every span starts and ends and accumulate along the rows to get the mask
+            marks = np.zeros((band_height, right - left + 1), np.int32)
+            np.add.at(marks, (rows[group] - top, starts[group] - left), 1)
+            np.add.at(marks, (rows[group] - top, ends[group] - left), -1)
+            band = np.cumsum(marks, axis=1)[:, :-1] > 0
+
+            for tx in range(left // tile_size, (right - 1) // tile_size + 1):
+                x0, _, tile_width, _ = selection.tile_bounds(tx, ty)
+
+                mask = np.zeros((band_height, tile_width), bool)
+                x1, xa = min(right, x0 + tile_width), max(left, x0)
+                mask[:, xa - x0:x1 - x0] = band[:, xa - left:x1 - left]
+
+                selection.set_mask(tx, ty, mask)
+
+        return selection
+
+    def tile_bounds(self, tx: int, ty: int) -> tuple:
+        """
+        Function used to get the part of a tile that is inside the canvas, tiles on the edges are cut.
+
+        :param tx: the column of the tile
+        :param ty: the row of the tile
+        :return: (x, y, width, height) of the tile in canvas coordinates
+        """
+
+        x = tx * self.tile_size
+        y = ty * self.tile_size
+
+        return x, y, min(self.tile_size, self.width - x), min(self.tile_size, self.height - y)
+
+    def set_mask(self, tx: int, ty: int, mask) -> None:
+        """
+        Function used to change the selected pixels of a tile.
+
+        :param tx: the column of the tile
+        :param ty: the row of the tile
+        :param mask: a boolean array with the size of the tile inside the canvas, or True to select it all
+        :return: None
+        """
+
+        self.full.discard((tx, ty))
+        self.packed.pop((tx, ty), None)
+        self.outline_spans = None
+
+        if mask is True or mask.all():
+            self.full.add((tx, ty))
+        elif mask.any():
+            self.packed[(tx, ty)] = np.packbits(mask, axis=1)
+
+    def mask(self, tx: int, ty: int):
+        """
+        Function used to get the selected pixels of a tile.
+
+        :param tx: the column of the tile
+        :param ty: the row of the tile
+        :return: True if the tile is fully selected, None if nothing is selected, otherwise a boolean array
+        """
+
+        if (tx, ty) in self.full:
+            return True
+
+        packed = self.packed.get((tx, ty))
+        if packed is None:
+            return None
+
+        _, _, width, _ = self.tile_bounds(tx, ty)
+
+        return np.unpackbits(packed, axis=1, count=width).view(bool)
+
+    def packed_mask(self, tx: int, ty: int) -> np.ndarray:
+        """
+        Function used to get the packed bits of a tile, even for the tiles that are fully selected or not at all.
+
+        :param tx: the column of the tile
+        :param ty: the row of the tile
+        :return: an array of bytes with the shape (height, (width + 7) // 8)
+        """
+
+        packed = self.packed.get((tx, ty))
+        if packed is not None:
+            return packed
+
+        _, _, width, height = self.tile_bounds(tx, ty)
+
+        return np.packbits(np.full((height, width), (tx, ty) in self.full), axis=1)
+
+    def keys(self) -> set:
+        """
+        Function used to get the tiles with something selected.
+
+        :return: a set of (tx, ty)
+        """
+
+        return self.full | set(self.packed)
+
+    def is_empty(self) -> bool:
+        """
+        Function used to check if nothing is selected.
+
+        :return: True if nothing is selected
+        """
+
+        return not self.full and not self.packed
+
+    def combine(self, other: "Selection", mode: SelectionModes) -> "Selection":
+        """
+        Function used to join this selection with another one, the bits of the tiles are combined at once.
+
+        :param other: the other selection
+        :param mode: how the other selection changes this one
+        :return: the new selection
+        """
+
+        if mode == SelectionModes.REPLACE:
+            return other
+
+        if mode == SelectionModes.UNION:
+            keys = self.keys() | other.keys()
+        elif mode == SelectionModes.SUBTRACT:
+            keys = self.keys()
+        else:
+            keys = self.keys() & other.keys()
+
+        result = Selection(self.width, self.height, self.tile_size)
+
+        for tx, ty in keys:
+            # Full tiles are simple cases
+            if mode == SelectionModes.UNION and ((tx, ty) in self.full or (tx, ty) in other.full):
+                result.full.add((tx, ty))
+                continue
+            if mode == SelectionModes.SUBTRACT and (tx, ty) in other.full:
+                continue
+
+            a, b = self.packed_mask(tx, ty), other.packed_mask(tx, ty)
+
+            if mode == SelectionModes.UNION:
+                bits = a | b
+            elif mode == SelectionModes.SUBTRACT:
+                bits = a & ~b
+            else:
+                bits = a & b
+
+            _, _, width, _ = self.tile_bounds(tx, ty)
+            result.set_mask(tx, ty, np.unpackbits(bits, axis=1, count=width).view(bool))
+
+        return result
+
+    def read(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        """
+        Function used to get the selected pixels of a rectangle.
+
+        :param x: the left of the rectangle
+        :param y: the top of the rectangle
+        :param width: self explanatory
+        :param height: self explanatory
+        :return: a boolean array with the shape (height, width), False outside the canvas
+        """
+
+        result = np.zeros((height, width), bool)
+        size = self.tile_size
+
+        # Clip the rectangle to the canvas
+        left, top = max(x, 0), max(y, 0)
+        right, bottom = min(x + width, self.width), min(y + height, self.height)
+
+        for ty in range(top // size, (bottom - 1) // size + 1 if top < bottom else 0):
+            for tx in range(left // size, (right - 1) // size + 1 if left < right else 0):
+                mask = self.mask(tx, ty)
+                if mask is None:
+                    continue
+
+                x0, x1 = max(left, tx * size), min(right, (tx + 1) * size)
+                y0, y1 = max(top, ty * size), min(bottom, (ty + 1) * size)
+
+                part = True if mask is True else mask[y0 - ty * size:y1 - ty * size, x0 - tx * size:x1 - tx * size]
+                result[y0 - y:y1 - y, x0 - x:x1 - x] = part
+
+        return result
+
+    def outline(self) -> np.ndarray:
+        """
+        Function used to get the pixels on the border of the selection, the selected pixels next to unselected ones.
+        The border is computed once and kept until the selection changes, tiles surrounded by full tiles are skipped.
+
+        :return: the spans of the border
+        """
+
+        if self.outline_spans is not None:
+            return self.outline_spans
+
+        spans = []
+
+        for tx, ty in self.keys():
+            neighbours = ((tx - 1, ty), (tx + 1, ty), (tx, ty - 1), (tx, ty + 1))
+            if (tx, ty) in self.full and all(key in self.full for key in neighbours):
+                continue
+
+            x, y, width, height = self.tile_bounds(tx, ty)
+
+            # The mask of the tile with a border of 1 pixel taken from the neighbour tiles
+            mask = self.read(x - 1, y - 1, width + 2, height + 2)
+
+            inside = mask[1:-1, 1:-1]
+            border = inside & ~(mask[:-2, 1:-1] & mask[2:, 1:-1] & mask[1:-1, :-2] & mask[1:-1, 2:])
+
+            rows, starts, ends = find_runs(border)
+            spans.append(np.stack((rows + y, starts + x, ends + x), axis=1))
+
+        self.outline_spans = np.concatenate(spans) if spans else np.zeros((0, 3), np.int64)
+
+        return self.outline_spans
+
+    def bounds(self):
+        """
+        Function used to get the rectangle of the tiles with something selected.
+
+        :return: (x, y, width, height) or None if nothing is selected
+        """
+
+        keys = self.keys()
+
+        if not keys:
+            return None
+
+        size = self.tile_size
+
+        x0 = min(tx for tx, _ in keys) * size
+        y0 = min(ty for _, ty in keys) * size
+        x1 = min((max(tx for tx, _ in keys) + 1) * size, self.width)
+        y1 = min((max(ty for _, ty in keys) + 1) * size, self.height)
+
+        return x0, y0, x1 - x0, y1 - y0
+
+    def allocated_bytes(self) -> int:
+        """
+        Function used to get the memory used by the masks.
+
+        :return: the number of bytes
+        """
+
+        return sum(packed.nbytes for packed in self.packed.values())
@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class SelectionModes(Enum):
+    REPLACE = 1
+    UNION = 2
+    SUBTRACT = 3
+    INTERSECT = 4
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class Strips(Enum):
+    HORIZONTAL = 1
+    VERTICAL = 2
@@ -0,0 +1,117 @@
+import numpy as np
+
+from Source.Export import BAND_BYTES, image_size, read_rows
+from Source.Scale import as_words
+
+
+def row_runs(words: np.ndarray, top: int = 0) -> tuple:
+    """
+    Function used to find the runs of a single color in every row, the transparent runs are left out.
+
+    :param words: the pixels as 32 bit words, an array with the shape (rows, width)
+    :param top: the row of the image of the first row
+    :return: (rows, lefts, rights, colors) arrays with a run at every index, the right is after the last pixel
+    """
+
+    rows, width = words.shape
+
+    # A run starts at the first column and wherever the color changes
+    starts = np.ones((rows, width), bool)
+    starts[:, 1:] = words[:, 1:] != words[:, :-1]
+
+    run_rows, lefts = np.nonzero(starts)
+
+    # A run ends where the next one of its row starts, the last one of a row at the right of the image
+    rights = np.full(len(lefts), width)
+    same_row = run_rows[1:] == run_rows[:-1]
+    rights[:-1][same_row] = lefts[1:][same_row]
+
+    colors = words[run_rows, lefts]
+
+    visible = colors.view(np.uint8).reshape(-1, 4)[:, 3] > 0
+
+    return run_rows[visible] + top, lefts[visible], rights[visible], colors[visible]
+
+
+def merge_runs(rows: np.ndarray, lefts: np.ndarray, rights: np.ndarray, colors: np.ndarray) -> tuple:
+    """
+    Function used to stack the runs that have the same color and columns in the rows below each other into
+    rectangles. The runs are sorted once, so the rectangles are found in about linear time.
+
+    :param rows: the row of every run
+    :param lefts: the first column of every run
+    :param rights: the column after the last one of every run
+    :param colors: the color of every run as a 32 bit word
+    :return: (xs, ys, widths, heights, colors) arrays with a rectangle at every index
+    """
+
+    # Put the runs of the same color and columns one after the other, from the top
+    order = np.lexsort((rows, rights, lefts, colors))
+    rows, lefts, rights, colors = rows[order], lefts[order], rights[order], colors[order]
+
+    # A run continues the rectangle of the previous one if it is the same run on the next row
+    continues = np.zeros(len(rows), bool)
+    continues[1:] = (colors[1:] == colors[:-1]) & (lefts[1:] == lefts[:-1]) & (rights[1:] == rights[:-1]) & \
+                    (rows[1:] == rows[:-1] + 1)
+
+    first = np.flatnonzero(~continues)
+    heights = np.diff(np.append(first, len(rows)))
+
+    return lefts[first], rows[first], rights[first] - lefts[first], heights, colors[first]
+
+
+def rectangles(image) -> tuple:
+    """
+    Function used to cover the visible pixels of an image with as few rectangles of a single color as the runs
+    allow. The image is read one band of rows at a time, only the runs are kept.
+
+    :param image: an array with the shape (height, width, 4) or a tiled image
+    :return: (xs, ys, widths, heights, colors) arrays with a rectangle at every index
+    """
+
+    height, width = image_size(image)
+    band_rows = max(1, BAND_BYTES // (width * 4))
+
+    runs = [row_runs(as_words(read_rows(image, top, min(top + band_rows, height))), top)
+            for top in range(0, height, band_rows)]
+
+    return merge_runs(*(np.concatenate(parts) for parts in zip(*runs)))
+
+
+def write_svg(path: str, image) -> None:
+    """
+    Function used to write an image as an SVG, with a single path of rectangles for every color.
+    The edges are kept sharp at every size.
+
+    :param path: the path of the file
+    :param image: an array with the shape (height, width, 4) or a tiled image
+    :return: None
+    """
+
+    height, width = image_size(image)
+
+    xs, ys, widths, heights, colors = rectangles(image)
+
+    # Group the rectangles of every color
+    order = np.argsort(colors, kind="stable")
+    xs, ys, widths, heights, colors = xs[order], ys[order], widths[order], heights[order], colors[order]
+    groups = np.flatnonzero(np.diff(colors)) + 1
+
+    # A fully transparent image has no color, it is an empty SVG
+    starts = np.append(0, groups) if len(colors) else []
+
+    with open(path, "w") as file:
+        file.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+                   f'viewBox="0 0 {width} {height}" shape-rendering="crispEdges">\n')
+
+        for start, stop in zip(starts, np.append(groups, len(colors))):
+            r, g, b, a = colors[start:start + 1].view(np.uint8)
+
+            opacity = f' fill-opacity="{a / 255:.3g}"' if a < 255 else ""
+            outline = "".join(f"M{x} {y}h{w}v{h}h-{w}z" for x, y, w, h in
+                              zip(xs[start:stop].tolist(), ys[start:stop].tolist(), widths[start:stop].tolist(),
+                                  heights[start:stop].tolist()))
+
+            file.write(f'<path fill="#{r:02x}{g:02x}{b:02x}"{opacity} d="{outline}"/>\n')
+
+        file.write("</svg>\n")
@@ -0,0 +1,1076 @@
+import tempfile
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from functools import lru_cache
+
+import numpy as np
+
+TILE_SIZE = 64
+
+MIN_CANVAS_SIZE = 1
+MAX_CANVAS_SIZE = 32768
+
+# Canvases with more pixels than this keep their tiles in a memory-mapped scratch file
+MAPPED_CANVAS_AREA = 8192 * 8192
+
+# The memory that the tiles of a memory-mapped canvas can keep resident
+RESIDENT_BUDGET = 256 * 1024 * 1024
+
+# The number of tiles looked through together for a color, it bounds the memory of the stacked tiles
+MATCH_TILES = 64
+
+# A set flag for every channel and for the alpha channel only, as 32 bit words of 4 bytes
+ALL_CHANNELS = np.array([1, 1, 1, 1], np.uint8).view(np.uint32)[0]
+ALPHA_CHANNEL = np.array([0, 0, 0, 1], np.uint8).view(np.uint32)[0]
+
+
+class TiledImage:
+    """
+    This class holds the pixels of a canvas split in square tiles of RGBA pixels (numpy arrays).
+    Tiles that were never painted, or became fully transparent, are not allocated at all,
+    so the memory used is proportional to the painted area and not to the canvas area.
+    Images can share their tiles, a shared tile is copied only when it is changed.
+    """
+
+    # The shape of a pixel in the tiles, the 4 channels of an RGBA color
+    pixel_shape = (4,)
+
+    def __init__(self, width: int, height: int, tile_size: int = TILE_SIZE, mapped: bool = False):
+        """
+        Class constructor.
+
+        :param width: the width of the image in pixels
+        :param height: the height of the image in pixels
+        :param tile_size: the size of the side of a tile in pixels
+        :param mapped: keep the tiles in a memory-mapped scratch file instead of memory
+        """
+
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+
+        self.columns = (width + tile_size - 1) // tile_size
+        self.rows = (height + tile_size - 1) // tile_size
+
+        self.tiles = MappedTileStore(self.columns, self.rows, tile_size, self.pixel_shape) if mapped else {}
+
+        # The tiles changed since the last time someone looked, used to update only what was changed
+        self.dirty = set()
+
+        # The tiles that other images may use too, they are copied before they are changed
+        self.shared = set()
+
+        # The changes are kept inside the selection, if there is one
+        self.selection = None
+
+    @classmethod
+    def from_array(cls, pixels: np.ndarray, tile_size: int = TILE_SIZE, mapped: bool = False) -> "TiledImage":
+        """
+        Function used to split an RGBA array into tiles, the fully transparent ones are skipped.
+
+        :param pixels: an array with the shape (height, width, 4)
+        :param tile_size: the size of the side of a tile in pixels
+        :param mapped: keep the tiles in a memory-mapped scratch file instead of memory
+        :return: the tiled image
+        """
+
+        image = cls(pixels.shape[1], pixels.shape[0], tile_size, mapped)
+        image.write(0, 0, pixels)
+
+        return image
+
+    def empty(self, width: int, height: int) -> "TiledImage":
+        """
+        Function used to create an empty image of the same kind with another size, kept the same way.
+
+        :param width: the width of the image in pixels
+        :param height: the height of the image in pixels
+        :return: the image
+        """
+
+        return type(self)(width, height, self.tile_size, isinstance(self.tiles, MappedTileStore))
+
+    def share(self) -> "TiledImage":
+        """
+        Function used to copy the image without copying its pixels, the two images use the same tiles until one of
+        them changes a tile. The tiles kept in a memory-mapped scratch file are copied, they can't be shared.
+
+        :return: the copy
+        """
+
+        image = self.empty(self.width, self.height)
+
+        if isinstance(self.tiles, MappedTileStore):
+            for key in list(self.tiles):
+                image.tiles[key] = self.tiles[key].copy()
+        else:
+            image.tiles.update(self.tiles)
+            image.shared.update(self.tiles)
+            self.shared.update(self.tiles)
+
+        return image
+
+    def contents(self):
+        """
+        Function used to get what tells apart the pixels of images that share their tiles.
+        Two images with the same contents have the same pixels, without comparing them.
+
+        :return: a hashable value, None for the tiles kept in a memory-mapped scratch file
+        """
+
+        if isinstance(self.tiles, MappedTileStore):
+            return None
+
+        return type(self), self.width, self.height, frozenset((key, id(tile)) for key, tile in self.tiles.items())
+
+    def tile_bounds(self, tx: int, ty: int) -> tuple:
+        """
+        Function used to get the part of a tile that is inside the image, tiles on the edges are cut.
+
+        :param tx: the column of the tile
+        :param ty: the row of the tile
+        :return: (x, y, width, height) of the tile in image coordinates
+        """
+
+        x = tx * self.tile_size
+        y = ty * self.tile_size
+
+        return x, y, min(self.tile_size, self.width - x), min(self.tile_size, self.height - y)
+
+    def get_tile(self, tx: int, ty: int, create: bool = False):
+        """
+        Function used to get a tile, allocating it if is requested.
+
+        :param tx: the column of the tile
+        :param ty: the row of the tile
+        :param create: allocate a transparent tile if the tile doesn't exist
+        :return: the tile array or None if the tile is not allocated
+        """
+
+        tile = self.tiles.get((tx, ty))
+
+        if tile is None and create:
+            tile = np.zeros((self.tile_size, self.tile_size) + self.pixel_shape, np.uint8)
+            self.tiles[(tx, ty)] = tile
+
+        return tile
+
+    def writable_tile(self, tx: int, ty: int, create: bool = False):
+        """
+        Function used to get a tile that is going to be changed, a tile shared with other images is copied first.
+        The other images still see the old pixels, they copy the tile too if they change it.
+
+        :param tx: the column of the tile
+        :param ty: the row of the tile
+        :param create: allocate a transparent tile if the tile doesn't exist
+        :return: the tile array or None if the tile is not allocated
+        """
+
+        if (tx, ty) in self.shared:
+            self.shared.discard((tx, ty))
+
+            tile = self.tiles.get((tx, ty))
+            if tile is not None:
+                tile = self.tiles[(tx, ty)] = tile.copy()
+                return tile
+
+        return self.get_tile(tx, ty, create)
+
+    def allocated(self):
+        """
+        Function used to iterate over the allocated tiles, already cut to the image size.
+
+        :return: a generator of (x, y, view) where view is the visible part of the tile
+        """
+
+        # Get the tiles one by one, a memory-mapped store may have to load them
+        for tx, ty in list(self.tiles):
+            tile = self.tiles.get((tx, ty))
+            if tile is not None:
+                x, y, width, height = self.tile_bounds(tx, ty)
+                yield x, y, tile[:height, :width]
+
+    def allocated_in_rect(self, x: int, y: int, width: int, height: int):
+        """
+        Function used to find the allocated tiles that intersect a rectangle.
+        For big rectangles it is faster to check the allocated tiles than every tile of the rectangle.
+
+        :param x: the left of the rectangle
+        :param y: the top of the rectangle
+        :param width: self explanatory
+        :param height: self explanatory
+        :return: a list of (tx, ty)
+        """
+
+        size = self.tile_size
+        tx0, ty0 = max(x, 0) // size, max(y, 0) // size
+        tx1 = (min(x + width, self.width) - 1) // size
+        ty1 = (min(y + height, self.height) - 1) // size
+
+        if tx1 < tx0 or ty1 < ty0:
+            return []
+
+        if (tx1 - tx0 + 1) * (ty1 - ty0 + 1) <= len(self.tiles):
+            return [(tx, ty) for ty in range(ty0, ty1 + 1) for tx in range(tx0, tx1 + 1) if (tx, ty) in self.tiles]
+
+        return [(tx, ty) for tx, ty in self.tiles if tx0 <= tx <= tx1 and ty0 <= ty <= ty1]
+
+    def bands(self):
+        """
+        Function used to read the image one row of tiles at a time, to process it without having it whole in memory.
+
+        :return: a generator of arrays with the shape (rows, width, 4)
+        """
+
+        for ty in range(self.rows):
+            _, y, _, height = self.tile_bounds(0, ty)
+            yield self.read(0, y, self.width, height)
+
+    def tiles_in_rect(self, x: int, y: int, width: int, height: int):
+        """
+        Function used to iterate over the tiles that intersect a rectangle (clipped to the image).
+
+        :param x: the left of the rectangle
+        :param y: the top of the rectangle
+        :param width: self explanatory
+        :param height: self explanatory
+        :return: a generator of (tx, ty, tile_slice, rect_slice) where the slices are (rows, columns)
+        """
+
+        # Clip the rectangle to the image
+        left, top = max(x, 0), max(y, 0)
+        right, bottom = min(x + width, self.width), min(y + height, self.height)
+
+        if left >= right or top >= bottom:
+            return
+
+        size = self.tile_size
+
+        for ty in range(top // size, (bottom - 1) // size + 1):
+            y0, y1 = max(top, ty * size), min(bottom, (ty + 1) * size)
+
+            for tx in range(left // size, (right - 1) // size + 1):
+                x0, x1 = max(left, tx * size), min(right, (tx + 1) * size)
+
+                yield (tx, ty,
+                       (slice(y0 - ty * size, y1 - ty * size), slice(x0 - tx * size, x1 - tx * size)),
+                       (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x)))
+
+    def read(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        """
+        Function used to copy a rectangle of pixels out of the tiles.
+
+        :param x: the left of the rectangle
+        :param y: the top of the rectangle
+        :param width: self explanatory
+        :param height: self explanatory
+        :return: an array with the shape (height, width, 4), transparent outside the image
+        """
+
+        size = self.tile_size
+
+        # A whole tile is simply copied
+        if x % size == 0 and y % size == 0 and (x // size, y // size) in self.tiles and \
+                (x, y, width, height) == self.tile_bounds(x // size, y // size):
+            return self.decode(self.tiles[(x // size, y // size)][:height, :width].copy())
+
+        values = np.zeros((height, width) + self.pixel_shape, np.uint8)
+
+        for tx, ty, tile_slice, rect_slice in self.tiles_in_rect(x, y, width, height):
+            tile = self.tiles.get((tx, ty))
+            if tile is not None:
+                values[rect_slice] = tile[tile_slice]
+
+        return self.decode(values)
+
+    def encode(self, pixels: np.ndarray) -> np.ndarray:
+        """
+        Function used to convert RGBA pixels to the values kept in the tiles, the tiles keep RGBA pixels as they are.
+
+        :param pixels: an array with the shape (height, width, 4)
+        :return: the values, an array with the shape (height, width) + pixel_shape
+        """
+
+        return pixels
+
+    def encode_color(self, color: tuple):
+        """
+        Function used to convert a color to the value kept in the tiles.
+
+        :param color: the (r, g, b, a) color
+        :return: the value used to fill the tiles
+        """
+
+        return color
+
+    def decode(self, values: np.ndarray) -> np.ndarray:
+        """
+        Function used to convert the values kept in the tiles to RGBA pixels.
+
+        :param values: an array with the shape (height, width) + pixel_shape
+        :return: an array with the shape (height, width, 4)
+        """
+
+        return values
+
+    @staticmethod
+    def visible(values: np.ndarray) -> bool:
+        """
+        Function used to check if some values of the tiles are not all transparent.
+
+        :param values: an array with the shape (height, width) + pixel_shape
+        :return: True if a pixel is not transparent
+        """
+
+        return values[..., 3].any()
+
+    def write(self, x: int, y: int, pixels: np.ndarray, mask: np.ndarray = None) -> None:
+        """
+        Function used to copy a rectangle of pixels into the tiles.
+        Transparent parts don't allocate tiles and tiles that become transparent are released.
+
+        :param x: the left of the rectangle
+        :param y: the top of the rectangle
+        :param pixels: an array with the shape (height, width, 4)
+        :param mask: copy only the pixels where the mask is True, all of them if None
+        :return: None
+        """
+
+        height, width = pixels.shape[:2]
+
+        values = self.encode(pixels)
+
+        for tx, ty, tile_slice, rect_slice in self.tiles_in_rect(x, y, width, height):
+            selected = self.selected(tx, ty, tile_slice)
+            if selected is False:
+                continue
+
+            if mask is not None:
+                selected = mask[rect_slice] if selected is True else selected & mask[rect_slice]
+                if not selected.any():
+                    continue
+
+            block = values[rect_slice]
+            tile = self.writable_tile(tx, ty)
+
+            if tile is None:
+                # Nothing to do for a transparent block over a transparent tile
+                if not self.visible(block):
+                    continue
+                tile = self.get_tile(tx, ty, True)
+
+            if selected is True:
+                tile[tile_slice] = block
+            else:
+                # The mask covers all the channels of a pixel
+                where = selected.reshape(selected.shape + (1,) * len(self.pixel_shape))
+                np.copyto(tile[tile_slice], block, where=where)
+            self.dirty.add((tx, ty))
+
+            self.release_if_empty(tx, ty)
+
+    def paste(self, x: int, y: int, values: np.ndarray) -> None:
+        """
+        Function used to copy a rectangle of values straight into the tiles, used to move pixels between images
+        of the same kind, so the values aren't converted and the selection is ignored.
+
+        :param x: the left of the rectangle
+        :param y: the top of the rectangle
+        :param values: an array with the shape (height, width) + pixel_shape
+        :return: None
+        """
+
+        height, width = values.shape[:2]
+
+        for tx, ty, tile_slice, rect_slice in self.tiles_in_rect(x, y, width, height):
+            block = values[rect_slice]
+            visible = self.visible(block)
+            tile = self.writable_tile(tx, ty)
+
+            if tile is None:
+                if not visible:
+                    continue
+                tile = self.get_tile(tx, ty, True)
+
+            tile[tile_slice] = block
+            self.dirty.add((tx, ty))
+
+            if not visible:
+                self.release_if_empty(tx, ty)
+
+    def fill_rect(self, x: int, y: int, width: int, height: int, color: tuple) -> None:
+        """
+        Function used to fill a rectangle with a color.
+
+        :param x: the left of the rectangle
+        :param y: the top of the rectangle
+        :param width: self explanatory
+        :param height: self explanatory
+        :param color: the (r, g, b, a) color
+        :return: None
+        """
+
+        value = self.encode_color(color)
+
+        for tx, ty, tile_slice, _ in self.tiles_in_rect(x, y, width, height):
+            selected = self.selected(tx, ty, tile_slice)
+            if selected is False:
+                continue
+
+            tile = self.writable_tile(tx, ty, color[3] != 0)
+
+            if tile is not None:
+                fill_pixels(tile[tile_slice], value, None if selected is True else selected)
+                self.dirty.add((tx, ty))
+                self.release_if_empty(tx, ty)
+
+    def fill_spans(self, spans: np.ndarray, color: tuple):
+        """
+        Function used to fill row spans (y, x0, x1) with a color, one row of tiles at a time.
+        The spans of a row of tiles are turned into a mask, tiles covered completely are simply filled
+        and the others are filled through their part of the mask.
+
+        :param spans: an array with the shape (n, 3), the row y is filled for x0 <= x < x1
+        :param color: the (r, g, b, a) color
+        :return: (x, y, width, height) of the filled area or None if nothing was filled
+        """
+
+        spans = np.asarray(spans).reshape(-1, 3)
+
+        # Clip the spans to the image
+        rows = spans[:, 0]
+        starts = np.clip(spans[:, 1], 0, self.width)
+        ends = np.clip(spans[:, 2], 0, self.width)
+
+        keep = (rows >= 0) & (rows < self.height) & (starts < ends)
+        rows, starts, ends = rows[keep], starts[keep], ends[keep]
+
+        if len(rows) == 0:
+            return None
+
+        size = self.tile_size
+        value = self.encode_color(color)
+
+        # Group the spans by row of tiles
+        order = np.argsort(rows, kind="stable")
+        rows, starts, ends = rows[order], starts[order], ends[order]
+        groups = np.split(np.arange(len(rows)), np.flatnonzero(np.diff(rows // size)) + 1)
+
+        for group in groups:
+            ty = rows[group[0]] // size
+            _, top, _, height = self.tile_bounds(0, ty)
+
+            left, right = starts[group].min(), ends[group].max()
+
+            # When every row has a span, the columns covered by all of them are full (the inside of a filled shape)
+            if len(np.unique(rows[group])) == height:
+                full_left, full_right = starts[group].max(), ends[group].min()
+            else:
+                full_left = full_right = left
+
+            mask = None
+
+            for tx in range(left // size, (right - 1) // size + 1):
+                x0, x1 = max(left, tx * size), min(right, (tx + 1) * size)
+
+                # Tiles that are not full are filled through the mask of the spans
+                if not full_left <= x0 < x1 <= full_right:
+                    if mask is None:
+                        # Mark where every span starts and ends and accumulate along the rows to get the mask
+                        marks = np.zeros((height, right - left + 1), np.int32)
+                        np.add.at(marks, (rows[group] - top, starts[group] - left), 1)
+                        np.add.at(marks, (rows[group] - top, ends[group] - left), -1)
+                        mask = np.cumsum(marks, axis=1)[:, :-1] > 0
+
+                    part = mask[:, x0 - left:x1 - left]
+                    if not part.any():
+                        continue
+                else:
+                    part = None
+
+                # Keep only the selected part
+                selected = self.selected(tx, ty, (slice(0, height), slice(x0 - tx * size, x1 - tx * size)))
+                if selected is False:
+                    continue
+                if selected is not True:
+                    part = selected if part is None else part & selected
+
+                tile = self.writable_tile(tx, ty, color[3] != 0)
+                if tile is None:
+                    continue
+
+                view = tile[:height, x0 - tx * size:x1 - tx * size]
+                if part is None or part.all():
+                    fill_pixels(view, value)
+                else:
+                    fill_pixels(view, value, part)
+
+                self.dirty.add((tx, ty))
+
+                if color[3] == 0:
+                    self.release_if_empty(tx, ty)
+
+        left, right = int(starts.min()), int(ends.max())
+
+        return left, int(rows[0]), right - left, int(rows[-1]) - int(rows[0]) + 1
+
+    def pixel(self, x: int, y: int) -> tuple:
+        """
+        Function used to get the color of a pixel.
+
+        :param x: self explanatory
+        :param y: self explanatory
+        :return: the (r, g, b, a) color, transparent if the pixel is outside the image
+        """
+
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return 0, 0, 0, 0
+
+        tile = self.tiles.get((x // self.tile_size, y // self.tile_size))
+
+        if tile is None:
+            return 0, 0, 0, 0
+
+        y, x = y % self.tile_size, x % self.tile_size
+
+        return tuple(int(i) for i in self.decode(tile[y:y + 1, x:x + 1])[0, 0])
+
+    def release_if_empty(self, tx: int, ty: int) -> None:
+        """
+        Function used to free a tile if all its pixels are transparent.
+
+        :param tx: the column of the tile
+        :param ty: the row of the tile
+        :return: None
+        """
+
+        tile = self.tiles.get((tx, ty))
+
+        if tile is not None and not self.visible(tile):
+            del self.tiles[(tx, ty)]
+            self.shared.discard((tx, ty))
+
+    def clear(self) -> None:
+        """
+        Function used to make the whole image transparent, which means releasing all tiles.
+
+        :return: None
+        """
+
+        self.dirty.update(self.tiles)
+        self.tiles.clear()
+        self.shared.clear()
+
+    @staticmethod
+    def match_mask(tile, width: int, height: int, color: tuple, tolerance: int = 0) -> np.ndarray:
+        """
+        Function used to find the pixels of a tile that have a certain color.
+        A pixel matches when none of its channels differs from the color by more than the tolerance,
+        and all fully transparent pixels are considered the same color.
+
+        :param tile: the tile array or None for a transparent tile
+        :param width: the width of the part of the tile inside the image
+        :param height: the height of the part of the tile inside the image
+        :param color: the (r, g, b, a) color
+        :param tolerance: the biggest difference allowed on a channel, between 0 and 255
+        :return: a boolean array with the shape (height, width)
+        """
+
+        if tile is None:
+            return np.full((height, width), color[3] <= tolerance)
+
+        tile = tile[:height, :width]
+
+        if tolerance == 0:
+            if color[3] == 0:
+                return tile[..., 3] == 0
+            return tile.view(np.uint32)[..., 0] == np.array(color, np.uint8).view(np.uint32)[0]
+
+        # A channel is in the range around the color if its distance from the low end, wrapping around, is small
+        low, span = color_range(tuple(color), tolerance, tile.shape[0], tile.shape[1])
+
+        inside = (tile - low) <= span
+
+        # Check the 4 channels of a pixel at once, as a 32 bit word, the colors of transparent pixels don't count
+        words = inside.view(np.uint32)[..., 0]
+
+        return (words == ALL_CHANNELS) | ((words & ALPHA_CHANNEL != 0) & (tile[..., 3] == 0))
+
+    def replace_color(self, target: tuple, color: tuple, tolerance: int = 0):
+        """
+        Function used to replace a color with another color everywhere in the image, not only where it touches.
+        Only the allocated tiles are checked, unless the transparent pixels are replaced too.
+        The tiles are stacked in groups, so the pixels of a whole group are found and replaced at once.
+
+        :param target: the (r, g, b, a) color to replace
+        :param color: the (r, g, b, a) new color
+        :param tolerance: the biggest difference allowed on a channel, between 0 and 255
+        :return: (x, y, width, height) of the changed area or None if nothing changed
+        """
+
+        # Transparent tiles are replaced too, a missing tile is the same as a transparent one
+        if self.match_mask(None, 1, 1, target, tolerance)[0, 0]:
+            keys = [(tx, ty) for ty in range(self.rows) for tx in range(self.columns)]
+        else:
+            keys = list(self.tiles)
+
+        # Only the selected tiles can change
+        if self.selection is not None:
+            selected = self.selection.keys()
+            keys = [key for key in keys if key in selected]
+
+        changed = []
+        value = self.encode_color(color)
+
+        size = self.tile_size
+        blank = np.zeros((size, size) + self.pixel_shape, np.uint8)
+
+        for start in range(0, len(keys), MATCH_TILES):
+            group = keys[start:start + MATCH_TILES]
+
+            # The tiles are put one under the other, as a single tall tile
+            stack = np.concatenate([self.tiles.get(key, blank) for key in group])
+            masks = self.match_mask(stack, size, len(stack), target, tolerance).reshape(len(group), size, size)
+
+            # The parts of the tiles outside the image and outside the selection can't change
+            for index, (tx, ty) in enumerate(group):
+                _, _, width, height = self.tile_bounds(tx, ty)
+
+                if width < size or height < size:
+                    masks[index, height:] = False
+                    masks[index, :, width:] = False
+
+                if self.selection is not None:
+                    masks[index, :height, :width] &= self.selected(tx, ty)
+
+            fill_pixels(stack, value, masks.reshape(len(stack), size))
+            stack = stack.reshape((len(group), size, size) + self.pixel_shape)
+
+            for index in np.flatnonzero(masks.reshape(len(group), -1).any(axis=1)).tolist():
+                key = group[index]
+
+                # The tile gets new pixels, the images it was shared with keep the old ones
+                self.tiles[key] = stack[index].copy()
+                self.shared.discard(key)
+
+                self.dirty.add(key)
+                changed.append(key)
+
+                if color[3] == 0:
+                    self.release_if_empty(*key)
+
+        return self.tiles_area(changed)
+
+    def tiles_area(self, keys):
+        """
+        Function used to get the rectangle that holds some tiles.
+
+        :param keys: the (tx, ty) of the tiles
+        :return: (x, y, width, height) of the rectangle or None if there are no tiles
+        """
+
+        if not keys:
+            return None
+
+        size = self.tile_size
+
+        tx0 = min(tx for tx, _ in keys)
+        ty0 = min(ty for _, ty in keys)
+        tx1 = max(tx for tx, _ in keys) + 1
+        ty1 = max(ty for _, ty in keys) + 1
+
+        x, y = tx0 * size, ty0 * size
+
+        return x, y, min(tx1 * size, self.width) - x, min(ty1 * size, self.height) - y
+
+    def flood_region(self, x: int, y: int, tolerance: int = 0, clip: bool = True) -> dict:
+        """
+        Function used to find a contiguous area of the same color.
+        The area is found inside one tile at a time, by labelling the connected pixels, and the pixels that reach
+        the edges of a tile are passed as seeds to the neighbour tile, so only the tiles of the area are visited.
+
+        :param x: the x of the pixel where the area starts
+        :param y: the y of the pixel where the area starts
+        :param tolerance: the biggest difference allowed on a channel, between 0 and 255
+        :param clip: keep the area inside the selection
+        :return: a dict from (tx, ty) to a boolean array, or to True for the tiles that are completely in the area
+        """
+
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return {}
+
+        target = self.pixel(x, y)
+        size = self.tile_size
+
+        # Seeds waiting to be grown, for every tile
+        seeds = {}
+        self.seed_mask(seeds, x // size, y // size)[y % size, x % size] = True
+        found = {}
+
+        while seeds:
+            (tx, ty), start = seeds.popitem()
+            height, width = start.shape
+
+            done = found.get((tx, ty))
+            if done is True:
+                continue
+            if done is None:
+                done = np.zeros((height, width), bool)
+
+            allowed = self.match_mask(self.tiles.get((tx, ty)), width, height, target, tolerance) & ~done
+            if clip:
+                allowed &= self.selected(tx, ty)
+            start &= allowed
+
+            if not start.any():
+                continue
+
+            # If every pixel of the tile is allowed the area is the whole tile, no need to label it
+            region = allowed if allowed.all() else connected_region(start, allowed)
+
+            done |= region
+
+            # Forget the mask of a tile that is completely in the area, only remember that it is done
+            found[(tx, ty)] = True if done.all() else done
+
+            # Pass the pixels on the edges to the neighbour tiles
+            if tx > 0 and region[:, 0].any():
+                self.seed_mask(seeds, tx - 1, ty)[:, -1] |= region[:, 0]
+            if tx < self.columns - 1 and region[:, -1].any():
+                self.seed_mask(seeds, tx + 1, ty)[:, 0] |= region[:, -1]
+            if ty > 0 and region[0, :].any():
+                self.seed_mask(seeds, tx, ty - 1)[-1, :] |= region[0, :]
+            if ty < self.rows - 1 and region[-1, :].any():
+                self.seed_mask(seeds, tx, ty + 1)[0, :] |= region[-1, :]
+
+        return found
+
+    def flood_fill(self, x: int, y: int, color: tuple, tolerance: int = 0):
+        """
+        Function used to replace a contiguous area of the same color with another color.
+
+        :param x: the x of the pixel where the fill starts
+        :param y: the y of the pixel where the fill starts
+        :param color: the (r, g, b, a) new color
+        :param tolerance: the biggest difference allowed on a channel, between 0 and 255
+        :return: (x, y, width, height) of the changed area or None if nothing changed
+        """
+
+        target = self.pixel(x, y)
+
+        if tolerance == 0 and (target == tuple(color) or (target[3] == 0 and color[3] == 0)):
+            return None
+
+        # The area is found first, so the pixels are compared with the colors before the fill
+        found = self.flood_region(x, y, tolerance)
+        value = self.encode_color(color)
+
+        for (tx, ty), region in found.items():
+            _, _, width, height = self.tile_bounds(tx, ty)
+
+            tile = self.writable_tile(tx, ty, color[3] != 0)
+            if tile is not None:
+                fill_pixels(tile[:height, :width], value, None if region is True else region)
+
+            self.dirty.add((tx, ty))
+
+            if color[3] == 0:
+                self.release_if_empty(tx, ty)
+
+        return self.tiles_area(list(found))
+
+    def selected(self, tx: int, ty: int, tile_slice: tuple = None):
+        """
+        Function used to find the pixels of a tile that can be changed, the selected ones.
+
+        :param tx: the column of the tile
+        :param ty: the row of the tile
+        :param tile_slice: the (rows, columns) slices of the part of the tile, the whole tile inside the image if None
+        :return: True if the part can be changed completely, False if it can't be changed, otherwise a boolean array
+        """
+
+        if self.selection is None:
+            return True
+
+        mask = self.selection.mask(tx, ty)
+
+        if mask is None or mask is True:
+            return mask is True
+
+        return mask if tile_slice is None else mask[tile_slice]
+
+    def seed_mask(self, seeds: dict, tx: int, ty: int) -> np.ndarray:
+        """
+        Function used to get the mask with the pixels where a fill continues inside a tile.
+
+        :param seeds: the masks of the tiles waiting to be filled
+        :param tx: the column of the tile
+        :param ty: the row of the tile
+        :return: a boolean array with the size of the part of the tile inside the image
+        """
+
+        mask = seeds.get((tx, ty))
+
+        if mask is None:
+            _, _, width, height = self.tile_bounds(tx, ty)
+            mask = seeds[(tx, ty)] = np.zeros((height, width), bool)
+
+        return mask
+
+    def allocated_bytes(self) -> int:
+        """
+        Function used to get the memory used by the pixels.
+
+        :return: the number of bytes
+        """
+
+        return len(self.tiles) * self.tile_size * self.tile_size * int(np.prod(self.pixel_shape))
+
+
+class MappedTileStore(MutableMapping):
+    """
+    This class keeps the tiles of a tiled image in a memory-mapped scratch file, it works like a dictionary.
+    The most recently used tiles stay in memory under a budget, the others are written in their slot of the file
+    and the operating system decides which pages of the file stay in memory.
+    The file is sparse, so the slots of the tiles that were never painted don't take space on disk.
+    """
+
+    def __init__(self, columns: int, rows: int, tile_size: int = TILE_SIZE, pixel_shape: tuple = (4,),
+                 budget: int = RESIDENT_BUDGET, directory: str = None):
+        """
+        Class constructor.
+
+        :param columns: the number of columns of tiles
+        :param rows: the number of rows of tiles
+        :param tile_size: the size of the side of a tile in pixels
+        :param pixel_shape: the shape of a pixel, (4,) for RGBA pixels and () for indices
+        :param budget: the memory in bytes that the resident tiles can use
+        :param directory: the directory of the scratch file, the temporary directory by default
+        """
+
+        self.tile_size = tile_size
+
+        # The scratch file is deleted when is closed
+        self.file = tempfile.TemporaryFile(prefix="pixel_art_designer_", suffix=".tiles", dir=directory)
+        tile_bytes = tile_size * tile_size * int(np.prod(pixel_shape))
+        self.file.truncate(columns * rows * tile_bytes)
+
+        # Every tile has its own slot in the file
+        self.slots = np.memmap(self.file, np.uint8, "r+", shape=(rows, columns, tile_size, tile_size) + pixel_shape)
+
+        self.allocated = set()
+
+        # The tiles kept in memory, from the least to the most recently used
+        self.resident = OrderedDict()
+        self.max_resident = max(1, budget // tile_bytes)
+
+    def __getitem__(self, key: tuple) -> np.ndarray:
+        if key not in self.allocated:
+            raise KeyError(key)
+
+        tile = self.resident.get(key)
+
+        if tile is None:
+            # Load the tile from its slot
+            tx, ty = key
+            tile = np.array(self.slots[ty, tx])
+            self.resident[key] = tile
+            self.evict()
+        else:
+            self.resident.move_to_end(key)
+
+        return tile
+
+    def __setitem__(self, key: tuple, tile: np.ndarray) -> None:
+        self.allocated.add(key)
+
+        self.resident[key] = tile
+        self.resident.move_to_end(key)
+
+        self.evict()
+
+    def __delitem__(self, key: tuple) -> None:
+        self.allocated.remove(key)
+
+        # The slot is left as it is, it will be written again if the tile is allocated again
+        self.resident.pop(key, None)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self.allocated
+
+    def __iter__(self):
+        return iter(list(self.allocated))
+
+    def __len__(self) -> int:
+        return len(self.allocated)
+
+    def clear(self) -> None:
+        self.allocated.clear()
+        self.resident.clear()
+
+    def evict(self) -> None:
+        """
+        Function used to write the least recently used tiles to the file until the resident tiles fit the budget.
+
+        :return: None
+        """
+
+        while len(self.resident) > self.max_resident:
+            (tx, ty), tile = self.resident.popitem(last=False)
+            self.slots[ty, tx] = tile
+
+    def close(self) -> None:
+        """
+        Function used to release the scratch file.
+
+        :return: None
+        """
+
+        self.clear()
+        self.slots = None
+        self.file.close()
+
+
+@lru_cache(maxsize=16)
+def color_range(color: tuple, tolerance: int, height: int, width: int) -> tuple:
+    """
+    Function used to get the range of the channels that match a color, repeated for every pixel of a tile.
+    The arrays have the shape of the tile so the comparison runs over contiguous memory without broadcasting.
+
+    :param color: the (r, g, b, a) color
+    :param tolerance: the biggest difference allowed on a channel
+    :param height: the height of the tile
+    :param width: the width of the tile
+    :return: (low, span) arrays with the shape (height, width, 4), a channel matches if 0 <= channel - low <= span
+    """
+
+    low = np.array([max(0, channel - tolerance) for channel in color], np.uint8)
+    high = np.array([min(255, channel + tolerance) for channel in color], np.uint8)
+
+    low = np.tile(low, (height, width, 1))
+    span = np.tile(high, (height, width, 1)) - low
+
+    low.flags.writeable = False
+    span.flags.writeable = False
+
+    return low, span
+
+
+def fill_pixels(pixels: np.ndarray, color: tuple, mask: np.ndarray = None) -> None:
+    """
+    Function used to fill RGBA pixels with a color, the pixels are filled as 32 bit words
+    which is many times faster than copying the 4 channels of the color to every pixel.
+    Indexed pixels are filled with the index as it is.
+
+    :param pixels: an array with the shape (height, width, 4) or (height, width), it can be a view of a tile
+    :param color: the (r, g, b, a) color or the index
+    :param mask: fill only where the mask is True, everywhere if None
+    :return: None
+    """
+
+    if pixels.ndim == 2:
+        words, word = pixels, color
+    else:
+        words = pixels.view(np.uint32)[..., 0]
+        word = np.array(color, np.uint8).view(np.uint32)[0]
+
+    if mask is None:
+        words[...] = word
+    else:
+        np.copyto(words, word, where=mask)
+
+
+def find_runs(mask: np.ndarray) -> tuple:
+    """
+    Function used to find the horizontal runs of True pixels of a mask.
+
+    :param mask: a boolean array with the shape (height, width)
+    :return: (rows, starts, ends) arrays, the run i covers starts[i] <= x < ends[i] of the row rows[i]
+    """
+
+    height, width = mask.shape
+
+    # A run starts where a pixel is True after a False one and ends where it is False after a True one
+    padded = np.zeros((height, width + 2), np.int8)
+    padded[:, 1:-1] = mask
+    changes = np.diff(padded, axis=1)
+
+    rows, starts = np.nonzero(changes == 1)
+    _, ends = np.nonzero(changes == -1)
+
+    return rows, starts, ends
+
+
+def label_runs(rows: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Function used to find the connected components (4 directions) of some runs, sorted by row and start.
+    Runs on consecutive rows that overlap are joined with a union-find computed for all runs at once,
+    so the cost depends on the number of runs and not on the shape of the components.
+
+    :param rows: the rows of the runs
+    :param starts: the starts of the runs
+    :param ends: the ends of the runs (exclusive)
+    :return: the label of every run, the smallest index of a run of its component
+    """
+
+    count = len(rows)
+    labels = np.arange(count)
+
+    if count == 0:
+        return labels
+
+    # Put the rows one after the other on a single axis
+    span = int(ends.max()) + 1
+    start_keys = rows * span + starts
+    end_keys = rows * span + ends
+
+    # The runs of the row above that overlap a run form a contiguous range
+    first = np.searchsorted(end_keys, (rows - 1) * span + starts, "right")
+    last = np.searchsorted(start_keys, (rows - 1) * span + ends, "left")
+    lengths = np.maximum(last - first, 0)
+
+    below = np.repeat(np.arange(count), lengths)
+    above = np.repeat(first, lengths) + np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+    # Give both runs of every pair the smallest label until nothing changes
+    while len(below):
+        smallest = np.minimum(labels[below], labels[above])
+        updated = labels.copy()
+        np.minimum.at(updated, below, smallest)
+        np.minimum.at(updated, above, smallest)
+
+        # Jump to the label of the label, this joins long chains quickly
+        updated = updated[updated]
+
+        if np.array_equal(updated, labels):
+            break
+
+        labels = updated
+
+    return labels
+
+
+def connected_region(region: np.ndarray, allowed: np.ndarray) -> np.ndarray:
+    """
+    Function used to find the allowed pixels connected (4 directions) to some starting pixels.
+
+    :param region: a boolean array with the starting pixels
+    :param allowed: a boolean array with the pixels the region can cover
+    :return: the connected region
+    """
+
+    rows, starts, ends = find_runs(allowed)
+    labels = label_runs(rows, starts, ends)
+
+    # The components that contain a starting pixel, a run contains one if the starting pixels inside it grow
+    seeds = np.cumsum(np.concatenate((np.zeros((region.shape[0], 1), np.int32), region & allowed), axis=1), axis=1)
+    touched = seeds[rows, ends] > seeds[rows, starts]
+
+    keep = np.isin(labels, labels[touched])
+
+    # Draw the kept runs back into a mask
+    marks = np.zeros((allowed.shape[0], allowed.shape[1] + 1), np.int8)
+    np.add.at(marks, (rows[keep], starts[keep]), 1)
+    np.add.at(marks, (rows[keep], ends[keep]), -1)
+
+    return np.cumsum(marks, axis=1)[:, :-1] > 0
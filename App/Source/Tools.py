@@ -10,3 +10,9 @@ class Tools(Enum):
     BRUSH = 8
     FILL = 6
     PICKER = 7
+    FILLED_SQUARE = 9
+    FILLED_CIRCLE = 10
+    SELECT = 11
+    MAGIC_WAND = 12
+    MOVE = 13
+    LASSO = 14
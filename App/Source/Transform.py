@@ -0,0 +1,201 @@
+import numpy as np
+
+from Source.Tiles import TiledImage
+from Source.Transforms import Transforms
+
+
+def remap(image: TiledImage, width: int, height: int, place) -> TiledImage:
+    """
+    Function used to move the allocated tiles of an image into a new image, one tile at a time.
+    Every tile is moved with numpy slicing, so the transparent tiles cost nothing and no pixel is visited in python.
+
+    :param image: the image
+    :param width: the width of the new image
+    :param height: the height of the new image
+    :param place: a function from (x, y, block) of a tile to a list of (x, y, block) in the new image
+    :return: the new image
+    """
+
+    result = image.empty(width, height)
+
+    for x, y, block in image.allocated():
+        for new_x, new_y, values in place(x, y, block):
+            result.paste(new_x, new_y, values)
+
+    return result
+
+
+def flip(image: TiledImage, horizontal: bool = True) -> TiledImage:
+    """
+    Function used to mirror an image.
+
+    :param image: the image
+    :param horizontal: mirror the columns (left to right) if True, the rows (top to bottom) if False
+    :return: the mirrored image
+    """
+
+    if horizontal:
+        return remap(image, image.width, image.height,
+                     lambda x, y, block: [(image.width - x - block.shape[1], y, block[:, ::-1])])
+
+    return remap(image, image.width, image.height,
+                 lambda x, y, block: [(x, image.height - y - block.shape[0], block[::-1])])
+
+
+def rotate(image: TiledImage, turns: int) -> TiledImage:
+    """
+    Function used to rotate an image by quarter turns, the width and the height are swapped for odd turns.
+
+    :param image: the image
+    :param turns: the number of quarter turns clockwise, negative turns are counterclockwise
+    :return: the rotated image
+    """
+
+    width, height = image.width, image.height
+    turns %= 4
+
+    # The pixel (x, y) goes to (height - 1 - y, x)
+    if turns == 1:
+        return remap(image, height, width,
+                     lambda x, y, block: [(height - y - block.shape[0], x, np.rot90(block, -1))])
+
+    if turns == 2:
+        return remap(image, width, height,
+                     lambda x, y, block: [(width - x - block.shape[1], height - y - block.shape[0],
+                                           block[::-1, ::-1])])
+
+    # The pixel (x, y) goes to (y, width - 1 - x)
+    if turns == 3:
+        return remap(image, height, width,
+                     lambda x, y, block: [(y, width - x - block.shape[1], np.rot90(block, 1))])
+
+    return remap(image, width, height, lambda x, y, block: [(x, y, block)])
+
+
+def shift(image: TiledImage, dx: int, dy: int) -> TiledImage:
+    """
+    Function used to move the pixels of an image, the pixels that go out on a side come back on the other side.
+
+    :param image: the image
+    :param dx: the columns moved to the right
+    :param dy: the rows moved down
+    :return: the shifted image
+    """
+
+    width, height = image.width, image.height
+    dx, dy = dx % width, dy % height
+
+    def place(x, y, block):
+        new_x, new_y = (x + dx) % width, (y + dy) % height
+
+        # A tile that crosses an edge is pasted twice, the part out of the image is cut by the paste
+        columns = [new_x] if new_x + block.shape[1] <= width else [new_x, new_x - width]
+        rows = [new_y] if new_y + block.shape[0] <= height else [new_y, new_y - height]
+
+        return [(column, row, block) for row in rows for column in columns]
+
+    return remap(image, width, height, place)
+
+
+def resize(image: TiledImage, width: int, height: int, dx: int, dy: int, base: TiledImage = None) -> TiledImage:
+    """
+    Function used to change the size of an image without scaling it, the pixels out of the new size are cropped
+    and the new pixels are transparent.
+
+    :param image: the image
+    :param width: the new width
+    :param height: the new height
+    :param dx: where the left of the image goes in the new image
+    :param dy: where the top of the image goes in the new image
+    :param base: the image with the new size to paste the pixels into, an empty one if None
+    :return: the resized image
+    """
+
+    result = base if base is not None else image.empty(width, height)
+
+    for x, y, block in image.allocated():
+        result.paste(x + dx, y + dy, block)
+
+    return result
+
+
+def crop_remainder(image: TiledImage, width: int, height: int, dx: int, dy: int):
+    """
+    Function used to keep only the pixels of an image that a resize cropped, to be able to bring them back.
+    The image is changed in place, the pixels kept by the resize are cleared and their tiles released.
+
+    :param image: the image before the resize
+    :param width: the new width
+    :param height: the new height
+    :param dx: where the left of the image went in the new image
+    :param dy: where the top of the image went in the new image
+    :return: the image with the cropped pixels or None if nothing was cropped
+    """
+
+    for tx, ty, tile_slice, _ in image.tiles_in_rect(-dx, -dy, width, height):
+        tile = image.tiles.get((tx, ty))
+
+        if tile is not None:
+            tile[tile_slice] = 0
+            image.release_if_empty(tx, ty)
+
+    image.dirty.clear()
+
+    return image if len(image.tiles) else None
+
+
+def transform_image(image: TiledImage, transform: Transforms, arguments: tuple, base: TiledImage = None) -> TiledImage:
+    """
+    Function used to apply a transform to an image.
+
+    :param image: the image
+    :param transform: the transform
+    :param arguments: the arguments of the transform
+    :param base: the image a resize pastes the pixels into, an empty one if None
+    :return: the new image
+    """
+
+    if transform == Transforms.FLIP_HORIZONTAL:
+        return flip(image, True)
+    if transform == Transforms.FLIP_VERTICAL:
+        return flip(image, False)
+    if transform == Transforms.ROTATE:
+        return rotate(image, *arguments)
+    if transform == Transforms.SHIFT:
+        return shift(image, *arguments)
+
+    return resize(image, *arguments, base)
+
+
+def inverse(transform: Transforms, arguments: tuple, size: tuple) -> tuple:
+    """
+    Function used to get the transform that undoes a transform.
+
+    :param transform: the transform
+    :param arguments: the arguments of the transform
+    :param size: the (width, height) of the image before the transform
+    :return: the (transform, arguments) that undoes it
+    """
+
+    if transform == Transforms.ROTATE:
+        return transform, (-arguments[0],)
+    if transform == Transforms.SHIFT:
+        return transform, (-arguments[0], -arguments[1])
+    if transform == Transforms.RESIZE:
+        return transform, (size[0], size[1], -arguments[2], -arguments[3])
+
+    # A flip undoes itself
+    return transform, arguments
+
+
+def anchor_offset(size: int, new_size: int, anchor: int) -> int:
+    """
+    Function used to find where an image goes on one axis when it is resized around an anchor.
+
+    :param size: the size of the image
+    :param new_size: the new size
+    :param anchor: 0 to keep the start (left or top), 1 to keep the middle and 2 to keep the end (right or bottom)
+    :return: the offset of the image in the new image
+    """
+
+    return (new_size - size) * anchor // 2
@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class Transforms(Enum):
+    FLIP_HORIZONTAL = 1
+    FLIP_VERTICAL = 2
+    ROTATE = 3
+    SHIFT = 4
+    RESIZE = 5
@@ -1,14 +1,69 @@
-from PIL import ImageQt
+import math
+from contextlib import contextmanager
+
+import numpy as np
+from PyQt5 import sip
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
 
+from Source.Animation import Animation
+from Source.AnimationExport import export_animation
+from Source.Blends import Blends
+from Source.Export import export_scales
+from Source.Floating import Floating
+from Source.History import History, Operation
+from Source.Layers import LayerStack
+from Source.Palette import Palette, COLORS, hex_to_rgba
+from Source.Quantize import quantize, snap
+from Source.Raster import line, polyline, rectangle, ellipse, filled_rectangle, filled_ellipse, polygon, stroke, \
+    spans_to_points, spans_to_rects, merge_spans
+from Source.RecentColors import RecentColors
+from Source.Scalers import Scalers
+from Source.Selection import Selection
+from Source.SelectionModes import SelectionModes
+from Source.Svg import write_svg
+from Source.Tiles import TiledImage, MAPPED_CANVAS_AREA
 from Source.Tools import Tools
+from Source.Transform import anchor_offset, crop_remainder, inverse
+from Source.Transforms import Transforms
 from Source.UI.ScrollBar import ScrollBar
 from Source.UI.StatusWidget import StatusWidget
 from Source.Utils import *
 
 
+def image_to_array(image: QImage) -> np.ndarray:
+    """
+    Function used to copy the pixels of an image into an RGBA array.
+
+    :param image: the image
+    :return: an array with the shape (height, width, 4)
+    """
+
+    image = image.convertToFormat(QImage.Format_RGBA8888)
+
+    bits = image.constBits()
+    bits.setsize(image.byteCount())
+
+    pixels = np.frombuffer(bits, np.uint8).reshape(image.height(), image.bytesPerLine())
+
+    return pixels[:, :image.width() * 4].reshape(image.height(), image.width(), 4).copy()
+
+
+def array_to_image(pixels: np.ndarray) -> QImage:
+    """
+    Function used to copy an RGBA array into an image.
+
+    :param pixels: an array with the shape (height, width, 4)
+    :return: the image, it doesn't share the memory of the array
+    """
+
+    pixels = np.ascontiguousarray(pixels)
+
+    return QImage(sip.voidptr(pixels.ctypes.data), pixels.shape[1], pixels.shape[0], pixels.shape[1] * 4,
+                  QImage.Format_RGBA8888).copy()
+
+
 class CanvasWidget(QWidget):
     """
     This class will hold the canvas, the alpha channel and the grid and also to provide zooming.
@@ -44,6 +99,9 @@ class CanvasWidget(QWidget):
 
         self.factor = 1.1
 
+        # The maximum number of zoom ins, big canvases need more of them to reach the pixels
+        self.max_zoom = 11
+
         self.setup()
 
     def setup(self) -> None:
@@ -92,6 +150,9 @@ class CanvasWidget(QWidget):
         self.view.setTransform(QTransform().scale(self.scale_to_original,
                                                   self.scale_to_original))
 
+        # Allow zooming in until a pixel of the canvas is at least 32 pixels on the screen
+        self.max_zoom = max(11, math.ceil(math.log(32 / self.scale_to_original, self.factor)))
+
         # Pass the canvas size to the status widget
         self.status_widget.set_position_and_zoom(zoom=self.scale_to_original)
 
@@ -104,23 +165,50 @@ class CanvasWidget(QWidget):
 
         self.canvas.create_canvas()
 
-    def save_canvas(self, path: str) -> None:
+    def save_canvas(self, path: str, scales: tuple = (1,), scaler: Scalers = Scalers.NEAREST,
+                    encoding: dict = None) -> None:
         """
         Function used to save the current canvas to a given path.
 
         :param path: the path where the canvas will be saved
+        :param scales: the integer scales of the copies, the copies bigger than 1x get @2x, @4x... in the name
+        :param scaler: the filter used to scale the copies
+        :param encoding: the arguments of export_scales used to encode the files, None for the default ones
         :return: None
         """
 
-        self.canvas.save_canvas(path)
+        self.canvas.save_canvas(path, scales, scaler, encoding)
+
+    def save_svg(self, path: str) -> None:
+        """
+        Function used to save the current canvas as an SVG to a given path.
 
-    def new_canvas(self, width: int, height: int, image: QPixmap = None) -> None:
+        :param path: the path where the canvas will be saved
+        :return: None
         """
-        Function used to create a new canvas, either an empty one or from an image.
+
+        self.canvas.save_svg(path)
+
+    def save_animation(self, path: str) -> None:
+        """
+        Function used to save the frames of the canvas as an animated GIF or PNG to a given path.
+
+        :param path: the path where the animation will be saved, ending with .gif for a GIF
+        :return: None
+        """
+
+        self.canvas.save_animation(path)
+
+    def new_canvas(self, width: int, height: int, frames: list = None, indexed: bool = None,
+                   quantization: dict = None) -> None:
+        """
+        Function used to create a new canvas, either an empty one or from the frames of an image.
 
         :param width: self explanatory
         :param height: self explanatory
-        :param image: self explanatory
+        :param frames: a list of (load, duration) of every frame, load gives the pixels of the frame
+        :param indexed: keep the pixels as indices into a palette, None to keep the mode of the current canvas
+        :param quantization: the arguments of quantize to reduce the colors of the image, None to keep them
         :return:
         """
 
@@ -129,7 +217,7 @@ class CanvasWidget(QWidget):
         self.canvas_height = height
 
         # Generate again the canvas with the new dimensions
-        self.canvas.new_canvas(width, height, image)
+        self.canvas.new_canvas(width, height, frames, indexed, quantization)
 
         # Generate again the alpha channel with the new dimensions
         self.alpha_channel.new_alpha_channel(width, height)
@@ -143,23 +231,75 @@ class CanvasWidget(QWidget):
         # Reset the number of zooms to 0
         self.zoom = 0
 
+    def transform(self, transform: Transforms, arguments: tuple = ()) -> None:
+        """
+        Function used to flip, rotate, shift or resize the drawing.
+
+        :param transform: the transform
+        :param arguments: the arguments of the transform
+        :return: None
+        """
+
+        self.canvas.transform(transform, arguments)
+        self.canvas_resized()
+
+    def resize_canvas(self, width: int, height: int, anchor: tuple = (1, 1)) -> None:
+        """
+        Function used to change the size of the drawing without scaling it, cropping or adding transparent pixels
+        around the anchor.
+
+        :param width: the new width
+        :param height: the new height
+        :param anchor: the (horizontal, vertical) anchor, 0 keeps the start, 1 the middle and 2 the end
+        :return: None
+        """
+
+        dx = anchor_offset(self.canvas.canvas_width, width, anchor[0])
+        dy = anchor_offset(self.canvas.canvas_height, height, anchor[1])
+
+        self.transform(Transforms.RESIZE, (width, height, dx, dy))
+
     def undo(self) -> None:
         """
-        Too hard to implement plus the lack of time ahaha.
+        Function used to undo the last operation on the canvas.
 
         :return: None
         """
 
         self.canvas.undo()
+        self.canvas_resized()
 
     def redo(self) -> None:
         """
-        Too hard to implement plus the lack of time ahaha.
+        Function used to do again the last undone operation on the canvas.
 
         :return: None
         """
 
         self.canvas.redo()
+        self.canvas_resized()
+
+    def canvas_resized(self) -> None:
+        """
+        Function used to make the alpha channel, the grid and the scene follow the size of the canvas.
+
+        :return: None
+        """
+
+        width, height = self.canvas.canvas_width, self.canvas.canvas_height
+
+        if (width, height) == (self.canvas_width, self.canvas_height):
+            return
+
+        self.canvas_width = width
+        self.canvas_height = height
+
+        self.alpha_channel.new_alpha_channel(width, height)
+        self.grid.new_grid(width, height)
+        self.scene.setSceneRect(0, 0, width, height)
+
+        self.rescale_canvas()
+        self.zoom = 0
 
     def wheelEvent(self, event: QWheelEvent) -> None:
         """
@@ -180,7 +320,7 @@ class CanvasWidget(QWidget):
         else:
 
             # To avoid too many zoom ins
-            if self.zoom == -11:
+            if self.zoom == -self.max_zoom:
                 return
 
             # Decrement the number of zoom ins
@@ -197,6 +337,8 @@ class CanvasWidget(QWidget):
 class Canvas(QLabel):
     """
     This class is the actual canvas that will provide draw or erase actions over an image.
+    The pixels are kept in tiled layers, the tools draw on the active layer and only the visible tiles
+    of the composite are painted.
     """
 
     def __init__(self, status_widget: StatusWidget, width=500, height=250):
@@ -209,7 +351,9 @@ class Canvas(QLabel):
 
         super(Canvas, self).__init__()
 
-        self.image = None
+        # The frames of the drawing and the layers of the current one
+        self.animation = None
+        self.layers = None
 
         self.canvas_width = width
         self.canvas_height = height
@@ -219,9 +363,31 @@ class Canvas(QLabel):
 
         self.pen_color = QColor("#010000")
         self.pen_size = 1
+        self.tolerance = 0
 
         self.grid = None
 
+        self.layers_widget = None
+        self.colors_widget = None
+        self.timeline_widget = None
+
+        # While the animation plays the previous and next frames aren't shown
+        self.playing = False
+
+        # The palette of an indexed drawing, None if the layers keep RGBA pixels
+        self.palette = None
+
+        # When the palette is locked every color applied is the closest palette color, the snapped colors are kept
+        self.palette_lock = False
+        self.lock_colors = None
+        self.snapped = {}
+
+        # The last colors used to draw, the least recently used one is forgotten first
+        self.recent_colors = RecentColors()
+
+        # The operations that can be undone
+        self.history = History()
+
         self.tool = Tools.PEN
 
         self.drawing = True
@@ -229,6 +395,17 @@ class Canvas(QLabel):
         self.current_point = None
         self.last_point = None
 
+        # The spans of the shape drawn while the mouse is dragged
+        self.preview = None
+
+        # The points of the lasso while it is dragged
+        self.lasso = None
+
+        # The pixels that float over the canvas until they are put into the active layer, and the copied ones
+        self.floating = None
+        self.floating_image = None
+        self.clipboard = None
+
         self.setup()
 
     def setup(self) -> None:
@@ -251,16 +428,24 @@ class Canvas(QLabel):
         # Pass the canvas size to the status widget
         self.status_widget.set_dimensions_and_tool(width=self.canvas_width, height=self.canvas_height)
 
-    def new_canvas(self, width: int, height: int, image: QPixmap = None) -> None:
+    def new_canvas(self, width: int, height: int, frames: list = None, indexed: bool = None,
+                   quantization: dict = None) -> None:
         """
-        Function used to create a new canvas, either an empty one or from an image.
+        Function used to create a new canvas, either an empty one or from the frames of an image.
+        Only the first frame is loaded, the others are loaded when they are first needed.
 
         :param width: self explanatory
         :param height: self explanatory
-        :param image: self explanatory
+        :param frames: a list of (load, duration) of every frame, load gives the pixels of the frame
+        :param indexed: keep the pixels as indices into a palette, None to keep the mode of the current canvas
+        :param quantization: the arguments of quantize to reduce the colors of the image, None to keep them
         :return: None
         """
 
+        # An indexed drawing starts with the default palette, the colors of an image are added to it
+        if indexed is not None:
+            self.palette = Palette.from_hex(COLORS) if indexed else None
+
         # Change the size of the canvas
         self.canvas_width = width
         self.canvas_height = height
@@ -270,8 +455,33 @@ class Canvas(QLabel):
         self.setFixedSize(self.canvas_size)
 
         # Create again the canvas with an image or a clear one
-        if image is not None:
-            self.setPixmap(image)
+        if frames:
+            mapped = width * height > MAPPED_CANVAS_AREA
+
+            self.floating = self.floating_image = None
+
+            load, duration = frames[0]
+            pixels = load()
+
+            if quantization is not None:
+                pixels, colors = quantize(pixels, **quantization)
+
+                # An indexed drawing gets the new colors as its palette, unless its own palette was used
+                if self.palette is not None and quantization.get("palette") is None:
+                    self.palette = Palette(colors)
+
+                # The other frames are reduced to the colors found for the first one
+                quantization = dict(quantization, palette=colors)
+
+            self.layers = self.image_layers(pixels, mapped)
+            self.animation = Animation(self.layers, duration)
+            self.history.clear()
+
+            for load, duration in frames[1:]:
+                self.animation.append_frame(lambda load=load: self.load_frame(load, mapped, quantization), duration)
+
+            self.frames_changed()
+            self.palette_changed()
         else:
             # Create the new canvas
             self.create_canvas()
@@ -279,17 +489,75 @@ class Canvas(QLabel):
         # Give the dimensions to the status widget
         self.status_widget.set_dimensions_and_tool(width=self.canvas_width, height=self.canvas_height)
 
-    def save_canvas(self, path: str) -> None:
+    def image_layers(self, pixels: np.ndarray, mapped: bool) -> LayerStack:
+        """
+        Function used to make the layers of a frame with the pixels of an image in a single layer.
+
+        :param pixels: an array with the shape (height, width, 4)
+        :param mapped: keep the tiles in a memory-mapped scratch file
+        :return: the layer stack
+        """
+
+        layers = LayerStack(self.canvas_width, self.canvas_height, mapped, self.palette)
+
+        layer = layers.new_layer_image()
+        layer.write(0, 0, pixels)
+        layers.add_layer(layer)
+
+        return layers
+
+    def load_frame(self, load, mapped: bool, quantization: dict = None) -> LayerStack:
+        """
+        Function used to make the layers of a frame of an opened image, when the frame is first needed.
+
+        :param load: the function that gives the pixels of the frame
+        :param mapped: keep the tiles in a memory-mapped scratch file
+        :param quantization: the arguments of quantize to reduce the colors of the frame, None to keep them
+        :return: the layer stack
+        """
+
+        pixels = load()
+
+        if quantization is not None:
+            pixels, _ = quantize(pixels, **quantization)
+
+        return self.image_layers(pixels, mapped)
+
+    def save_canvas(self, path: str, scales: tuple = (1,), scaler: Scalers = Scalers.NEAREST,
+                    encoding: dict = None) -> None:
         """
         Function used to save the current canvas to a given path.
 
+        :param path: the path where the canvas will be saved
+        :param scales: the integer scales of the copies, the copies bigger than 1x get @2x, @4x... in the name
+        :param scaler: the filter used to scale the copies
+        :param encoding: the arguments of export_scales used to encode the files, None for the default ones
+        :return: None
+        """
+
+        # The copies are written at once, scaling the rows of the composite as they are read from its tiles
+        export_scales(path, self.layers.composite, scales, scaler, **(encoding or {}))
+
+    def save_svg(self, path: str) -> None:
+        """
+        Function used to save the current canvas as an SVG, with a single path of rectangles for every color.
+
         :param path: the path where the canvas will be saved
         :return: None
         """
 
-        # Save the image to the chosen path
-        self.image = ImageQt.fromqpixmap(self.pixmap())
-        self.image.save(path)
+        write_svg(path, self.layers.composite)
+
+    def save_animation(self, path: str) -> None:
+        """
+        Function used to save the frames as an animated GIF or PNG, every frame keeps only what changed since the
+        previous one.
+
+        :param path: the path where the animation will be saved, ending with .gif for a GIF
+        :return: None
+        """
+
+        export_animation(path, [(frame.layers.composite, frame.duration) for frame in self.animation.frames])
 
     def create_canvas(self) -> None:
         """
@@ -298,12 +566,429 @@ class Canvas(QLabel):
         :return: None
         """
 
-        # Create a transparent pixmap
-        pixmap = QPixmap(self.canvas_width, self.canvas_height)
-        pixmap.fill(QColor(0, 0, 0, 0))
+        self.floating = self.floating_image = None
+
+        # An empty layer doesn't allocate any pixel, the big ones keep their tiles in a scratch file
+        self.layers = LayerStack(self.canvas_width, self.canvas_height,
+                                 self.canvas_width * self.canvas_height > MAPPED_CANVAS_AREA, self.palette)
+        self.layers.add_layer()
+        self.animation = Animation(self.layers)
+        self.history.clear()
+
+        self.frames_changed()
+        self.palette_changed()
+
+    @property
+    def tiles(self) -> TiledImage:
+        """
+        Function used to get the pixels of the active layer, the ones the tools draw on.
+
+        :return: the tiled image of the active layer
+        """
+
+        return self.layers.active_layer.image
+
+    def layers_changed(self) -> None:
+        """
+        Function used to repaint the canvas and update the layers panel after the layers were changed.
+
+        :return: None
+        """
+
+        if self.layers_widget is not None:
+            self.layers_widget.refresh_layers()
+
+        self.update()
+
+    def palette_changed(self) -> None:
+        """
+        Function used to show the colors of the palette in the colors panel.
+
+        :return: None
+        """
+
+        if self.colors_widget is not None:
+            self.colors_widget.refresh_colors()
+
+        self.update_palette_lock()
+
+    def palette_colors(self) -> list:
+        """
+        Function used to get the colors of the palette, the colors of the colors panel if the drawing isn't indexed.
+
+        :return: a list of (r, g, b, a) colors
+        """
+
+        if self.palette is not None:
+            return [self.palette.color(index) for index in range(1, self.palette.count)]
+
+        if self.colors_widget is not None:
+            return [hex_to_rgba(button.color) for button in self.colors_widget.color_buttons]
+
+        return [hex_to_rgba(color) for color in COLORS]
+
+    def set_palette_lock(self, locked: bool) -> None:
+        """
+        Function used to lock or unlock the palette, while it is locked the tools apply only palette colors.
+
+        :param locked: self explanatory
+        :return: None
+        """
+
+        self.palette_lock = locked
+        self.update_palette_lock()
+
+        # The pen moves to the closest palette color
+        self.set_pen_color(self.pen_color.name())
+
+    def update_palette_lock(self) -> None:
+        """
+        Function used to keep the colors of the locked palette, the colors snapped to the old ones are forgotten.
+
+        :return: None
+        """
+
+        self.snapped = {}
+
+        if self.palette_lock:
+            self.lock_colors = np.array([color[:3] for color in self.palette_colors()], np.uint8)
+        else:
+            self.lock_colors = None
+
+    def snap_color(self, color: tuple) -> tuple:
+        """
+        Function used to get the closest palette color of a color, if the palette is locked.
+
+        :param color: the (r, g, b, a) color
+        :return: the (r, g, b, a) palette color, or the color itself if the palette isn't locked
+        """
+
+        if self.lock_colors is None:
+            return color
+
+        snapped = self.snapped.get(color)
+
+        if snapped is None:
+            pixel = snap(np.array([[color]], np.uint8), self.lock_colors)[0, 0]
+            snapped = self.snapped[color] = tuple(int(channel) for channel in pixel)
+
+        return snapped
+
+    def snap_to_palette(self) -> None:
+        """
+        Function used to replace every color of every layer of every frame with the closest palette color.
+        The layers are snapped one row of tiles at a time and only the rows with something painted.
+
+        :return: None
+        """
+
+        self.commit_floating()
+
+        colors = np.array([color[:3] for color in self.palette_colors()], np.uint8)
+
+        for stack in self.animation.stacks():
+            for layer in stack.layers:
+                image = layer.image
+
+                for ty in sorted({ty for _, ty in image.tiles}):
+                    _, y, _, height = image.tile_bounds(0, ty)
+                    image.write(0, y, snap(image.read(0, y, image.width, height), colors))
+
+            stack.rebuild()
+
+        self.update()
+
+    def set_palette_color(self, index: int, color: str) -> None:
+        """
+        Function used to change a color of the palette of an indexed drawing.
+        Every pixel with this color is recolored at once, the pen follows the color if it was using it.
+
+        :param index: the index of the entry
+        :param color: the hexadecimal value of the new color
+        :return: None
+        """
+
+        if self.palette is None:
+            return
+
+        old = self.palette.color(index)
+
+        self.animation.set_palette_color(index, QColor(color).getRgb())
+
+        if self.pen_color.getRgb() == old:
+            self.set_pen_color(color)
+
+        self.palette_changed()
+        self.update()
+
+    def add_layer(self) -> None:
+        """
+        Function used to add an empty layer above the active layer.
+
+        :return: None
+        """
+
+        self.layers.add_layer()
+        self.layers_changed()
+
+    def remove_layer(self) -> None:
+        """
+        Function used to delete the active layer.
+
+        :return: None
+        """
+
+        self.layers.remove_layer(self.layers.active)
+        self.layers_changed()
+
+    def move_layer(self, offset: int) -> None:
+        """
+        Function used to move the active layer up or down.
+
+        :param offset: +1 to move it up, -1 to move it down
+        :return: None
+        """
+
+        self.layers.move_layer(self.layers.active, offset)
+        self.layers_changed()
+
+    def set_active_layer(self, index: int) -> None:
+        """
+        Function used to change the layer the tools draw on.
+
+        :param index: the index of the layer, 0 is the bottom one
+        :return: None
+        """
+
+        self.layers.set_active(index)
+        self.update()
+
+    def set_layer_visible(self, index: int, visible: bool) -> None:
+        """
+        Function used to show or hide a layer.
+
+        :param index: the index of the layer
+        :param visible: self explanatory
+        :return: None
+        """
+
+        self.layers.set_visible(index, visible)
+        self.update()
+
+    def set_layer_opacity(self, index: int, opacity: float) -> None:
+        """
+        Function used to change the opacity of a layer.
+
+        :param index: the index of the layer
+        :param opacity: the opacity, between 0 and 1
+        :return: None
+        """
+
+        self.layers.set_opacity(index, opacity)
+        self.update()
+
+    def set_layer_blend_mode(self, index: int, mode: Blends) -> None:
+        """
+        Function used to change the blend mode of a layer.
+
+        :param index: the index of the layer
+        :param mode: the blend mode
+        :return: None
+        """
+
+        self.layers.set_blend_mode(index, mode)
+        self.update()
+
+    def frames_changed(self) -> None:
+        """
+        Function used to show the current frame and update the timeline and the layers panel after the frames
+        were changed.
+
+        :return: None
+        """
+
+        self.layers = self.animation.layers
+
+        if self.timeline_widget is not None:
+            self.timeline_widget.refresh_frames()
+
+        self.layers_changed()
+
+    def add_frame(self, copy: bool = True) -> None:
+        """
+        Function used to add a frame after the current one.
+
+        :param copy: start from the pixels of the current frame, else from empty layers
+        :return: None
+        """
+
+        self.deselect()
+        self.animation.add_frame(copy)
+        self.frames_changed()
+
+    def remove_frame(self) -> None:
+        """
+        Function used to delete the current frame.
+
+        :return: None
+        """
+
+        self.deselect()
+        self.animation.remove_frame(self.animation.current)
+        self.frames_changed()
+
+    def move_frame(self, offset: int) -> None:
+        """
+        Function used to move the current frame earlier or later.
+
+        :param offset: -1 to move it earlier, +1 to move it later
+        :return: None
+        """
+
+        self.deselect()
+        self.animation.move_frame(self.animation.current, offset)
+        self.frames_changed()
+
+    def set_frame(self, index: int) -> None:
+        """
+        Function used to change the frame that is shown and drawn on.
+
+        :param index: the index of the frame, 0 is the first one
+        :return: None
+        """
+
+        if index == self.animation.current:
+            return
+
+        self.deselect()
+        self.animation.set_current(index)
+        self.frames_changed()
+
+    def set_frame_duration(self, duration: int) -> None:
+        """
+        Function used to change how long the current frame is shown.
+
+        :param duration: the duration in milliseconds
+        :return: None
+        """
+
+        self.animation.frames[self.animation.current].duration = duration
 
-        # Set the pixmap to canvas
-        self.setPixmap(pixmap)
+    def set_onion_skin(self, shown: bool) -> None:
+        """
+        Function used to show or hide the previous and next frames under the current one.
+
+        :param shown: self explanatory
+        :return: None
+        """
+
+        self.animation.onion_skin = shown
+        self.update()
+
+    def set_playing(self, playing: bool) -> None:
+        """
+        Function used to know if the animation plays, the previous and next frames are hidden meanwhile.
+
+        :param playing: self explanatory
+        :return: None
+        """
+
+        self.playing = playing
+        self.update()
+
+    def refresh(self, rect: QRect) -> None:
+        """
+        Function used to blend again the changed tiles of the active layer and repaint a region.
+
+        :param rect: the changed region
+        :return: None
+        """
+
+        self.layers.refresh_dirty()
+
+        self.update(rect)
+
+    def tile_image(self, tx: int, ty: int, image: TiledImage = None):
+        """
+        Function used to get the image used to paint a tile of the composite.
+        The image is built over the tile's memory, nothing is copied.
+
+        :param tx: the column of the tile
+        :param ty: the row of the tile
+        :param image: the RGBA tiled image, the composite if None
+        :return: (tile, image) or None if the tile is not allocated, the tile must be kept while the image is used
+        """
+
+        tile = (image or self.layers.composite).get_tile(tx, ty)
+
+        if tile is None:
+            return None
+
+        return tile, QImage(sip.voidptr(tile.ctypes.data), tile.shape[1], tile.shape[0], tile.strides[0],
+                            QImage.Format_RGBA8888)
+
+    @contextmanager
+    def paint_region(self, rect: QRect):
+        """
+        Function used to draw with a QPainter over a region of the canvas.
+        The region is copied out of the tiles, painted and written back when the block ends,
+        so only the tiles touched by the drawing are allocated.
+        An indexed drawing can't hold the blended colors of a soft drawing, so the painter draws over a transparent
+        region instead and what it paints is taken as the coverage of the pen: the pixels covered at least by half
+        get the pen color and the others are left as they were.
+
+        :param rect: the region, in canvas coordinates, that the drawing can change
+        :return: the painter, it uses canvas coordinates
+        """
+
+        rect = rect.intersected(self.rect())
+
+        pixels = self.tiles.read(rect.x(), rect.y(), rect.width(), rect.height())
+
+        # The coverage of the pen is painted apart for an indexed drawing
+        painted = np.zeros_like(pixels) if self.palette is not None else pixels
+
+        image = QImage(sip.voidptr(painted.ctypes.data), rect.width(), rect.height(), rect.width() * 4,
+                       QImage.Format_RGBA8888)
+
+        painter = QPainter(image)
+        painter.translate(-rect.x(), -rect.y())
+
+        # Keep a copy to find what was painted, if the painted colors have to be snapped to the palette
+        before = pixels.copy() if self.lock_colors is not None else None
+
+        yield painter
+
+        painter.end()
+
+        # The pen color goes where the pen covers at least half of a pixel, at full coverage its alpha is the pen's
+        if self.palette is not None:
+            alpha = painted[..., 3].astype(np.int32)
+            pixels[(alpha > 0) & (2 * alpha >= self.pen_color.alpha())] = self.pen_color.getRgb()
+
+        if before is not None:
+            changed = (pixels != before).any(axis=2)
+            pixels[changed] = snap(pixels, self.lock_colors)[changed]
+
+        self.tiles.write(rect.x(), rect.y(), pixels)
+
+        self.refresh(rect)
+
+    def stroke_rect(self, *points: QPoint) -> QRect:
+        """
+        Function used to get the region that a stroke between some points can change.
+
+        :param points: the points of the stroke
+        :return: the bounding rectangle grown by the pen size
+        """
+
+        rect = QRect(points[0], points[0])
+        for point in points[1:]:
+            rect = rect.united(QRect(point, point))
+
+        margin = self.pen_size + 2
+
+        return rect.normalized().adjusted(-margin, -margin, margin, margin)
 
     def set_tool(self, tool: Tools) -> None:
         """
@@ -313,6 +998,10 @@ class Canvas(QLabel):
         :return: None
         """
 
+        # The floating pixels are put down when another tool is used
+        if tool != Tools.MOVE:
+            self.commit_floating()
+
         self.tool = tool
 
         # Pass the canvas tool to the status widget
@@ -337,8 +1026,16 @@ class Canvas(QLabel):
 
         self.pen_color = QColor(color)
 
+        # A locked palette keeps the pen on its colors
+        if self.palette_lock:
+            self.pen_color = QColor(*self.snap_color(self.pen_color.getRgb()))
+
+        # Remember the color, the strip of the recent colors changes only if the order changed
+        if self.recent_colors.use(self.pen_color.name()) and self.colors_widget is not None:
+            self.colors_widget.refresh_recent()
+
         # Pass the canvas pen color to the status widget
-        self.status_widget.set_color(color)
+        self.status_widget.set_color(self.pen_color.name())
 
         # Change to pen if we change the color
         if self.tool == Tools.ERASER:
@@ -358,25 +1055,97 @@ class Canvas(QLabel):
 
         self.pen_size = int(value)
 
+    def set_tolerance(self, value: str) -> None:
+        """
+        Function used to change how different a color can be and still be replaced by the fill.
+
+        :param value: the biggest difference allowed on a channel
+        :return: None
+        """
+
+        self.tolerance = int(value)
+
+    def transform(self, transform: Transforms, arguments: tuple = ()) -> None:
+        """
+        Function used to flip, rotate, shift or resize the whole drawing and remember it in the history.
+
+        :param transform: the transform
+        :param arguments: the arguments of the transform
+        :return: None
+        """
+
+        operation = Operation(transform, arguments, (self.canvas_width, self.canvas_height))
+
+        operation.cropped = self.apply_transform(transform, arguments)
+
+        self.history.record(operation)
+
+    def apply_transform(self, transform: Transforms, arguments: tuple, bases: dict = None) -> dict:
+        """
+        Function used to apply a transform to every layer of every frame, the size of the canvas follows the size
+        of the layers.
+
+        :param transform: the transform
+        :param arguments: the arguments of the transform
+        :param bases: the images a resize pastes the pixels of every layer into, they hold the pixels it cropped
+        :return: the pixels of every layer cropped by a resize
+        """
+
+        # The floating pixels are put down and the selection doesn't match the new pixels
+        self.deselect()
+
+        images = {layer: layer.image for stack in self.animation.stacks() for layer in stack.layers}
+
+        self.animation.transform(transform, arguments, bases)
+
+        # Keep what a resize cropped, the images before the resize aren't used anymore
+        cropped = {}
+        if transform == Transforms.RESIZE:
+            for layer, image in images.items():
+                remainder = crop_remainder(image, *arguments)
+                if remainder is not None:
+                    cropped[layer] = remainder
+
+        # Change the size of the canvas
+        self.canvas_width, self.canvas_height = self.layers.width, self.layers.height
+        self.canvas_size = QSize(self.canvas_width, self.canvas_height)
+        self.setFixedSize(self.canvas_size)
+
+        self.status_widget.set_dimensions_and_tool(width=self.canvas_width, height=self.canvas_height)
+
+        self.layers_changed()
+
+        return cropped
+
     def undo(self) -> None:
         """
-        Too hard to implement plus the lack of time ahaha.
+        Function used to undo the last operation, by applying its inverse.
 
         :return: None
         """
 
-        # TODO
-        pass
+        operation = self.history.undo()
+
+        if operation is None:
+            return
+
+        transform, arguments = inverse(operation.transform, operation.arguments, operation.size)
+
+        operation.restored = self.apply_transform(transform, arguments, operation.cropped)
 
     def redo(self) -> None:
         """
-        Too hard to implement plus the lack of time ahaha.
+        Function used to do again the last undone operation.
 
         :return: None
         """
 
-        # TODO
-        pass
+        operation = self.history.redo()
+
+        if operation is None:
+            return
+
+        operation.cropped = self.apply_transform(operation.transform, operation.arguments, operation.restored)
 
     def mouseReleaseEvent(self, event: QMouseEvent) -> None:
         """
@@ -395,6 +1164,10 @@ class Canvas(QLabel):
             Tools.LINE: self.draw_line,
             Tools.SQUARE: self.draw_square,
             Tools.CIRCLE: self.draw_circle,
+            Tools.FILLED_SQUARE: self.draw_square,
+            Tools.FILLED_CIRCLE: self.draw_circle,
+            Tools.SELECT: self.select_rect,
+            Tools.LASSO: self.select_lasso,
             Tools.BRUSH: self.brush
         }
         try:
@@ -427,9 +1200,14 @@ class Canvas(QLabel):
             Tools.LINE: self.draw_line,
             Tools.SQUARE: self.draw_square,
             Tools.CIRCLE: self.draw_circle,
+            Tools.FILLED_SQUARE: self.draw_square,
+            Tools.FILLED_CIRCLE: self.draw_circle,
             Tools.BRUSH: self.brush,
             Tools.FILL: self.fill,
-            Tools.PICKER: self.pick_color
+            Tools.PICKER: self.pick_color,
+            Tools.MAGIC_WAND: self.magic_wand,
+            Tools.MOVE: self.start_move,
+            Tools.LASSO: self.start_lasso
         }
         try:
             tools.get(self.tool)(event)
@@ -451,6 +1229,11 @@ class Canvas(QLabel):
             Tools.LINE: self.update_current_point,
             Tools.SQUARE: self.update_current_point,
             Tools.CIRCLE: self.update_current_point,
+            Tools.FILLED_SQUARE: self.update_current_point,
+            Tools.FILLED_CIRCLE: self.update_current_point,
+            Tools.SELECT: self.update_current_point,
+            Tools.LASSO: self.extend_lasso,
+            Tools.MOVE: self.move_floating,
             Tools.BRUSH: self.brush
         }
         try:
@@ -461,6 +1244,7 @@ class Canvas(QLabel):
     def paintEvent(self, event: QPaintEvent) -> None:
         """
         Function used to update the canvas when a paint event occurs.
+        Only the allocated tiles that intersect the updated region are painted.
 
         :param event: the event
         :return: None
@@ -468,31 +1252,115 @@ class Canvas(QLabel):
 
         painter = QPainter(self)
 
-        painter.setPen(QPen(self.pen_color,
-                            self.pen_size,
-                            Qt.SolidLine,
-                            Qt.SquareCap,
-                            Qt.RoundJoin))
+        rect = event.rect()
+
+        # Draw the previous and next frames faded under the current one, but not while the animation plays
+        onion = None if self.playing else self.animation.onion_image()
+        if onion is not None:
+            for tx, ty in onion.allocated_in_rect(rect.x(), rect.y(), rect.width(), rect.height()):
+                tile_image = self.tile_image(tx, ty, onion)
+                if tile_image is not None:
+                    painter.drawImage(tx * onion.tile_size, ty * onion.tile_size, tile_image[1])
+
+        composite = self.layers.composite
+        for tx, ty in composite.allocated_in_rect(rect.x(), rect.y(), rect.width(), rect.height()):
+            tile_image = self.tile_image(tx, ty)
+            if tile_image is not None:
+                painter.drawImage(tx * composite.tile_size, ty * composite.tile_size, tile_image[1])
+
+        # Draw the border of the selection
+        if self.layers.selection is not None:
+            self.paint_spans(painter, self.layers.selection.outline(), rect, QColor(COLOR_HOVER))
+
+        # Draw the floating pixels over everything, with their border
+        if self.floating is not None:
+            painter.drawImage(self.floating.x, self.floating.y, self.floating_image)
+
+            painter.translate(self.floating.x, self.floating.y)
+            self.paint_spans(painter, self.floating.outline, rect.translated(-self.floating.x, -self.floating.y),
+                             QColor(COLOR_HOVER))
+            painter.resetTransform()
+
+        # Draw the temporary shape over Canvas, the selections are shown in the color of the selection
+        if self.last_point and self.current_point and self.preview is not None:
+            color = self.pen_color
+            if self.tool == Tools.SELECT:
+                color = QColor(COLOR_HOVER)
+            elif self.tool == Tools.LASSO:
+                color = QColor(64, 78, 237, 100)
+
+            self.paint_spans(painter, self.preview, rect, color)
+
+    @staticmethod
+    def paint_spans(painter: QPainter, spans, rect: QRect, color: QColor) -> None:
+        """
+        Function used to paint spans, only their rows that are updated, joined into rectangles.
+
+        :param painter: the painter of the canvas
+        :param spans: the spans
+        :param rect: the updated region
+        :param color: the color of the spans
+        :return: None
+        """
+
+        rows = spans[:, 0]
+        visible = spans[(rows >= rect.top()) & (rows <= rect.bottom())]
+
+        for x, y, width, height in spans_to_rects(visible).tolist():
+            painter.fillRect(x, y, width, height, color)
+
+    def shape_spans(self, start: QPoint, end: QPoint):
+        """
+        Function used to rasterize the shape of the current tool between 2 points.
+        The same spans are used for the preview and for the drawing, so they always match.
+
+        :param start: the point where the mouse was pressed
+        :param end: the current point of the mouse
+        :return: the spans of the shape or None if the tool doesn't draw a shape
+        """
 
-        painter.drawPixmap(self.rect(), self.pixmap())
+        if self.tool == Tools.LINE:
+            xs, ys = line(start.x(), start.y(), end.x(), end.y())
+            return stroke(xs, ys, self.pen_size)
+
+        if self.tool == Tools.SQUARE:
+            xs, ys = rectangle(start.x(), start.y(), end.x(), end.y())
+            return stroke(xs, ys, self.pen_size)
+
+        # The selection rectangle is always 1 pixel wide
+        if self.tool == Tools.SELECT:
+            xs, ys = rectangle(start.x(), start.y(), end.x(), end.y())
+            return stroke(xs, ys, 1)
+
+        if self.tool == Tools.CIRCLE:
+            # The ellipse is centered in the first point and passes through the second one
+            spans = ellipse(start.x(), start.y(), end.x() - start.x(), end.y() - start.y())
+            if self.pen_size == 1:
+                return spans
+            xs, ys = spans_to_points(spans)
+            return stroke(xs, ys, self.pen_size, True)
+
+        # The filled shapes are a single span on every row, whatever the pen size is
+        if self.tool == Tools.FILLED_SQUARE:
+            return filled_rectangle(start.x(), start.y(), end.x(), end.y())
+
+        if self.tool == Tools.FILLED_CIRCLE:
+            return filled_ellipse(start.x(), start.y(), end.x() - start.x(), end.y() - start.y())
+
+        return None
+
+    def draw_spans(self, spans) -> None:
+        """
+        Function used to write spans with the pen color straight into the active layer.
 
-        if self.last_point and self.current_point:
-            # Draw a temporary line over Canvas
-            if self.tool == Tools.LINE:
-                painter.drawLine(self.last_point, self.current_point)
+        :param spans: the spans
+        :return: None
+        """
 
-            # Draw a temporary square over Canvas
-            if self.tool == Tools.SQUARE:
-                painter.drawLine(self.last_point, QPoint(self.last_point.x(), self.current_point.y()))
-                painter.drawLine(self.last_point, QPoint(self.current_point.x(), self.last_point.y()))
-                painter.drawLine(QPoint(self.last_point.x(), self.current_point.y()), self.current_point)
-                painter.drawLine(QPoint(self.current_point.x(), self.last_point.y()), self.current_point)
+        area = self.tiles.fill_spans(spans, self.pen_color.getRgb())
 
-            # Draw a temporary ellipse over Canvas
-            if self.tool == Tools.CIRCLE:
-                painter.drawEllipse(self.last_point,
-                                    self.current_point.x() - self.last_point.x(),
-                                    self.current_point.y() - self.last_point.y())
+        if area is not None:
+            self.refresh(QRect(*area))
 
     def draw_point(self, event: QMouseEvent) -> None:
         """
@@ -503,298 +1371,530 @@ class Canvas(QLabel):
         """
 
         if self.drawing:
-            painter = QPainter(self.pixmap())
+            self.draw_spans(stroke([event.pos().x()], [event.pos().y()], self.pen_size))
 
-            painter.setPen(QPen(self.pen_color,
-                                self.pen_size,
-                                Qt.SolidLine,
-                                Qt.SquareCap,
-                                Qt.RoundJoin))
+            self.last_point = event.pos()
 
-            painter.drawPoint(event.pos())
+    def draw_points(self, event: QMouseEvent) -> None:
+        """
+        Function used to draw points after the cursor.
 
-            painter.end()
+        :param event: the event
+        :return: None
+        """
 
-            self.update()
+        if self.drawing:
+            xs, ys = line(self.last_point.x(), self.last_point.y(), event.pos().x(), event.pos().y())
+            self.draw_spans(stroke(xs, ys, self.pen_size, True))
 
             self.last_point = event.pos()
 
-    def draw_points(self, event: QMouseEvent) -> None:
+    def erase_points(self, event: QMouseEvent) -> None:
         """
-        Function used to draw points after the cursor.
+        Function used to erase points after the cursor.
 
         :param event: the event
         :return: None
         """
 
         if self.drawing:
-            painter = QPainter(self.pixmap())
+            r = QRect(QPoint(), self.pen_size * QSize(1, 1))
+            r.moveCenter(event.pos())
+
+            # Tiles that become transparent are released
+            self.tiles.fill_rect(r.x(), r.y(), r.width(), r.height(), (0, 0, 0, 0))
 
-            painter.setPen(QPen(self.pen_color,
-                                self.pen_size,
-                                Qt.SolidLine,
-                                Qt.RoundCap,
-                                Qt.RoundJoin))
+            self.refresh(r)
 
-            painter.drawLine(self.last_point, event.pos())
+            self.last_point = event.pos()
 
-            painter.end()
+    def draw_line(self, event: QMouseEvent) -> None:
+        """
+        Function used to draw a line between 2 points.
 
-            self.update()
+        :param event: the event
+        :return: None
+        """
 
-            self.last_point = event.pos()
+        self.draw_spans(self.shape_spans(self.last_point, self.current_point))
 
-    def erase_points(self, event: QMouseEvent) -> None:
+        self.last_point = self.current_point = self.preview = None
+
+    def draw_square(self, event: QMouseEvent) -> None:
         """
-        Function used to erase points after the cursor.
+        Function used to draw a square.
 
         :param event: the event
         :return: None
         """
 
-        if self.drawing:
-            painter = QPainter(self.pixmap())
+        self.draw_spans(self.shape_spans(self.last_point, event.pos()))
+
+        self.last_point = event.pos()
+        self.current_point = self.preview = None
 
-            painter.setPen(QPen(self.pen_color,
-                                self.pen_size,
-                                Qt.SolidLine,
-                                Qt.RoundCap,
-                                Qt.RoundJoin))
+    def draw_circle(self, event: QMouseEvent) -> None:
+        """
+        Function used to draw a circle.
 
-            painter.save()
+        :param event: the event
+        :return: None
+        """
 
-            r = QRect(QPoint(), self.pen_size * QSize())
-            r.moveCenter(event.pos())
+        self.draw_spans(self.shape_spans(self.last_point, self.current_point))
 
-            painter.setCompositionMode(QPainter.CompositionMode_Clear)
+        self.last_point = self.current_point = self.preview = None
 
-            painter.eraseRect(r)
+    def brush(self, event: QMouseEvent) -> None:
+        """
+        Function used to draw points after the cursor with a brush effect.
 
-            painter.end()
+        :param event: the event
+        :return: None
+        """
 
-            self.update()
+        if self.drawing:
+            with self.paint_region(self.stroke_rect(self.last_point, event.pos())) as painter:
+                painter.setPen(QPen(self.pen_color,
+                                    self.pen_size,
+                                    Qt.SolidLine,
+                                    Qt.RoundCap,
+                                    Qt.RoundJoin))
+
+                painter.setOpacity(0.15)
+
+                for i in range(2):
+                    for j in range(2):
+                        painter.drawLine(QPoint(self.last_point.x() + i, self.last_point.y() + j),
+                                         QPoint(event.pos().x() + i, event.pos().y() + j))
+                        painter.drawLine(QPoint(self.last_point.x() + i, self.last_point.y() - j),
+                                         QPoint(event.pos().x() + i, event.pos().y() - j))
+                        painter.drawLine(QPoint(self.last_point.x() - i, self.last_point.y() + j),
+                                         QPoint(event.pos().x() - i, event.pos().y() + j))
+                        painter.drawLine(QPoint(self.last_point.x() - i, self.last_point.y() - j),
+                                         QPoint(event.pos().x() - i, event.pos().y() - j))
+
+                painter.setOpacity(1.0)
+
+                painter.drawLine(self.last_point, event.pos())
 
             self.last_point = event.pos()
 
-    def draw_line(self, event: QMouseEvent) -> None:
+    def fill(self, event: QMouseEvent) -> None:
         """
-        Function used to draw a line between 2 points.
+        Function used to replace a color with another color from a section.
+        With shift pressed the color is replaced everywhere on the layer, not only where it touches.
 
         :param event: the event
         :return: None
         """
 
-        painter = QPainter(self.pixmap())
+        x, y = event.pos().x(), event.pos().y()
 
-        painter.setPen(QPen(self.pen_color,
-                            self.pen_size,
-                            Qt.SolidLine,
-                            Qt.SquareCap,
-                            Qt.RoundJoin))
+        if event.modifiers() & Qt.ShiftModifier:
+            area = self.tiles.replace_color(self.tiles.pixel(x, y), self.pen_color.getRgb(), self.tolerance)
+        else:
+            # The fill visits only the tiles of the section
+            area = self.tiles.flood_fill(x, y, self.pen_color.getRgb(), self.tolerance)
 
-        painter.drawLine(self.last_point, self.current_point)
+        if area is not None:
+            self.refresh(QRect(*area))
 
-        painter.end()
+        self.last_point = event.pos()
 
-        self.update()
+        # Switch immediately to the pen because why not
+        self.set_tool(Tools.PEN)
 
-        self.last_point = self.current_point = None
+    def pick_color(self, event: QMouseEvent) -> None:
+        """
+        Function used to pick a color from a certain pixel.
 
-    def draw_square(self, event: QMouseEvent) -> None:
+        :param event: the event
+        :return: None
         """
-        Function used to draw a square.
+
+        # Extract the color of the target pixel as it is seen, if is on the png part of the image it will be black
+        r, g, b, _ = self.layers.composite.pixel(event.pos().x(), event.pos().y())
+        color = QColor(r, g, b)
+
+        # Update the position because it will do weird stuff if not
+        self.last_point = event.pos()
+
+        # Set the color to the pen
+        self.set_pen_color(color.name())
+
+        # Switch immediately to the pen because why not
+        self.set_tool(Tools.PEN)
+
+    @staticmethod
+    def selection_mode(event: QMouseEvent) -> SelectionModes:
+        """
+        Function used to find how a new selection changes the current one, from the pressed keys.
+        Shift adds to the selection, control subtracts from it and both keep only the common part.
 
         :param event: the event
+        :return: the mode
+        """
+
+        shift = bool(event.modifiers() & Qt.ShiftModifier)
+        control = bool(event.modifiers() & Qt.ControlModifier)
+
+        if shift and control:
+            return SelectionModes.INTERSECT
+        if shift:
+            return SelectionModes.UNION
+        if control:
+            return SelectionModes.SUBTRACT
+
+        return SelectionModes.REPLACE
+
+    def set_selection(self, selection: Selection, mode: SelectionModes = SelectionModes.REPLACE) -> None:
+        """
+        Function used to change the selection, all tools draw only inside it.
+
+        :param selection: the new selection or None to select nothing
+        :param mode: how the new selection changes the current one
         :return: None
         """
 
-        painter = QPainter(self.pixmap())
+        current = self.layers.selection
 
-        painter.setPen(QPen(self.pen_color,
-                            self.pen_size,
-                            Qt.SolidLine,
-                            Qt.SquareCap,
-                            Qt.RoundJoin))
+        if selection is not None and current is not None:
+            selection = current.combine(selection, mode)
+        elif mode in (SelectionModes.SUBTRACT, SelectionModes.INTERSECT):
+            selection = current if mode == SelectionModes.SUBTRACT else None
 
-        painter.drawLine(self.last_point, QPoint(self.last_point.x(), event.pos().y()))
-        painter.drawLine(self.last_point, QPoint(event.pos().x(), self.last_point.y()))
-        painter.drawLine(QPoint(self.last_point.x(), event.pos().y()), event.pos())
-        painter.drawLine(QPoint(event.pos().x(), self.last_point.y()), event.pos())
+        # Nothing selected is the same as no selection
+        if selection is not None and selection.is_empty():
+            selection = None
 
-        painter.end()
+        self.layers.set_selection(selection)
 
         self.update()
 
-        self.last_point = event.pos()
-        self.current_point = None
-
-    def draw_circle(self, event: QMouseEvent) -> None:
+    def select_rect(self, event: QMouseEvent) -> None:
         """
-        Function used to draw a circle.
+        Function used to select a rectangle, a click without moving the mouse selects nothing.
 
         :param event: the event
         :return: None
         """
 
-        painter = QPainter(self.pixmap())
+        start, end = self.last_point, event.pos()
 
-        painter.setPen(QPen(self.pen_color,
-                            self.pen_size,
-                            Qt.SolidLine,
-                            Qt.RoundCap,
-                            Qt.RoundJoin))
+        if start == end:
+            self.set_selection(None)
+        else:
+            rect = QRect(start, end).normalized()
+            self.set_selection(Selection.from_rect(self.canvas_width, self.canvas_height, rect.x(), rect.y(),
+                                                   rect.width(), rect.height()), self.selection_mode(event))
 
-        painter.drawEllipse(self.last_point,
-                            self.current_point.x() - self.last_point.x(),
-                            self.current_point.y() - self.last_point.y())
-        painter.end()
+        self.last_point = self.current_point = self.preview = None
 
-        self.update()
+    def lasso_spans(self):
+        """
+        Function used to rasterize the area inside the lasso, its border included.
 
-        self.last_point = self.current_point = None
+        :return: the spans of the area
+        """
 
-    def brush(self, event: QMouseEvent) -> None:
+        xs, ys = np.array(self.lasso[0]), np.array(self.lasso[1])
+
+        # The inside with the even-odd rule and the border drawn as 1 pixel wide lines
+        inside = polygon(xs, ys)
+        border = stroke(*polyline(xs, ys, True), 1)
+
+        return merge_spans(np.concatenate((inside, border)))
+
+    def start_lasso(self, event: QMouseEvent) -> None:
         """
-        Function used to draw points after the cursor with a brush effect.
+        Function used to start a lasso where the mouse was pressed.
 
         :param event: the event
         :return: None
         """
 
-        if self.drawing:
-            painter = QPainter(self.pixmap())
+        self.lasso = ([event.pos().x()], [event.pos().y()])
 
-            painter.setPen(QPen(self.pen_color,
-                                self.pen_size,
-                                Qt.SolidLine,
-                                Qt.RoundCap,
-                                Qt.RoundJoin))
+    def extend_lasso(self, event: QMouseEvent) -> None:
+        """
+        Function used to add the point under the cursor to the lasso and show the area inside it.
+        The area is rasterized again on every move, it takes a few milliseconds even with thousands of points.
 
-            painter.setOpacity(0.15)
+        :param event: the event
+        :return: None
+        """
 
-            for i in range(2):
-                for j in range(2):
-                    painter.drawLine(QPoint(self.last_point.x() + i, self.last_point.y() + j),
-                                     QPoint(event.pos().x() + i, event.pos().y() + j))
-                    painter.drawLine(QPoint(self.last_point.x() + i, self.last_point.y() - j),
-                                     QPoint(event.pos().x() + i, event.pos().y() - j))
-                    painter.drawLine(QPoint(self.last_point.x() - i, self.last_point.y() + j),
-                                     QPoint(event.pos().x() - i, event.pos().y() + j))
-                    painter.drawLine(QPoint(self.last_point.x() - i, self.last_point.y() - j),
-                                     QPoint(event.pos().x() - i, event.pos().y() - j))
+        if self.lasso is None or not self.drawing:
+            return
 
-            painter.setOpacity(1.0)
+        x, y = event.pos().x(), event.pos().y()
 
-            painter.drawLine(self.last_point, event.pos())
+        if (x, y) == (self.lasso[0][-1], self.lasso[1][-1]):
+            return
 
-            painter.end()
+        self.lasso[0].append(x)
+        self.lasso[1].append(y)
 
-            self.update()
+        old = self.spans_rect(self.preview)
 
-            self.last_point = event.pos()
+        self.current_point = event.pos()
+        self.preview = self.lasso_spans()
 
-    def fill(self, event: QMouseEvent) -> None:
+        self.update(old.united(self.spans_rect(self.preview)))
+
+    def select_lasso(self, event: QMouseEvent) -> None:
         """
-        Function used to replace a color with another color from a section.
+        Function used to select the area inside the lasso when the mouse is released.
+
+        :param event: the event
+        :return: None
+        """
+
+        if self.lasso is None:
+            return
+
+        # A click without moving the mouse selects nothing, like the rectangle selection
+        if len(self.lasso[0]) == 1:
+            self.set_selection(None)
+        else:
+            self.set_selection(Selection.from_spans(self.canvas_width, self.canvas_height, self.lasso_spans()),
+                               self.selection_mode(event))
+
+        self.update(self.spans_rect(self.preview))
+
+        self.lasso = None
+        self.last_point = self.current_point = self.preview = None
+
+    def magic_wand(self, event: QMouseEvent) -> None:
+        """
+        Function used to select the contiguous area of the same color as the clicked pixel.
 
         :param event: the event
         :return: None
         """
 
-        painter = QPainter(self.pixmap())
+        masks = self.tiles.flood_region(event.pos().x(), event.pos().y(), self.tolerance, False)
+
+        self.set_selection(Selection.from_masks(self.canvas_width, self.canvas_height, masks),
+                           self.selection_mode(event))
+
+    def selected_pixels(self):
+        """
+        Function used to copy the selected pixels of the active layer, cut to the smallest rectangle that holds them.
+
+        :return: (pixels, mask, x, y) with the pixels transparent outside the mask, or None if nothing is selected
+        """
 
-        painter.setPen(QPen(self.pen_color,
-                            1,
-                            Qt.SolidLine,
-                            Qt.RoundCap,
-                            Qt.RoundJoin))
+        selection = self.layers.selection
 
-        image = self.pixmap().toImage()
+        if selection is None:
+            return None
 
-        # Extract the color of the target pixel, if is on the png part of the image it will be black
-        color = QColor(image.pixel(event.pos()))
+        x, y, width, height = selection.bounds()
+        mask = selection.read(x, y, width, height)
 
-        # Draw the first point, where was pressed
-        painter.drawPoint(self.last_point)
+        # Cut the empty rows and columns around the selection
+        rows = np.flatnonzero(mask.any(axis=1))
+        columns = np.flatnonzero(mask.any(axis=0))
 
-        self.recursive_fill(self.last_point.x(), self.last_point.y(), color, painter)
+        top, bottom = int(rows[0]), int(rows[-1]) + 1
+        left, right = int(columns[0]), int(columns[-1]) + 1
 
-        painter.end()
+        mask = np.ascontiguousarray(mask[top:bottom, left:right])
 
-        self.update()
+        pixels = self.tiles.read(x + left, y + top, right - left, bottom - top)
+        pixels[~mask] = 0
 
-        self.last_point = event.pos()
+        return pixels, mask, x + left, y + top
 
-        # Switch immediately to the pen because why not
-        self.set_tool(Tools.PEN)
+    def copy_selection(self) -> None:
+        """
+        Function used to copy the selected pixels of the active layer.
+
+        :return: None
+        """
+
+        self.commit_floating()
+
+        copied = self.selected_pixels()
+        if copied is not None:
+            self.clipboard = copied
+
+    def cut_selection(self) -> None:
+        """
+        Function used to copy the selected pixels of the active layer and erase them.
 
-    def recursive_fill(self, x: int, y: int, color: QColor, painter: QPainter) -> None:
+        :return: None
+        """
+
+        self.copy_selection()
+        self.erase_selection()
+
+    def erase_selection(self) -> None:
         """
-        Function used to do the actual fill.
+        Function used to erase the selected pixels of the active layer, the selection clips the erasing.
 
-        :param x: self explanatory
-        :param y: self explanatory
-        :param color: self explanatory
-        :param painter: the painter use to draw
         :return: None
         """
 
-        image = self.pixmap().toImage()
+        if self.layers.selection is None:
+            return
 
-        if QColor(image.pixel(x + 1, y)) == color:
-            painter.drawPoint(QPoint(x + 1, y))
-            self.update()
-            self.recursive_fill(x + 1, y, color, painter)
+        x, y, width, height = self.layers.selection.bounds()
 
-        if QColor(image.pixel(x, y + 1)) == color:
-            painter.drawPoint(QPoint(x, y + 1))
-            self.update()
-            self.recursive_fill(x, y + 1, color, painter)
+        self.tiles.fill_rect(x, y, width, height, (0, 0, 0, 0))
 
-        if QColor(image.pixel(x - 1, y)) == color:
-            painter.drawPoint(QPoint(x - 1, y))
-            self.update()
-            self.recursive_fill(x - 1, y, color, painter)
+        self.refresh(QRect(x, y, width, height))
 
-        if QColor(image.pixel(x, y - 1)) == color:
-            painter.drawPoint(QPoint(x, y - 1))
-            self.update()
-            self.recursive_fill(x, y - 1, color, painter)
+    def paste(self) -> None:
+        """
+        Function used to paste the copied pixels where they were copied from, they float until they are put down.
+        The floating pixels share the copied ones, so pasting many times copies nothing.
 
-    def pick_color(self, event: QMouseEvent) -> None:
+        :return: None
         """
-        Function used to pick a color from a certain pixel.
+
+        if self.clipboard is None:
+            return
+
+        self.commit_floating()
+        self.set_selection(None)
+
+        self.set_floating(Floating(*self.clipboard))
+
+        self.set_tool(Tools.MOVE)
+
+    def set_floating(self, floating: Floating) -> None:
+        """
+        Function used to make some pixels float over the canvas.
+        The image drawn on the canvas uses the pixels as they are, without copying them.
+
+        :param floating: the floating pixels or None
+        :return: None
+        """
+
+        self.floating = floating
+
+        if floating is None:
+            self.floating_image = None
+        else:
+            self.floating_image = QImage(sip.voidptr(floating.pixels.ctypes.data), floating.width, floating.height,
+                                         floating.width * 4, QImage.Format_RGBA8888)
+
+            self.update(QRect(*floating.rect()))
+
+    def commit_floating(self) -> None:
+        """
+        Function used to put the floating pixels into the active layer, they stay selected.
+
+        :return: None
+        """
+
+        floating = self.floating
+
+        if floating is None:
+            return
+
+        self.set_floating(None)
+
+        self.tiles.write(floating.x, floating.y, floating.pixels, floating.mask)
+
+        self.set_selection(Selection.from_mask(self.canvas_width, self.canvas_height, floating.x, floating.y,
+                                               floating.mask))
+
+        self.refresh(QRect(*floating.rect()))
+
+    def deselect(self) -> None:
+        """
+        Function used to put down the floating pixels and select nothing.
+
+        :return: None
+        """
+
+        self.commit_floating()
+        self.set_selection(None)
+
+    def start_move(self, event: QMouseEvent) -> None:
+        """
+        Function used to start moving the floating pixels, or the selected ones which are lifted from the layer.
+        Pressing outside of the floating pixels puts them down.
 
         :param event: the event
         :return: None
         """
 
-        # Convert the pixmap into a image
-        image = self.pixmap().toImage()
+        x, y = event.pos().x(), event.pos().y()
 
-        # Extract the color of the target pixel, if is on the png part of the image it will be black
-        color = QColor(image.pixel(event.pos()))
+        if self.floating is not None:
+            if not self.floating.contains(x, y):
+                self.commit_floating()
+            return
 
-        # Update the position because it will do weird stuff if not
-        self.last_point = event.pos()
+        selection = self.layers.selection
 
-        # Set the color to the pen
-        self.set_pen_color(color.name())
+        if selection is None or not selection.read(x, y, 1, 1)[0, 0]:
+            return
 
-        # Switch immediately to the pen because why not
-        self.set_tool(Tools.PEN)
+        # Lift the selected pixels, they float where they were
+        lifted = self.selected_pixels()
+
+        self.erase_selection()
+        self.set_selection(None)
+
+        self.set_floating(Floating(*lifted))
+
+    def move_floating(self, event: QMouseEvent) -> None:
+        """
+        Function used to drag the floating pixels, only their position changes.
+
+        :param event: the event
+        :return: None
+        """
+
+        if not self.drawing or self.floating is None or self.last_point is None:
+            return
+
+        old = QRect(*self.floating.rect())
+
+        offset = event.pos() - self.last_point
+        self.floating.move(offset.x(), offset.y())
+
+        self.update(old.united(QRect(*self.floating.rect())))
+
+        self.last_point = event.pos()
 
     def update_current_point(self, event: QMouseEvent) -> None:
         """
         Function used to change a variable.
+        The preview is rasterized once per move and only the region of the old and new previews is repainted.
 
         :param event: the event
         :return: None
         """
 
         if self.last_point:
+            old = self.spans_rect(self.preview)
+
             self.current_point = event.pos()
-            self.update()
+            self.preview = self.shape_spans(self.last_point, self.current_point)
+
+            self.update(old.united(self.spans_rect(self.preview)))
+
+    @staticmethod
+    def spans_rect(spans) -> QRect:
+        """
+        Function used to get the bounding rectangle of some spans.
+
+        :param spans: the spans or None
+        :return: the rectangle, empty if there are no spans
+        """
+
+        if spans is None or len(spans) == 0:
+            return QRect()
+
+        return QRect(QPoint(int(spans[:, 1].min()), int(spans[:, 0].min())),
+                     QPoint(int(spans[:, 2].max()) - 1, int(spans[:, 0].max())))
 
 
 class AlphaChannel(QLabel):
@@ -840,30 +1940,17 @@ class AlphaChannel(QLabel):
 
     def create_alpha_channel(self) -> None:
         """
-        Function used to create a new alpha channel with dimensions of the canvas.
+        Function used to create the pattern of the alpha channel.
+        The pattern is repeated over the visible part when painted, so big canvases cost nothing.
 
         :return: None
         """
 
         # Create a white image and paint 1 of 2 pixels in gray
-        self.image = QImage(self.canvas_size, QImage.Format_RGB32)
+        self.image = QImage(2, 2, QImage.Format_RGB32)
         self.image.fill(Qt.white)
-        self.setPixmap(QPixmap(self.image))
-
-        painter = QPainter(self.pixmap())
-
-        painter.setPen(QPen(QColor("#d9d9d9"),
-                            1,
-                            Qt.SolidLine,
-                            Qt.RoundCap,
-                            Qt.RoundJoin))
-
-        for i in range(self.canvas_width):
-            for j in range(self.canvas_height):
-                if (i % 2 == 1 and j % 2 == 1) or (i % 2 == 0 and j % 2 == 0):
-                    painter.drawPoint(QPoint(i, j))
-
-        painter.end()
+        self.image.setPixelColor(0, 0, QColor("#d9d9d9"))
+        self.image.setPixelColor(1, 1, QColor("#d9d9d9"))
 
         self.update()
 
@@ -883,6 +1970,17 @@ class AlphaChannel(QLabel):
         # Create again the alpha channel
         self.create_alpha_channel()
 
+    def paintEvent(self, event: QPaintEvent) -> None:
+        """
+        Function used to paint the pattern over the updated region.
+
+        :param event: the event
+        :return: None
+        """
+
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), QBrush(self.image))
+
 
 class Grid(QLabel):
     """
@@ -901,8 +1999,6 @@ class Grid(QLabel):
 
         self.status_widget = status_widget
 
-        self.image = None
-
         self.canvas_width = width
         self.canvas_height = height
         self.canvas_size = QSize(width, height)
@@ -957,11 +2053,10 @@ class Grid(QLabel):
         :return:
         """
 
-        # Create a transparent pixmap
-        pixmap = QPixmap(self.canvas_size)
-        pixmap.fill(QColor(0, 0, 0, 0))
+        # The grid holds only the point under the cursor, there is nothing to allocate
+        self.last_point = None
 
-        self.setPixmap(pixmap)
+        self.update()
 
     def mouseMoveEvent(self, event: QMouseEvent) -> None:
         """
@@ -971,57 +2066,36 @@ class Grid(QLabel):
         :return: None
         """
 
-        painter = QPainter(self.pixmap())
-
-        painter.setPen(QPen(self.color,
-                            1,
-                            Qt.SolidLine,
-                            Qt.RoundCap,
-                            Qt.RoundJoin))
-
-        self.clear_grid(painter)
-
-        painter.drawPoint(event.pos())
-
-        painter.end()
-
-        self.update()
+        self.clear_grid()
 
         self.last_point = event.pos()
 
+        self.update(QRect(self.last_point, QSize(1, 1)))
+
         # Pass the cursor position to the status widget
         self.status_widget.set_position_and_zoom(x=event.x(), y=event.y())
 
-    def clear_grid(self, painter: QPainter = None) -> None:
+    def clear_grid(self) -> None:
         """
-        Function hard to explain.
+        Function used to remove the point painted on the grid.
 
-        :param painter: the event
         :return: None
         """
-        if painter is None:
-            painter = QPainter(self.pixmap())
-
-            painter.setPen(QPen(self.color,
-                                1,
-                                Qt.SolidLine,
-                                Qt.RoundCap,
-                                Qt.RoundJoin))
 
         # Check if is a point painted on grid, if true delete it
         if self.last_point is not None:
-            painter.save()
+            self.update(QRect(self.last_point, QSize(1, 1)))
 
-            r = QRect(QPoint(), 1 * QSize())
-            r.moveCenter(QPoint(self.last_point))
+            self.last_point = None
 
-            painter.setCompositionMode(QPainter.CompositionMode_Clear)
-
-            painter.eraseRect(r)
-
-            painter.restore()
+    def paintEvent(self, event: QPaintEvent) -> None:
+        """
+        Function used to paint the point under the cursor.
 
-        if painter is None:
-            painter.end()
+        :param event: the event
+        :return: None
+        """
 
-            self.update()
+        if self.last_point is not None:
+            painter = QPainter(self)
+            painter.fillRect(QRect(self.last_point, QSize(1, 1)), self.color)
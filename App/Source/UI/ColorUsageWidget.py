@@ -0,0 +1,193 @@
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+from PyQt5.QtWidgets import *
+
+from Source.ColorUsage import ColorUsage
+from Source.UI.CanvasWidget import Canvas
+from Source.Utils import *
+
+# The most used colors shown in the list
+MAX_SHOWN = 256
+
+# How often the counts are brought up to date, in milliseconds
+REFRESH_INTERVAL = 250
+
+
+class ColorUsageWidget(QWidget):
+    """
+    This class will hold the list of the colors of the drawing, from the most used one, with their number of pixels.
+    The colors are counted on the composite, only the tiles changed since the last time are counted again.
+    """
+
+    def __init__(self, canvas: Canvas):
+        """
+        Class constructor.
+
+        :param canvas: the canvas to bind it to the list in order to count its colors and change the pen color
+        """
+
+        super(ColorUsageWidget, self).__init__()
+
+        self.layout = QHBoxLayout()
+
+        self.main_frame = QFrame()
+        self.main_frame_layout = QVBoxLayout()
+
+        self.title = QLabel("COLORS USED")
+
+        self.colors_list = QListWidget()
+
+        self.timer = QTimer(self)
+
+        self.usage = ColorUsage()
+
+        self.canvas = canvas
+
+        self.setup()
+
+    def setup(self) -> None:
+        """
+        Function used to initialize the entire widget, set variables or add another widgets to it.
+
+        :return: None
+        """
+
+        # Setup the main widget
+        self.setObjectName("color_usage_widget")
+        self.setFixedWidth(200)
+        self.installEventFilter(self)
+        self.setLayout(self.layout)
+        self.layout.addWidget(self.main_frame)
+
+        # Setup the main frame
+        self.main_frame.setObjectName("main_frame")
+        self.main_frame.setLayout(self.main_frame_layout)
+        self.main_frame.setStyleSheet(css(
+            f"QWidget#{self.main_frame.objectName()}",
+            "border-style: solid",
+            "border-width: 1px",
+            f"border-color: {COLOR}",
+            "border-radius: 3px",
+            f"background-color: {BACKGROUND_DARK}"
+        ))
+
+        # Add the widgets to main frame
+        self.main_frame_layout.addWidget(self.title, 0, Qt.AlignCenter)
+        self.main_frame_layout.addWidget(self.colors_list)
+
+        # Set the name of the objects
+        self.title.setObjectName("color_usage_title")
+        self.colors_list.setObjectName("color_usage_list")
+
+        # Set the style to the title
+        self.title.setStyleSheet(css(
+            f"QLabel#{self.title.objectName()}",
+            "font-size: 13px",
+            "font-weight: bold",
+            f"color: {COLOR}"
+        ))
+
+        # Set the style to the list
+        self.colors_list.setToolTip("CLICK A COLOR TO DRAW WITH IT")
+        self.colors_list.setStyleSheet(merge_css(
+            css(
+                f"QListWidget#{self.colors_list.objectName()}",
+                "border-style: solid",
+                "border-width: 1px",
+                f"border-color: {COLOR}",
+                "border-radius: 3px",
+                "font-size: 13px",
+                f"color: {COLOR}",
+                "background-color: rgba(153, 170, 181, 0.1)"
+            ),
+            css(
+                f"QListWidget#{self.colors_list.objectName()}::item:selected",
+                f"color: {COLOR_HOVER}",
+                "background-color: rgba(64, 78, 237, 0.1)"
+            )))
+
+        # Set the response functions to the list
+        self.colors_list.itemClicked.connect(self.choose_color)
+
+        # Count the changes regularly, drawing only marks the changed tiles
+        self.timer.timeout.connect(self.refresh_usage)
+        self.timer.start(REFRESH_INTERVAL)
+
+        self.refresh_usage()
+
+    def refresh_usage(self) -> None:
+        """
+        Function used to count the colors of the changed tiles and show the counts if they changed.
+
+        :return: None
+        """
+
+        if self.canvas.layers is None or not self.usage.update(self.canvas.layers.composite):
+            return
+
+        colors = self.usage.most_used(MAX_SHOWN)
+
+        self.title.setText(f"COLORS USED ({len(self.usage.counts)})")
+
+        # The items are reused, only the missing ones are created
+        while self.colors_list.count() > len(colors):
+            self.colors_list.takeItem(self.colors_list.count() - 1)
+        while self.colors_list.count() < len(colors):
+            self.colors_list.addItem(QListWidgetItem())
+
+        for row, ((r, g, b, a), count) in enumerate(colors):
+            color = QColor(r, g, b, a)
+            name = color.name() if a == 255 else color.name(QColor.HexArgb)
+
+            pixmap = QPixmap(16, 16)
+            pixmap.fill(QColor(r, g, b))
+
+            item = self.colors_list.item(row)
+            item.setIcon(QIcon(pixmap))
+            item.setText(f"{name}  {count}")
+            item.setData(Qt.UserRole, name)
+
+    def choose_color(self, item: QListWidgetItem) -> None:
+        """
+        Function used to draw with the clicked color.
+
+        :param item: the item of the color
+        :return: None
+        """
+
+        self.canvas.set_pen_color(item.data(Qt.UserRole))
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:
+        """
+        Function used to change the css when is hovered.
+
+        :param obj: the object
+        :param event: the event
+        :return: True or False if the events we wanted have occurred
+        """
+
+        # Check if the cursor is above the widget
+        if event.type() == QEvent.Enter:
+            self.main_frame.setStyleSheet(css(
+                f"QWidget#{self.main_frame.objectName()}",
+                "border-style: solid",
+                "border-width: 1px",
+                f"border-color: {COLOR_HOVER}",
+                "border-radius: 3px",
+                f"background-color: {BACKGROUND_DARK}"
+            ))
+            return True
+
+        # Check if cursor left the widget
+        elif event.type() == QEvent.Leave:
+            self.main_frame.setStyleSheet(css(
+                f"QWidget#{self.main_frame.objectName()}",
+                "border-style: solid",
+                "border-width: 1px",
+                f"border-color: {COLOR}",
+                "border-radius: 3px",
+                f"background-color: {BACKGROUND_DARK}"
+            ))
+            return True
+
+        return False
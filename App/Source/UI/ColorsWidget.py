@@ -2,15 +2,11 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
 
+from Source.Palette import COLORS
 from Source.Tools import Tools
 from Source.UI.CanvasWidget import Canvas
 from Source.Utils import *
 
-COLORS = [
-    '#ffffff', '#010000', '#ff0000', '#0000ff', '#00ff00', '#ffff00', '#00ffff', '#ff00ff',
-    '#c0c0c0', '#404040', '#800000', '#000080', '#008000', '#ff4500', '#008080', '#9400d3'
-]
-
 
 class ColorsWidget(QWidget):
     """
@@ -33,6 +29,12 @@ class ColorsWidget(QWidget):
 
         self.canvas = canvas
 
+        self.color_buttons = []
+        self.recent_buttons = []
+
+        self.lock_button = QPushButton("🔒")
+        self.snap_button = QPushButton("▦")
+
         self.setup()
 
     def setup(self) -> None:
@@ -52,6 +54,8 @@ class ColorsWidget(QWidget):
         # Setup the main frame
         self.main_frame.setObjectName("main_frame")
         self.main_frame.setLayout(self.main_frame_layout)
+        self.main_frame_layout.setContentsMargins(6, 6, 6, 6)
+        self.main_frame_layout.setVerticalSpacing(4)
         self.main_frame.setStyleSheet(css(
             f"QWidget#{self.main_frame.objectName()}",
             "border-style: solid",
@@ -63,8 +67,100 @@ class ColorsWidget(QWidget):
 
         # Add the buttons to layout
         for i, color in zip(range(len(COLORS)), COLORS):
-            self.main_frame_layout.addWidget(ColorButton(self.canvas, color, i), int(i / 8), i % 8)
+            self.color_buttons.append(ColorButton(self.canvas, color, i))
+            self.main_frame_layout.addWidget(self.color_buttons[-1], int(i / 8), i % 8)
         self.main_frame_layout.addWidget(ColorPickerButton(self.canvas), 0, 8, 2, 1)
+        self.main_frame_layout.addWidget(self.lock_button, 0, 9)
+        self.main_frame_layout.addWidget(self.snap_button, 1, 9)
+
+        # Add the strip of the recent colors under the colors, the buttons are kept and only recolored
+        for i in range(self.canvas.recent_colors.capacity):
+            self.recent_buttons.append(RecentColorButton(self.canvas, i))
+            self.main_frame_layout.addWidget(self.recent_buttons[-1], 2, i)
+
+        # Setup the palette lock buttons
+        self.lock_button.setObjectName("palette_lock_button")
+        self.snap_button.setObjectName("palette_snap_button")
+        self.lock_button.setToolTip("LOCK THE PALETTE (THE TOOLS USE ONLY THE PALETTE COLORS)")
+        self.snap_button.setToolTip("SNAP THE WHOLE IMAGE TO THE PALETTE")
+        self.lock_button.setCheckable(True)
+        self.lock_button.toggled.connect(self.canvas.set_palette_lock)
+        self.snap_button.clicked.connect(lambda: self.canvas.snap_to_palette())
+
+        for button in (self.lock_button, self.snap_button):
+            button.setCursor(QCursor(Qt.PointingHandCursor))
+            button.setFixedSize(QSize(25, 25))
+            button.setStyleSheet(merge_css(
+                css(
+                    f"QPushButton#{button.objectName()}",
+                    "background-color: rgba(153, 170, 181, 0.1)",
+                    "border-style: solid",
+                    "border-width: 1px",
+                    "border-radius: 3px",
+                    f"border-color: {COLOR}",
+                    "font-size: 13px",
+                    f"color: {COLOR}"
+                ),
+                css(
+                    f"QPushButton#{button.objectName()}:hover, QPushButton#{button.objectName()}:checked",
+                    "background-color: rgba(64, 78, 237, 0.1)",
+                    f"border-color: {COLOR_HOVER}",
+                    f"color: {COLOR_HOVER}"
+                )
+            ))
+
+        # Bind the panel to the canvas so it shows the palette of an indexed drawing
+        self.canvas.colors_widget = self
+
+        self.refresh_colors()
+        self.refresh_recent()
+
+        # Read the saved recent colors once the window is shown, so the start doesn't wait for the disk
+        QTimer.singleShot(0, self.load_recent)
+
+    def load_recent(self) -> None:
+        """
+        Function used to read the recent colors of the last session from the settings file.
+
+        :return: None
+        """
+
+        self.canvas.recent_colors.load()
+        self.refresh_recent()
+
+    def refresh_recent(self) -> None:
+        """
+        Function used to show the recent colors on the strip, from the most recent one.
+        Only the buttons whose color changed are restyled and the unused ones are hidden.
+
+        :return: None
+        """
+
+        colors = self.canvas.recent_colors.recent()
+
+        for i, button in enumerate(self.recent_buttons):
+            color = colors[i] if i < len(colors) else None
+
+            if color is not None and color != button.color:
+                button.set_color(color)
+            button.setVisible(color is not None)
+
+    def refresh_colors(self) -> None:
+        """
+        Function used to show the first colors of the palette of an indexed drawing on the buttons.
+
+        :return: None
+        """
+
+        palette = self.canvas.palette
+
+        if palette is None:
+            return
+
+        # The first entry of the palette is the transparent one
+        for button in self.color_buttons:
+            r, g, b, _ = palette.color(button.number + 1)
+            button.set_color(QColor(r, g, b).name())
 
     def change_color(self, color: QColor) -> None:
         """
@@ -148,7 +244,23 @@ class ColorButton(QPushButton):
         self.setObjectName(f"color_button_{self.number}")
         self.setCursor(QCursor(Qt.PointingHandCursor))
         self.setFixedSize(QSize(25, 25))
+        self.setToolTip("RIGHT CLICK: EDIT COLOR")
+        self.setContextMenuPolicy(Qt.CustomContextMenu)
         self.pressed.connect(lambda: self.canvas.set_pen_color(self.color))
+        self.customContextMenuRequested.connect(lambda: self.edit_color())
+
+        self.set_color(self.color)
+
+    def set_color(self, color: str) -> None:
+        """
+        Function used to change the color of the button.
+
+        :param color: the hexadecimal value of the color
+        :return: None
+        """
+
+        self.color = color
+
         self.setStyleSheet(merge_css(
             css(
                 f"QPushButton#{self.objectName()}",
@@ -164,6 +276,58 @@ class ColorButton(QPushButton):
             )
         ))
 
+    def edit_color(self) -> None:
+        """
+        Function used to start a color dialog pop-up to change the color of the button.
+        In an indexed drawing the color of the palette changes too, with all the pixels that use it.
+
+        :return: None
+        """
+
+        color = QColorDialog.getColor(QColor(self.color))
+
+        if not color.isValid():
+            return
+
+        if self.canvas.palette is not None:
+            self.canvas.set_palette_color(self.number + 1, color.name())
+        else:
+            self.set_color(color.name())
+            self.canvas.palette_changed()
+
+        self.canvas.set_pen_color(color.name())
+
+
+class RecentColorButton(ColorButton):
+    """
+    This class creates the buttons of the strip of the recent colors, their color changes as other colors are used.
+    """
+
+    def __init__(self, canvas: Canvas, number: int):
+        """
+        Class constructor.
+
+        :param canvas: the canvas to bind it to the button in order to change the pen color
+        :param number: the place of the button on the strip
+        """
+
+        super(RecentColorButton, self).__init__(canvas, "", number)
+
+    def setup(self) -> None:
+        """
+        Function used to initialize the entire widget, set variables or generate add another widgets to it.
+
+        :return: None
+        """
+
+        # Setup the button
+        self.setObjectName(f"recent_color_button_{self.number}")
+        self.setCursor(QCursor(Qt.PointingHandCursor))
+        self.setFixedSize(QSize(25, 16))
+        self.setToolTip("RECENT COLOR")
+        self.pressed.connect(lambda: self.canvas.set_pen_color(self.color))
+        self.setVisible(False)
+
 
 class ColorPickerButton(QPushButton):
     """
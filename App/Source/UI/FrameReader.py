@@ -0,0 +1,217 @@
+import copy
+
+import numpy as np
+from PyQt5.QtCore import QRect, QSize, Qt
+from PyQt5.QtGui import QImage, QImageReader
+
+from Source.Animation import FRAME_DURATION
+from Source.Gif import gif_delays
+from Source.PixelGrid import cell_starts, reduce_grid
+from Source.Strips import Strips
+from Source.Tiles import MAX_CANVAS_SIZE
+from Source.UI.CanvasWidget import array_to_image, image_to_array
+
+# The browsers show the frames with a shorter delay than this for the default duration
+MIN_FRAME_DELAY = 20
+
+
+class FrameReader:
+    """
+    This class reads the frames of an image one at a time, only when they are asked for.
+    The frames of a GIF are decoded in order, so the next frame is quick to get and only going back starts again
+    from the first one. A still image is a single frame, or the frames of a sprite strip side by side.
+    """
+
+    def __init__(self, path: str):
+        """
+        Class constructor.
+
+        :param path: the path of the image
+        """
+
+        self.path = path
+
+        # The decoder of a GIF and the index of the next frame it gives, a still image is decoded at once
+        self.reader = None
+        self.position = 0
+        self.image = None
+
+        # The last frame of the GIF that was decoded, asked again when the frames are loaded and shown
+        self.last = None
+
+        # The grid the frames of a GIF are shrunk from, a still image is shrunk at once
+        self.grid = None
+
+        # How a still image is split in frames
+        self.strip = None
+        self.count = 1
+
+        reader = QImageReader(path)
+
+        if bytes(reader.format()).lower() == b"gif":
+            self.reader = reader
+            self.durations = [delay if delay >= MIN_FRAME_DELAY else FRAME_DURATION for delay in gif_delays(path)]
+            self.count = max(1, len(self.durations))
+            self.source_size = reader.size()
+        else:
+            self.image = reader.read()
+            self.durations = [FRAME_DURATION]
+            self.source_size = self.image.size()
+
+        self.durations = self.durations or [FRAME_DURATION]
+
+    @property
+    def valid(self) -> bool:
+        """
+        Function used to know if the image could be read.
+
+        :return: self explanatory
+        """
+
+        return self.source_size.isValid() and not self.source_size.isEmpty()
+
+    @property
+    def raw_size(self) -> tuple:
+        """
+        Function used to get the size of the frames as they are decoded, before they are shrunk or fitted.
+
+        :return: (width, height)
+        """
+
+        width, height = self.source_size.width(), self.source_size.height()
+
+        if self.strip == Strips.HORIZONTAL:
+            width //= self.count
+        elif self.strip == Strips.VERTICAL:
+            height //= self.count
+
+        return width, height
+
+    @property
+    def size(self) -> QSize:
+        """
+        Function used to get the size of the frames, shrunk to their grid and fitted in the limits of a canvas.
+
+        :return: self explanatory
+        """
+
+        width, height = self.raw_size
+
+        if self.grid is not None:
+            scale, offset_x, offset_y = self.grid
+            width, height = len(cell_starts(width, scale, offset_x)), len(cell_starts(height, scale, offset_y))
+
+        size = QSize(width, height)
+
+        # If the frames are bigger than the limits, they are resized to the closest superior limit
+        if width > MAX_CANVAS_SIZE or height > MAX_CANVAS_SIZE:
+            size = size.scaled(MAX_CANVAS_SIZE, MAX_CANVAS_SIZE, Qt.KeepAspectRatio)
+
+        return size
+
+    def reduce(self, grid: tuple) -> None:
+        """
+        Function used to shrink every frame to one pixel for every cell of the grid of an upscaled pixel art.
+
+        :param grid: (scale, x offset, y offset) of the grid
+        :return: None
+        """
+
+        if self.image is None:
+            self.grid = grid
+        else:
+            self.image = array_to_image(reduce_grid(image_to_array(self.image), *grid))
+            self.source_size = self.image.size()
+
+    def split(self, strip: Strips, count: int) -> None:
+        """
+        Function used to split a still image in the frames of a sprite strip, the pixels left over are cropped.
+
+        :param strip: the direction of the strip
+        :param count: the number of frames, at most a frame for every pixel
+        :return: None
+        """
+
+        if self.image is None:
+            return
+
+        length = self.source_size.width() if strip == Strips.HORIZONTAL else self.source_size.height()
+        count = max(1, min(count, length))
+
+        self.strip = strip
+        self.count = count
+        self.durations = [FRAME_DURATION] * count
+
+    def decode(self, index: int) -> np.ndarray:
+        """
+        Function used to decode a frame as it is in the file.
+
+        :param index: the index of the frame, 0 is the first one
+        :return: an array with the shape (height, width, 4)
+        """
+
+        width, height = self.raw_size
+
+        if self.image is not None:
+            x = index * width if self.strip == Strips.HORIZONTAL else 0
+            y = index * height if self.strip == Strips.VERTICAL else 0
+
+            return image_to_array(self.image.copy(QRect(x, y, width, height)))
+
+        if self.last is not None and self.last[0] == index:
+            return self.last[1]
+
+        # Going back starts again from the first frame
+        if index < self.position:
+            self.reader = QImageReader(self.path)
+            self.position = 0
+
+        image = QImage()
+        while self.position <= index:
+            image = self.reader.read()
+            self.position += 1
+
+        # A frame that can't be decoded is left transparent
+        if image.isNull():
+            pixels = np.zeros((height, width, 4), np.uint8)
+        else:
+            pixels = image_to_array(image)
+
+        self.last = index, pixels
+
+        return pixels
+
+    def frame(self, index: int) -> np.ndarray:
+        """
+        Function used to get a frame shrunk to its grid and fitted in the limits of a canvas, like the first one.
+
+        :param index: the index of the frame, 0 is the first one
+        :return: an array with the shape (height, width, 4)
+        """
+
+        pixels = self.decode(index)
+
+        if self.grid is not None:
+            pixels = reduce_grid(pixels, *self.grid)
+
+        size = self.size
+        if (pixels.shape[1], pixels.shape[0]) != (size.width(), size.height()):
+            pixels = image_to_array(array_to_image(pixels).scaled(size, Qt.IgnoreAspectRatio))
+
+        return pixels
+
+    def copy(self) -> "FrameReader":
+        """
+        Function used to get a reader of the same frames with its own decoder, to read them on another thread.
+
+        :return: the new reader
+        """
+
+        reader = copy.copy(self)
+
+        reader.reader = QImageReader(self.path) if self.image is None else None
+        reader.position = 0
+        reader.last = None
+        reader.image = None if self.image is None else QImage(self.image)
+
+        return reader
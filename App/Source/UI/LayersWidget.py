@@ -0,0 +1,328 @@
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+from PyQt5.QtWidgets import *
+
+from Source.Blends import Blends
+from Source.UI.CanvasWidget import Canvas
+from Source.Utils import *
+
+
+class LayersWidget(QWidget):
+    """
+    This class will hold the list of layers and the controls to add, delete, move, hide and blend them.
+    The top layer is the first in the list.
+    """
+
+    def __init__(self, canvas: Canvas):
+        """
+        Class constructor.
+
+        :param canvas: the canvas to bind it to the controls in order to change its layers
+        """
+
+        super(LayersWidget, self).__init__()
+
+        self.layout = QHBoxLayout()
+
+        self.main_frame = QFrame()
+        self.main_frame_layout = QGridLayout()
+
+        self.title = QLabel("LAYERS")
+
+        self.layers_list = QListWidget()
+
+        self.opacity_label = QLabel("OPACITY")
+        self.opacity = QSlider(Qt.Horizontal)
+
+        self.blend_mode = QComboBox()
+
+        self.add_button = QPushButton("+")
+        self.remove_button = QPushButton("-")
+        self.up_button = QPushButton("▲")
+        self.down_button = QPushButton("▼")
+
+        self.canvas = canvas
+
+        self.setup()
+
+    def setup(self) -> None:
+        """
+        Function used to initialize the entire widget, set variables or add another widgets to it.
+
+        :return: None
+        """
+
+        # Setup the main widget
+        self.setObjectName("layers_widget")
+        self.setFixedWidth(220)
+        self.installEventFilter(self)
+        self.setLayout(self.layout)
+        self.layout.addWidget(self.main_frame)
+
+        # Setup the main frame
+        self.main_frame.setObjectName("main_frame")
+        self.main_frame.setLayout(self.main_frame_layout)
+        self.main_frame.setStyleSheet(css(
+            f"QWidget#{self.main_frame.objectName()}",
+            "border-style: solid",
+            "border-width: 1px",
+            f"border-color: {COLOR}",
+            "border-radius: 3px",
+            f"background-color: {BACKGROUND_DARK}"
+        ))
+
+        # Add the widgets to main frame
+        self.main_frame_layout.addWidget(self.title, 0, 0, 1, 4, Qt.AlignCenter)
+        self.main_frame_layout.addWidget(self.layers_list, 1, 0, 1, 4)
+        self.main_frame_layout.addWidget(self.opacity_label, 2, 0, 1, 4)
+        self.main_frame_layout.addWidget(self.opacity, 3, 0, 1, 4)
+        self.main_frame_layout.addWidget(self.blend_mode, 4, 0, 1, 4)
+        self.main_frame_layout.addWidget(self.add_button, 5, 0)
+        self.main_frame_layout.addWidget(self.remove_button, 5, 1)
+        self.main_frame_layout.addWidget(self.up_button, 5, 2)
+        self.main_frame_layout.addWidget(self.down_button, 5, 3)
+
+        # Set the name of the objects
+        self.title.setObjectName("layers_title")
+        self.layers_list.setObjectName("layers_list")
+        self.opacity_label.setObjectName("layers_opacity_label")
+        self.opacity.setObjectName("layers_opacity")
+        self.blend_mode.setObjectName("layers_blend_mode")
+        self.add_button.setObjectName("layers_add")
+        self.remove_button.setObjectName("layers_remove")
+        self.up_button.setObjectName("layers_up")
+        self.down_button.setObjectName("layers_down")
+
+        # Setup the controls
+        self.opacity.setRange(0, 100)
+        for mode in Blends:
+            self.blend_mode.addItem(mode.name.capitalize(), mode)
+
+        self.add_button.setToolTip("ADD LAYER")
+        self.remove_button.setToolTip("DELETE LAYER")
+        self.up_button.setToolTip("MOVE LAYER UP")
+        self.down_button.setToolTip("MOVE LAYER DOWN")
+
+        # Set the response functions to the controls
+        self.layers_list.currentRowChanged.connect(self.change_active_layer)
+        self.layers_list.itemChanged.connect(self.change_visibility)
+        self.opacity.valueChanged.connect(self.change_opacity)
+        self.blend_mode.currentIndexChanged.connect(self.change_blend_mode)
+        self.add_button.clicked.connect(lambda: self.canvas.add_layer())
+        self.remove_button.clicked.connect(lambda: self.canvas.remove_layer())
+        self.up_button.clicked.connect(lambda: self.canvas.move_layer(1))
+        self.down_button.clicked.connect(lambda: self.canvas.move_layer(-1))
+
+        # Set the style to the labels
+        css_temp = css(
+            f"QLabel#{self.title.objectName()}, QLabel#{self.opacity_label.objectName()}",
+            "font-size: 13px",
+            "font-weight: bold",
+            f"color: {COLOR}"
+        )
+        self.title.setStyleSheet(css_temp)
+        self.opacity_label.setStyleSheet(css_temp)
+
+        # Set the style to the list
+        self.layers_list.setStyleSheet(merge_css(
+            css(
+                f"QListWidget#{self.layers_list.objectName()}",
+                "border-style: solid",
+                "border-width: 1px",
+                f"border-color: {COLOR}",
+                "border-radius: 3px",
+                "font-size: 13px",
+                f"color: {COLOR}",
+                "background-color: rgba(153, 170, 181, 0.1)"
+            ),
+            css(
+                f"QListWidget#{self.layers_list.objectName()}::item:selected",
+                f"color: {COLOR_HOVER}",
+                "background-color: rgba(64, 78, 237, 0.1)"
+            )))
+
+        # Set the style to the blend mode
+        self.blend_mode.setStyleSheet(merge_css(
+            css(
+                f"QComboBox#{self.blend_mode.objectName()}",
+                "border-style: solid",
+                "border-width: 1px",
+                f"border-color: {COLOR}",
+                "border-radius: 0px",
+                "height: 25px",
+                "font-size: 13px",
+                f"color: {COLOR}",
+                "background-color: rgba(153, 170, 181, 0.1)"
+            ),
+            css(
+                f"QComboBox#{self.blend_mode.objectName()}:hover, QComboBox#{self.blend_mode.objectName()}:on",
+                f"border-color: {COLOR_HOVER}",
+                "background-color: rgba(64, 78, 237, 0.1)"
+            ),
+            css(
+                f"QComboBox#{self.blend_mode.objectName()} QListView",
+                "outline: none",
+                f"background-color: {BACKGROUND}",
+                f"color: {COLOR}",
+                f"selection-background-color: {BACKGROUND_DARK}",
+                f"selection-color: {COLOR_HOVER}",
+            )))
+
+        # Set the style and geometry to the buttons
+        css_temp = merge_css(
+            css(
+                "QPushButton",
+                "background-color: rgba(153, 170, 181, 0.1)",
+                "border-style: solid",
+                "border-width: 1px",
+                "border-radius: 3px",
+                f"border-color: {COLOR}",
+                "font-size: 15px",
+                f"color: {COLOR}"
+            ),
+            css(
+                "QPushButton:hover",
+                "background-color: rgba(64, 78, 237, 0.1)",
+                f"border-color: {COLOR_HOVER}",
+                f"color: {COLOR_HOVER}"
+            )
+        )
+        for button in (self.add_button, self.remove_button, self.up_button, self.down_button):
+            button.setFixedSize(QSize(35, 25))
+            button.setCursor(QCursor(Qt.PointingHandCursor))
+            button.setStyleSheet(css_temp)
+
+        # Bind the panel to the canvas so it is updated when the layers change
+        self.canvas.layers_widget = self
+
+        self.refresh_layers()
+
+    def refresh_layers(self) -> None:
+        """
+        Function used to show again the layers of the canvas and the properties of the active one.
+
+        :return: None
+        """
+
+        layers = self.canvas.layers
+
+        # Don't send the changes back to the canvas while the list is filled
+        self.layers_list.blockSignals(True)
+        self.layers_list.clear()
+
+        for layer in reversed(layers.layers):
+            item = QListWidgetItem(layer.name)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked if layer.visible else Qt.Unchecked)
+            self.layers_list.addItem(item)
+
+        self.layers_list.setCurrentRow(self.to_row(layers.active))
+        self.layers_list.blockSignals(False)
+
+        self.show_properties()
+
+    def show_properties(self) -> None:
+        """
+        Function used to show the opacity and the blend mode of the active layer.
+
+        :return: None
+        """
+
+        layer = self.canvas.layers.active_layer
+
+        self.opacity.blockSignals(True)
+        self.opacity.setValue(round(layer.opacity * 100))
+        self.opacity.blockSignals(False)
+
+        self.blend_mode.blockSignals(True)
+        self.blend_mode.setCurrentIndex(self.blend_mode.findData(layer.blend_mode))
+        self.blend_mode.blockSignals(False)
+
+    def to_row(self, index: int) -> int:
+        """
+        Function used to convert between the index of a layer and its row in the list, the list is upside down.
+
+        :param index: the index of the layer or the row
+        :return: the row or the index of the layer
+        """
+
+        return len(self.canvas.layers.layers) - 1 - index
+
+    def change_active_layer(self, row: int) -> None:
+        """
+        Function used to change the layer the tools draw on.
+
+        :param row: the row of the layer in the list
+        :return: None
+        """
+
+        if row < 0:
+            return
+
+        self.canvas.set_active_layer(self.to_row(row))
+        self.show_properties()
+
+    def change_visibility(self, item: QListWidgetItem) -> None:
+        """
+        Function used to show or hide a layer when its check box is changed.
+
+        :param item: the item of the layer
+        :return: None
+        """
+
+        self.canvas.set_layer_visible(self.to_row(self.layers_list.row(item)), item.checkState() == Qt.Checked)
+
+    def change_opacity(self, value: int) -> None:
+        """
+        Function used to change the opacity of the active layer.
+
+        :param value: the opacity in percents
+        :return: None
+        """
+
+        self.canvas.set_layer_opacity(self.canvas.layers.active, value / 100)
+
+    def change_blend_mode(self, index: int) -> None:
+        """
+        Function used to change the blend mode of the active layer.
+
+        :param index: the index of the mode in the combobox
+        :return: None
+        """
+
+        self.canvas.set_layer_blend_mode(self.canvas.layers.active, self.blend_mode.itemData(index))
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:
+        """
+        Function used to change the css when is hovered.
+
+        :param obj: the object
+        :param event: the event
+        :return: True or False if the events we wanted have occurred
+        """
+
+        # Check if the cursor is above the widget
+        if event.type() == QEvent.Enter:
+            self.main_frame.setStyleSheet(css(
+                f"QWidget#{self.main_frame.objectName()}",
+                "border-style: solid",
+                "border-width: 1px",
+                f"border-color: {COLOR_HOVER}",
+                "border-radius: 3px",
+                f"background-color: {BACKGROUND_DARK}"
+            ))
+            return True
+
+        # Check if cursor left the widget
+        elif event.type() == QEvent.Leave:
+            self.main_frame.setStyleSheet(css(
+                f"QWidget#{self.main_frame.objectName()}",
+                "border-style: solid",
+                "border-width: 1px",
+                f"border-color: {COLOR}",
+                "border-radius: 3px",
+                f"background-color: {BACKGROUND_DARK}"
+            ))
+            return True
+
+        return False
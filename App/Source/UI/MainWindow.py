@@ -1,9 +1,15 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QCloseEvent, QKeySequence
 from PyQt5.QtWidgets import *
 
+from Source.Transforms import Transforms
 from Source.UI.CanvasWidget import CanvasWidget
+from Source.UI.ColorUsageWidget import ColorUsageWidget
 from Source.UI.ColorsWidget import ColorsWidget
+from Source.UI.LayersWidget import LayersWidget
 from Source.UI.SettingsWidget import SettingsWidget
 from Source.UI.StatusWidget import StatusWidget
+from Source.UI.TimelineWidget import TimelineWidget
 from Source.UI.ToolsWidget import ToolsWidget
 from Source.Utils import *
 
@@ -26,6 +32,9 @@ class MainWindow(QMainWindow):
         self.tools_widget = ToolsWidget(self.canvas_widget.canvas)
         self.settings_widget = SettingsWidget(self.canvas_widget)
         self.colors_widget = ColorsWidget(self.canvas_widget.canvas)
+        self.layers_widget = LayersWidget(self.canvas_widget.canvas)
+        self.color_usage_widget = ColorUsageWidget(self.canvas_widget.canvas)
+        self.timeline_widget = TimelineWidget(self.canvas_widget.canvas)
 
         self.setup()
 
@@ -52,15 +61,52 @@ class MainWindow(QMainWindow):
         # Set the layout of the widget
         self.main_widget.setLayout(self.layout)
 
-        # Add the 4 widgets that will be shown in the main widget to layout
+        # Add the widgets that will be shown in the main widget to layout
         self.layout.addWidget(self.settings_widget, 0, 0)
         self.layout.addWidget(self.tools_widget, 0, 1)
         self.layout.addWidget(self.colors_widget, 0, 2)
+        self.layout.addWidget(self.layers_widget, 0, 3, 2, 1)
+        self.layout.addWidget(self.color_usage_widget, 0, 4, 2, 1)
         self.layout.addWidget(self.canvas_widget, 1, 0, 1, 3)
-        self.layout.addWidget(self.status_widget, 2, 0, 1, 3)
+        self.layout.addWidget(self.timeline_widget, 2, 0, 1, 5)
+        self.layout.addWidget(self.status_widget, 3, 0, 1, 5)
+
+        # Set the shortcuts to cut, copy, paste and erase the selection
+        canvas = self.canvas_widget.canvas
+        QShortcut(QKeySequence.Cut, self, canvas.cut_selection)
+        QShortcut(QKeySequence.Copy, self, canvas.copy_selection)
+        QShortcut(QKeySequence.Paste, self, canvas.paste)
+        QShortcut(QKeySequence.Delete, self, canvas.erase_selection)
+        QShortcut(QKeySequence(Qt.Key_Return), self, canvas.commit_floating)
+        QShortcut(QKeySequence(Qt.Key_Escape), self, canvas.deselect)
+
+        # Set the shortcuts to undo and redo and to shift the drawing by a pixel, wrapping around
+        QShortcut(QKeySequence.Undo, self, self.canvas_widget.undo)
+        QShortcut(QKeySequence.Redo, self, self.canvas_widget.redo)
+        shifts = {Qt.Key_Left: (-1, 0), Qt.Key_Right: (1, 0), Qt.Key_Up: (0, -1), Qt.Key_Down: (0, 1)}
+        for key, offset in shifts.items():
+            QShortcut(QKeySequence(Qt.ALT + key), self,
+                      lambda offset=offset: self.canvas_widget.transform(Transforms.SHIFT, offset))
+
+        # Set the shortcuts to show the previous and the next frame
+        QShortcut(QKeySequence(Qt.Key_Comma), self, lambda: self.timeline_widget.step_frame(-1))
+        QShortcut(QKeySequence(Qt.Key_Period), self, lambda: self.timeline_widget.step_frame(1))
 
         # Set the style
         self.setStyleSheet(css(
             f"QMainWindow#{self.objectName()}",
             F"background-color: {BACKGROUND}"
         ))
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        """
+        Function used to save the recent colors and stop the work in the background before the window closes.
+
+        :param event: the close event
+        :return: None
+        """
+
+        self.canvas_widget.canvas.recent_colors.save()
+        self.timeline_widget.cancel_thumbnails()
+
+        super(MainWindow, self).closeEvent(event)
@@ -1,11 +1,23 @@
 import re
+from functools import partial
 
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
 
+from Source.Dithering import Dithering
+from Source.Export import EXPORT_SCALES
+from Source.PixelGrid import detect_grid
+from Source.Png import COMPRESSION_LEVEL
+from Source.PngFilters import PngFilters
+from Source.Quantizers import Quantizers
+from Source.Scalers import Scalers
 from Source.Settings import Settings
+from Source.Strips import Strips
+from Source.Tiles import MIN_CANVAS_SIZE, MAX_CANVAS_SIZE
+from Source.Transforms import Transforms
 from Source.UI.CanvasWidget import CanvasWidget
+from Source.UI.FrameReader import FrameReader
 from Source.Utils import *
 
 
@@ -34,6 +46,7 @@ class SettingsWidget(QWidget):
         self.clear_canvas_button = SettingButton(self, Settings.CLEAR)
         self.undo_button = SettingButton(self, Settings.UNDO)
         self.redo_button = SettingButton(self, Settings.REDO)
+        self.transform_button = QPushButton("⟳")
 
         self.canvas_widget = canvas_widget
 
@@ -72,6 +85,58 @@ class SettingsWidget(QWidget):
         self.main_frame_layout.addWidget(self.clear_canvas_button, 0, 3, 2, 1)
         self.main_frame_layout.addWidget(self.redo_button, 0, 4)
         self.main_frame_layout.addWidget(self.undo_button, 1, 4)
+        self.main_frame_layout.addWidget(self.transform_button, 0, 5, 2, 1)
+
+        # Setup the transform button, it opens the menu of the transforms of the whole drawing
+        menu = QMenu(self.transform_button)
+        menu.addAction("Flip horizontally", lambda: self.canvas_widget.transform(Transforms.FLIP_HORIZONTAL))
+        menu.addAction("Flip vertically", lambda: self.canvas_widget.transform(Transforms.FLIP_VERTICAL))
+        menu.addAction("Rotate clockwise", lambda: self.canvas_widget.transform(Transforms.ROTATE, (1,)))
+        menu.addAction("Rotate counterclockwise", lambda: self.canvas_widget.transform(Transforms.ROTATE, (-1,)))
+        menu.addAction("Rotate half a turn", lambda: self.canvas_widget.transform(Transforms.ROTATE, (2,)))
+        menu.addAction("Shift by half (wrap around)",
+                       lambda: self.canvas_widget.transform(Transforms.SHIFT, (self.canvas_widget.canvas_width // 2,
+                                                                               self.canvas_widget.canvas_height // 2)))
+
+        self.transform_button.setObjectName("transform_button")
+        self.transform_button.setToolTip("FLIP, ROTATE OR SHIFT THE DRAWING")
+        self.transform_button.setCursor(QCursor(Qt.PointingHandCursor))
+        self.transform_button.setFixedSize(QSize(59, 59))
+        self.transform_button.setMenu(menu)
+        self.transform_button.setStyleSheet(merge_css(
+            css(
+                f"QPushButton#{self.transform_button.objectName()}",
+                "border-style: solid",
+                "border-width: 1px",
+                f"border-color: {COLOR}",
+                "border-radius: 3px",
+                "font-size: 30px",
+                f"color: {COLOR}",
+                "background-color: rgba(153, 170, 181, 0.1)"
+            ),
+            css(
+                f"QPushButton#{self.transform_button.objectName()}:hover",
+                f"border-color: {COLOR_HOVER}",
+                f"color: {COLOR_HOVER}",
+                "background-color: rgba(64, 78, 237, 0.1)"
+            ),
+            css(
+                f"QPushButton#{self.transform_button.objectName()}::menu-indicator",
+                "width: 0px"
+            )))
+        menu.setStyleSheet(merge_css(
+            css(
+                "QMenu",
+                f"background-color: {BACKGROUND}",
+                f"border: 1px solid {COLOR}",
+                "font-size: 13px",
+                f"color: {COLOR}"
+            ),
+            css(
+                "QMenu::item:selected",
+                f"background-color: {BACKGROUND_DARK}",
+                f"color: {COLOR_HOVER}"
+            )))
 
     def new_canvas(self) -> None:
         """
@@ -88,25 +153,44 @@ class SettingsWidget(QWidget):
         """
         Function used to launch a file dialog to choose the path where the image will be saved.
         It will check if the file name si correct.
+        The image can also be saved as an SVG, made of a rectangle for every block of a single color,
+        and the frames as an animated GIF or PNG.
 
         :return: None
         """
 
         # Open the file dialog window to choose the path
-        path, _ = QFileDialog.getSaveFileName(self, "Save Image", "image", "Images (*.png)")
+        path, file_type = QFileDialog.getSaveFileName(self, "Save Image", "image",
+                                                      "Images (*.png);;Vector images (*.svg);;"
+                                                      "Animated GIF (*.gif);;Animated PNG (*.apng)")
 
         # If the path is null (most likely because the dialog window was closed) just return
         if path == "":
             return
 
-        # Add the .png extensions if is not
-        if not path.__contains__(".png"):
-            path = path + ".png"
+        # Add the extension of the chosen type if is not
+        extension = next((extension for extension in (".svg", ".gif", ".apng") if extension[1:] in file_type), ".png")
+        if not path.__contains__(extension):
+            path = path + extension
 
         # Check if the file name is correct (it doesn't contains slash or something similar)
-        if re.match(r"([a-zA-Z0-9\s_\\.\-\(\):])+(.png)$", re.split(r"/|\\", path)[-1]):
+        if re.match(r"([a-zA-Z0-9\s_\\.\-\(\):])+(.svg)$", re.split(r"/|\\", path)[-1]):
+            # A vector image has no scales, it is sharp at every size
+            self.canvas_widget.save_svg(path)
+
+        elif re.match(r"([a-zA-Z0-9\s_\\.\-\(\):])+(.gif|.apng)$", re.split(r"/|\\", path)[-1]):
+            # Every frame is saved with only what changed since the previous one
+            self.canvas_widget.save_animation(path)
+
+        elif re.match(r"([a-zA-Z0-9\s_\\.\-\(\):])+(.png)$", re.split(r"/|\\", path)[-1]):
+            # Choose the scales of the copies
+            export_dialog = ExportDialog()
+            if not export_dialog.exec_():
+                return
+
             # Call the function from canvas widget to save the canvas to the specified path
-            self.canvas_widget.save_canvas(path)
+            self.canvas_widget.save_canvas(path, export_dialog.scales, export_dialog.scaler.currentData(),
+                                           export_dialog.encoding)
 
     def clear_canvas(self) -> None:
         """
@@ -124,48 +208,62 @@ class SettingsWidget(QWidget):
         Function used to launch a file dialog to choose an image to be opened.
         Then create the canvas, alpha channel and the grid with the new dimensions.
         Canvas's pixmap it will be image's one.
+        An animated GIF, or a sprite strip split in frames, is opened with a frame for every frame of the image,
+        only the first one is decoded and the others when they are first shown.
+        An upscaled pixel art can be shrunk back to one pixel for every cell of its grid.
         If the image doesn't match the limits resize it.
 
         :return: None
         """
 
         # Open the file dialog window to choose the image
-        path, _ = QFileDialog.getOpenFileName(self, "Open Image", "", "Images (*.png *.jpg *.jpeg)")
+        path, _ = QFileDialog.getOpenFileName(self, "Open Image", "", "Images (*.png *.jpg *.jpeg *.gif)")
 
         # If the path is null (most likely because the dialog window was closed) just return
         if path == "":
             return
 
-        # Open the image in a pixmap
-        pixmap = QPixmap(path)
+        # Open the image, the frames of a GIF are decoded only when they are asked for
+        frames = FrameReader(path)
+        if not frames.valid:
+            return
+
+        # Find the grid of an upscaled pixel art before anything smears its pixels, every frame of a GIF has to sit on it
+        scale, offset_x, offset_y, sure = detect_grid(frames.decode(index) for index in range(frames.count))
 
-        # Get the dimensions
-        width = pixmap.size().width()
-        height = pixmap.size().height()
-
-        # Check if the image matches the limits
-        if not 50 <= width <= 500 and not 50 <= height <= 250:
-            # If is smaller, resize it to the closest inferior limit
-            if width < 50 or height < 50:
-                pixmap = pixmap.scaled(50, 50, Qt.KeepAspectRatio)
-            # If is bigger, resize it to the closest superior limit
-            if width > 500 or height > 250:
-                pixmap = pixmap.scaled(500, 250, Qt.KeepAspectRatio)
-
-        # Update dimensions
-        width = pixmap.size().width()
-        height = pixmap.size().height()
+        # Choose if the colors of the image are reduced, a photo has too many colors for a pixel art
+        import_dialog = ImportDialog(self.canvas_widget, scale, frames, sure)
+        if not import_dialog.exec_():
+            return
+
+        # Keep a pixel of every cell of the grid, the cells of every frame have a single color so nothing is lost
+        if import_dialog.reduce_grid:
+            frames.reduce((scale, offset_x, offset_y))
+
+        # Split a sprite strip in its frames
+        if import_dialog.strip is not None:
+            frames.split(import_dialog.strip, import_dialog.frame_count)
+
+        # Get the dimensions, an image bigger than the limits is resized to the closest superior limit
+        width = frames.size.width()
+        height = frames.size.height()
 
         # Resize the scene
         self.canvas_widget.scene.setSceneRect(0, 0, width, height)
 
-        # Call the function from canvas widget to create again the canvas with the new dimensions and a new image
-        self.canvas_widget.new_canvas(width, height, pixmap)
+        # Call the function from canvas widget to create again the canvas with the new dimensions and the frames
+        self.canvas_widget.new_canvas(width, height, [(partial(frames.frame, index), duration)
+                                                      for index, duration in enumerate(frames.durations)],
+                                      quantization=import_dialog.quantization)
+
+        # The thumbnails of the frames are made in the background
+        timeline_widget = self.canvas_widget.canvas.timeline_widget
+        if timeline_widget is not None and frames.count > 1:
+            timeline_widget.load_thumbnails(frames)
 
     def undo_canvas(self) -> None:
         """
         Function used to undo a modification on the canvas.
-        It still doesn't work.
 
         :return: None
         """
@@ -175,7 +273,6 @@ class SettingsWidget(QWidget):
     def redo_canvas(self) -> None:
         """
         Function used to redo a modification on the canvas.
-        It still doesn't work.
 
         :return: None
         """
@@ -365,7 +462,7 @@ class NewCanvasDialog(QDialog):
         self.layout = QGridLayout()
 
         self.main_label = QLabel("Start a new drawing!")
-        self.condition_label = QLabel("width  50🗙500 \nheight 50🗙250")
+        self.condition_label = QLabel(f"width  {MIN_CANVAS_SIZE}🗙{MAX_CANVAS_SIZE} \nheight {MIN_CANVAS_SIZE}🗙{MAX_CANVAS_SIZE}")
 
         self.width_label = QLabel("width")
         self.height_label = QLabel("height")
@@ -375,6 +472,10 @@ class NewCanvasDialog(QDialog):
 
         self.x_label = QLabel("🗙")
 
+        self.indexed = QCheckBox("indexed colors (palette)")
+
+        self.keep = QComboBox()
+
         self.accept_button = QPushButton('Submit')
         self.cancel_button = QPushButton('Cancel')
 
@@ -395,7 +496,7 @@ class NewCanvasDialog(QDialog):
         # Setup the pop-up
         self.setObjectName("new_canvas_dialog")
         self.setLayout(self.layout)
-        self.setFixedSize(320, 280)
+        self.setFixedSize(320, 350)
         self.setWindowFlag(Qt.FramelessWindowHint)
         self.installEventFilter(self)
         self.setStyleSheet(css(
@@ -422,8 +523,19 @@ class NewCanvasDialog(QDialog):
         self.layout.addWidget(self.x_label, 3, 1, Qt.AlignCenter)
         self.layout.addWidget(self.canvas_height, 3, 2, Qt.AlignCenter)
 
-        self.layout.addWidget(self.accept_button, 4, 0, Qt.AlignCenter)
-        self.layout.addWidget(self.cancel_button, 4, 2, Qt.AlignCenter)
+        self.layout.addWidget(self.indexed, 4, 0, 1, 3, Qt.AlignCenter)
+        self.layout.addWidget(self.keep, 5, 0, 1, 3)
+
+        self.layout.addWidget(self.accept_button, 6, 0, Qt.AlignCenter)
+        self.layout.addWidget(self.cancel_button, 6, 2, Qt.AlignCenter)
+
+        # Fill the choices, the drawing can be kept and cropped or padded around an anchor instead of cleared
+        self.keep.addItem("Start a new drawing", None)
+        for anchor, name in zip([(x, y) for y in range(3) for x in range(3)],
+                                ["top left", "top", "top right", "left", "center", "right",
+                                 "bottom left", "bottom", "bottom right"]):
+            self.keep.addItem(f"Keep drawing, {name}", anchor)
+        self.keep.currentIndexChanged.connect(lambda: self.indexed.setEnabled(self.keep.currentData() is None))
 
         # Set the check functions for the two inputs
         self.canvas_width.textEdited[str].connect(self.unlock_width)
@@ -446,6 +558,8 @@ class NewCanvasDialog(QDialog):
         self.x_label.setObjectName("new_canvas_x_label")
         self.canvas_width.setObjectName("new_canvas_width")
         self.canvas_height.setObjectName("new_canvas_height")
+        self.indexed.setObjectName("new_canvas_indexed")
+        self.keep.setObjectName("new_canvas_keep")
 
         # Set the style to the width/height labels
         css_temp = css(
@@ -504,6 +618,42 @@ class NewCanvasDialog(QDialog):
         self.accept_button.setStyleSheet(css_temp)
         self.cancel_button.setStyleSheet(css_temp)
 
+        # Set the style to the indexed check box
+        self.indexed.setToolTip("KEEP THE PIXELS AS INDICES INTO A PALETTE, EDITING A COLOR RECOLORS THE DRAWING")
+        self.indexed.setStyleSheet(css(
+            f"QCheckBox#{self.indexed.objectName()}",
+            "font-size: 15px",
+            f"color: {COLOR}"
+        ))
+
+        # Set the style to the keep choices
+        self.keep.setToolTip("CROP OR PAD THE DRAWING AROUND THE ANCHOR INSTEAD OF CLEARING IT")
+        self.keep.setStyleSheet(merge_css(
+            css(
+                f"QComboBox#{self.keep.objectName()}",
+                "border-style: solid",
+                "border-width: 1px",
+                f"border-color: {COLOR}",
+                "border-radius: 0px",
+                "height: 25px",
+                "font-size: 13px",
+                f"color: {COLOR}",
+                "background-color: rgba(153, 170, 181, 0.1)"
+            ),
+            css(
+                f"QComboBox#{self.keep.objectName()}:hover, QComboBox#{self.keep.objectName()}:on",
+                f"border-color: {COLOR_HOVER}",
+                "background-color: rgba(64, 78, 237, 0.1)"
+            ),
+            css(
+                f"QComboBox#{self.keep.objectName()} QListView",
+                "outline: none",
+                f"background-color: {BACKGROUND}",
+                f"color: {COLOR}",
+                f"selection-background-color: {BACKGROUND_DARK}",
+                f"selection-color: {COLOR_HOVER}",
+            )))
+
         # Set the style to the X label
         self.x_label.setStyleSheet(css(
             f"QLabel#{self.x_label.objectName()}",
@@ -549,7 +699,8 @@ class NewCanvasDialog(QDialog):
         # Check if the inputs are two numbers
         if text.isdecimal() and self.canvas_height.text().isdecimal():
             # Check if the input matches the limits
-            if 50 <= int(text) <= 500 and 50 <= int(self.canvas_height.text()) <= 500:
+            if MIN_CANVAS_SIZE <= int(text) <= MAX_CANVAS_SIZE and \
+                    MIN_CANVAS_SIZE <= int(self.canvas_height.text()) <= MAX_CANVAS_SIZE:
                 # The canvas can't be wider than a ratio of 2:1
                 if int(text) >= int(self.canvas_height.text()) / 2:
                     self.accept_button.setEnabled(True)
@@ -568,7 +719,8 @@ class NewCanvasDialog(QDialog):
         # Check if the inputs are two numbers
         if text.isdecimal() and self.canvas_width.text().isdecimal():
             # Check if the input matches the limits
-            if 50 <= int(text) <= 500 and 50 <= int(self.canvas_width.text()) <= 500:
+            if MIN_CANVAS_SIZE <= int(text) <= MAX_CANVAS_SIZE and \
+                    MIN_CANVAS_SIZE <= int(self.canvas_width.text()) <= MAX_CANVAS_SIZE:
                 # The canvas can't be wider than a ratio of 2:1
                 if int(text) >= int(self.canvas_width.text()) / 2:
                     self.accept_button.setEnabled(True)
@@ -579,6 +731,7 @@ class NewCanvasDialog(QDialog):
         """
         Function used to call all functions from canvas widget in order to resize and clear the canvas.
         It will also generate another grid and alpha channel with the new dimensions.
+        If the drawing is kept it is cropped or padded around the anchor instead.
         Close the dialog window.
 
         :return: None
@@ -591,15 +744,20 @@ class NewCanvasDialog(QDialog):
         width = int(self.canvas_width.text())
         height = int(self.canvas_height.text())
 
+        # Keep the drawing, cropped or padded around the anchor
+        if self.keep.currentData() is not None:
+            self.canvas_widget.resize_canvas(width, height, self.keep.currentData())
+            return
+
         # If the dimensions are the same just clear the canvas to save some time
-        if self.canvas_widget.canvas.canvas_width == width and self.canvas_width.canvas.canvas_height == height:
+        if self.canvas_widget.canvas.canvas_width == width and self.canvas_widget.canvas.canvas_height == height:
             self.canvas_widget.clear_canvas()
 
         # Resize the scene
         self.canvas_widget.scene.setSceneRect(0, 0, width, height)
 
         # Call the function from canvas widget to create again the canvas with the new dimensions
-        self.canvas_widget.new_canvas(width, height)
+        self.canvas_widget.new_canvas(width, height, indexed=self.indexed.isChecked())
 
     def eventFilter(self, obj: QObject, event: QEvent) -> bool:
         """
@@ -786,3 +944,599 @@ class ClearCanvasDialog(QDialog):
             return True
 
         return False
+
+
+class ImportDialog(QDialog):
+    """
+    This class will open a window dialog used to choose how the colors of an opened image are reduced.
+    Choose the colors, the method and the dithering and press import.
+    An upscaled pixel art can also be shrunk back to its real pixels and a sprite strip split in its frames.
+    """
+
+    def __init__(self, canvas: CanvasWidget, scale: int = 1, frames: FrameReader = None, sure: bool = True):
+        """
+        Class constructor.
+
+        :param canvas: the canvas widget to bind it to the window dialog
+        :param scale: the scale of the grid found in the image, 1 if there is none
+        :param frames: the frames of the image
+        :param sure: the grid is backed by enough runs of pixels to shrink the image by default
+        """
+
+        super(ImportDialog, self).__init__()
+
+        self.layout = QGridLayout()
+
+        self.main_label = QLabel("Import the image")
+
+        self.grid = QComboBox()
+        self.strips = QComboBox()
+        self.count = QSpinBox()
+        self.colors = QComboBox()
+        self.quantizer = QComboBox()
+        self.dithering = QComboBox()
+
+        self.accept_button = QPushButton("Import")
+        self.cancel_button = QPushButton("Cancel")
+
+        self.canvas_widget = canvas
+
+        self.scale = scale
+        self.frames = frames
+        self.sure = sure
+
+        # The arguments used to reduce the colors, None to keep them
+        self.quantization = None
+
+        # Shrink the image to one pixel for every cell of its grid
+        self.reduce_grid = False
+
+        # The direction of the sprite strip and its number of frames, None to keep a single frame
+        self.strip = None
+        self.frame_count = 1
+
+        self.setup()
+
+    def setup(self) -> None:
+        """
+        Function used to initialize the entire widget, set variables or add another widgets to it.
+
+        :return: None
+        """
+
+        # Setup the pop-up
+        self.setObjectName("import_dialog")
+        self.setLayout(self.layout)
+        self.setFixedSize(360, 420)
+        self.setWindowFlag(Qt.FramelessWindowHint)
+        self.installEventFilter(self)
+        self.setStyleSheet(css(
+            f"QDialog#{self.objectName()}",
+            f"background-color: {BACKGROUND_DARK}",
+            "border-style: solid",
+            "border-width: 2px",
+            f"border-color: {COLOR}",
+            "border-radius: 3px"
+        ))
+
+        # Setup the layout
+        self.layout.setContentsMargins(50, 40, 50, 40)
+        self.layout.setSpacing(10)
+
+        # Add the necessary widgets to the layout
+        self.layout.addWidget(self.main_label, 0, 0, 1, 2, Qt.AlignCenter)
+        self.layout.addWidget(self.grid, 1, 0, 1, 2)
+        self.layout.addWidget(self.strips, 2, 0, 1, 2)
+        self.layout.addWidget(self.count, 3, 0, 1, 2)
+        self.layout.addWidget(self.colors, 4, 0, 1, 2)
+        self.layout.addWidget(self.quantizer, 5, 0, 1, 2)
+        self.layout.addWidget(self.dithering, 6, 0, 1, 2)
+        self.layout.addWidget(self.accept_button, 7, 0, Qt.AlignCenter)
+        self.layout.addWidget(self.cancel_button, 7, 1, Qt.AlignCenter)
+
+        # Offer to shrink the image only if its pixels are bigger than one pixel, a guessed grid keeps the size first
+        if self.scale > 1:
+            self.grid.addItem(f"Shrink the {self.scale}x pixels to 1x", True)
+            self.grid.addItem("Keep the size of the image", False)
+            self.grid.setCurrentIndex(0 if self.sure else 1)
+        else:
+            self.grid.addItem("No bigger pixels found", False)
+            self.grid.setEnabled(False)
+
+        # Offer to split a still image in the frames of a sprite strip, an animation has its own frames
+        if self.frames is not None and self.frames.count > 1:
+            self.strips.addItem(f"Animation of {self.frames.count} frames", None)
+            self.strips.setEnabled(False)
+        else:
+            self.strips.addItem("A single frame", None)
+            if self.frames is not None:
+                self.strips.addItem("Frames from left to right", Strips.HORIZONTAL)
+                self.strips.addItem("Frames from top to bottom", Strips.VERTICAL)
+
+        self.count.setSuffix(" frames")
+        self.count.setMinimum(1)
+
+        # Fill the choices, the number of colors leaves room for the transparent entry of a palette
+        self.colors.addItem("Keep the colors", None)
+        for count in (2, 4, 8, 16, 32, 64, 128, 255):
+            self.colors.addItem(f"Reduce to {count} colors", count)
+        self.colors.addItem("Use the palette colors", 0)
+
+        self.quantizer.addItem("Median cut", Quantizers.MEDIAN_CUT)
+        self.quantizer.addItem("K-means", Quantizers.K_MEANS)
+        self.quantizer.setCurrentIndex(1)
+
+        self.dithering.addItem("No dithering", Dithering.NONE)
+        self.dithering.addItem("Ordered dithering", Dithering.ORDERED)
+        self.dithering.addItem("Floyd-Steinberg dithering", Dithering.FLOYD_STEINBERG)
+
+        # Set the response functions to the controls
+        self.strips.currentIndexChanged.connect(self.guess_count)
+        self.colors.currentIndexChanged.connect(self.update_choices)
+        self.accept_button.clicked.connect(self.close_dialog)
+        self.cancel_button.clicked.connect(self.reject)
+
+        self.update_choices()
+
+        # Set the name of the objects
+        self.main_label.setObjectName("import_main_label")
+        self.grid.setObjectName("import_grid")
+        self.strips.setObjectName("import_strips")
+        self.count.setObjectName("import_count")
+        self.colors.setObjectName("import_colors")
+        self.quantizer.setObjectName("import_quantizer")
+        self.dithering.setObjectName("import_dithering")
+        self.accept_button.setObjectName("import_accept")
+        self.cancel_button.setObjectName("import_cancel")
+
+        # Set he style to the main label
+        self.main_label.setStyleSheet(css(
+            f"QLabel#{self.main_label.objectName()}",
+            "font-size: 20px",
+            "font-weight: bold",
+            f"color: {COLOR}"
+        ))
+
+        # Set the style to the choices
+        for combobox in (self.grid, self.strips, self.colors, self.quantizer, self.dithering):
+            combobox.setStyleSheet(merge_css(
+                css(
+                    f"QComboBox#{combobox.objectName()}",
+                    "border-style: solid",
+                    "border-width: 1px",
+                    f"border-color: {COLOR}",
+                    "border-radius: 0px",
+                    "height: 25px",
+                    "font-size: 13px",
+                    f"color: {COLOR}",
+                    "background-color: rgba(153, 170, 181, 0.1)"
+                ),
+                css(
+                    f"QComboBox#{combobox.objectName()}:hover, QComboBox#{combobox.objectName()}:on",
+                    f"border-color: {COLOR_HOVER}",
+                    "background-color: rgba(64, 78, 237, 0.1)"
+                ),
+                css(
+                    f"QComboBox#{combobox.objectName()}:disabled",
+                    "color: rgba(153, 170, 181, 0.3)",
+                    "border-color: rgba(153, 170, 181, 0.3)"
+                ),
+                css(
+                    f"QComboBox#{combobox.objectName()} QListView",
+                    "outline: none",
+                    f"background-color: {BACKGROUND}",
+                    f"color: {COLOR}",
+                    f"selection-background-color: {BACKGROUND_DARK}",
+                    f"selection-color: {COLOR_HOVER}",
+                )))
+
+        # Set the style to the number of frames
+        self.count.setStyleSheet(merge_css(
+            css(
+                f"QSpinBox#{self.count.objectName()}",
+                "border-style: solid",
+                "border-width: 1px",
+                f"border-color: {COLOR}",
+                "border-radius: 0px",
+                "height: 25px",
+                "font-size: 13px",
+                f"color: {COLOR}",
+                "background-color: rgba(153, 170, 181, 0.1)"
+            ),
+            css(
+                f"QSpinBox#{self.count.objectName()}:hover",
+                f"border-color: {COLOR_HOVER}",
+                "background-color: rgba(64, 78, 237, 0.1)"
+            ),
+            css(
+                f"QSpinBox#{self.count.objectName()}:disabled",
+                "color: rgba(153, 170, 181, 0.3)",
+                "border-color: rgba(153, 170, 181, 0.3)"
+            )))
+
+        # Set the style and geometry to the buttons
+        self.accept_button.setFixedSize(QSize(90, 35))
+        self.cancel_button.setFixedSize(QSize(90, 35))
+        css_temp = merge_css(
+            css(
+                f"QPushButton#{self.accept_button.objectName()}, QPushButton#{self.cancel_button.objectName()}",
+                "background-color: rgba(153, 170, 181, 0.1)",
+                "border-style: solid",
+                "border-width: 2px",
+                "border-radius: 3px",
+                f"border-color: {COLOR}",
+                "font-size: 20px",
+                f"color: {COLOR}"
+            ),
+            css(
+                f"QPushButton#{self.accept_button.objectName()}:hover, QPushButton#{self.cancel_button.objectName()}:hover",
+                "background-color: rgba(64, 78, 237, 0.1)",
+                f"border-color: {COLOR_HOVER}",
+                f"color: {COLOR_HOVER}"
+            )
+        )
+        self.accept_button.setStyleSheet(css_temp)
+        self.cancel_button.setStyleSheet(css_temp)
+
+    def guess_count(self) -> None:
+        """
+        Function used to guess the number of frames of a sprite strip, as if its frames were square.
+
+        :return: None
+        """
+
+        strip = self.strips.currentData()
+
+        if strip is not None:
+            width, height = self.frames.raw_size
+            length, side = (width, height) if strip == Strips.HORIZONTAL else (height, width)
+
+            self.count.setMaximum(length)
+            self.count.setValue(max(1, length // max(1, side)))
+
+        self.update_choices()
+
+    def update_choices(self) -> None:
+        """
+        Function used to enable only the choices that are used, the method is used only to find new colors.
+
+        :return: None
+        """
+
+        count = self.colors.currentData()
+
+        self.quantizer.setEnabled(bool(count))
+        self.dithering.setEnabled(count is not None)
+        self.count.setEnabled(self.strips.currentData() is not None)
+
+    def close_dialog(self) -> None:
+        """
+        Function used to keep the chosen arguments and close the dialog window.
+
+        :return: None
+        """
+
+        count = self.colors.currentData()
+
+        self.reduce_grid = self.grid.currentData()
+
+        self.strip = self.strips.currentData()
+        self.frame_count = self.count.value()
+
+        if count is not None:
+            self.quantization = {
+                "count": count or 16,
+                "palette": None if count else self.canvas_widget.canvas.palette_colors(),
+                "quantizer": self.quantizer.currentData(),
+                "dithering": self.dithering.currentData()
+            }
+
+        self.accept()
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:
+        """
+        Function used to change the css when is hovered.
+
+        :param obj: the object
+        :param event: the event
+        :return: True or False if the events we wanted have occurred
+        """
+
+        # Check if the cursor is above the widget
+        if event.type() == QEvent.Enter:
+            self.setStyleSheet(css(
+                f"QDialog#{self.objectName()}",
+                f"background-color: {BACKGROUND_DARK}",
+                "border-style: solid",
+                "border-width: 2px",
+                f"border-color: {COLOR_HOVER}",
+                "border-radius: 3px"
+            ))
+            return True
+
+        # Check if cursor left the widget
+        elif event.type() == QEvent.Leave:
+            self.setStyleSheet(css(
+                f"QDialog#{self.objectName()}",
+                f"background-color: {BACKGROUND_DARK}",
+                "border-style: solid",
+                "border-width: 2px",
+                f"border-color: {COLOR}",
+                "border-radius: 3px"
+            ))
+            return True
+
+        return False
+
+
+class ExportDialog(QDialog):
+    """
+    This class will open a window dialog used to choose the integer scales of the saved copies of the canvas
+    and how they are compressed.
+    Check the scales and press save.
+    """
+
+    def __init__(self):
+        """
+        Class constructor.
+        """
+
+        super(ExportDialog, self).__init__()
+
+        self.layout = QGridLayout()
+
+        self.main_label = QLabel("Save the image")
+
+        self.scale_boxes = [QCheckBox(f"{scale}x") for scale in EXPORT_SCALES]
+
+        self.scaler = QComboBox()
+        self.compression = QComboBox()
+        self.png_filter = QComboBox()
+
+        self.indexed = QCheckBox("Palette if 256 colors or less")
+
+        self.accept_button = QPushButton("Save")
+        self.cancel_button = QPushButton("Cancel")
+
+        # The chosen scales
+        self.scales = ()
+
+        # The arguments used to encode the files
+        self.encoding = {}
+
+        self.setup()
+
+    def setup(self) -> None:
+        """
+        Function used to initialize the entire widget, set variables or add another widgets to it.
+
+        :return: None
+        """
+
+        # Setup the pop-up
+        self.setObjectName("export_dialog")
+        self.setLayout(self.layout)
+        self.setFixedSize(360, 370)
+        self.setWindowFlag(Qt.FramelessWindowHint)
+        self.installEventFilter(self)
+        self.setStyleSheet(css(
+            f"QDialog#{self.objectName()}",
+            f"background-color: {BACKGROUND_DARK}",
+            "border-style: solid",
+            "border-width: 2px",
+            f"border-color: {COLOR}",
+            "border-radius: 3px"
+        ))
+
+        # Setup the layout
+        self.layout.setContentsMargins(50, 40, 50, 40)
+        self.layout.setSpacing(10)
+
+        # Add the necessary widgets to the layout
+        self.layout.addWidget(self.main_label, 0, 0, 1, 4, Qt.AlignCenter)
+        for column, box in enumerate(self.scale_boxes):
+            self.layout.addWidget(box, 1, column, Qt.AlignCenter)
+        self.layout.addWidget(self.scaler, 2, 0, 1, 4)
+        self.layout.addWidget(self.compression, 3, 0, 1, 4)
+        self.layout.addWidget(self.png_filter, 4, 0, 1, 4)
+        self.layout.addWidget(self.indexed, 5, 0, 1, 4, Qt.AlignCenter)
+        self.layout.addWidget(self.accept_button, 6, 0, 1, 2, Qt.AlignCenter)
+        self.layout.addWidget(self.cancel_button, 6, 2, 1, 2, Qt.AlignCenter)
+
+        # The image is saved as it is by default
+        self.scale_boxes[0].setChecked(True)
+
+        # Fill the filters, the pixel art ones keep the edges smooth instead of blocky
+        self.scaler.addItem("Nearest neighbour", Scalers.NEAREST)
+        self.scaler.addItem("Scale2x / Scale3x", Scalers.SCALE_NX)
+        self.scaler.addItem("xBR (smooth edges)", Scalers.XBR)
+
+        # Fill the compressions, the smallest one writes the file with every filter and keeps the smallest
+        self.compression.addItem("Fast compression", 1)
+        self.compression.addItem("Default compression", COMPRESSION_LEVEL)
+        self.compression.addItem("Best compression", 9)
+        self.compression.addItem("Smallest file (tries every filter)", None)
+        self.compression.setCurrentIndex(1)
+
+        self.png_filter.addItem("No filter", PngFilters.NONE)
+        self.png_filter.addItem("Sub filter", PngFilters.SUB)
+        self.png_filter.addItem("Up filter", PngFilters.UP)
+        self.png_filter.addItem("Average filter", PngFilters.AVERAGE)
+        self.png_filter.addItem("Paeth filter", PngFilters.PAETH)
+        self.png_filter.addItem("Adaptive filter", PngFilters.ADAPTIVE)
+        self.png_filter.setCurrentIndex(2)
+
+        # Pixel art rarely has more than 256 colors, its files are a lot smaller with a palette
+        self.indexed.setChecked(True)
+
+        # Set the response functions to the controls
+        for box in self.scale_boxes:
+            box.toggled.connect(self.update_choices)
+        self.compression.currentIndexChanged.connect(self.update_choices)
+        self.accept_button.clicked.connect(self.close_dialog)
+        self.cancel_button.clicked.connect(self.reject)
+
+        # Set the name of the objects
+        self.main_label.setObjectName("export_main_label")
+        self.scaler.setObjectName("export_scaler")
+        self.compression.setObjectName("export_compression")
+        self.png_filter.setObjectName("export_filter")
+        self.indexed.setObjectName("export_indexed")
+        self.accept_button.setObjectName("export_accept")
+        self.cancel_button.setObjectName("export_cancel")
+
+        # Set he style to the main label
+        self.main_label.setStyleSheet(css(
+            f"QLabel#{self.main_label.objectName()}",
+            "font-size: 20px",
+            "font-weight: bold",
+            f"color: {COLOR}"
+        ))
+
+        # Set the style to the scales
+        for scale, box in zip(EXPORT_SCALES, self.scale_boxes):
+            box.setObjectName(f"export_scale_{scale}")
+            box.setToolTip("EVERY PIXEL BECOMES A SQUARE OF THIS SIZE, THE NAME GETS @2X, @4X...")
+            box.setStyleSheet(css(
+                f"QCheckBox#{box.objectName()}",
+                "font-size: 15px",
+                f"color: {COLOR}"
+            ))
+
+        # Set the style to the palette choice
+        self.indexed.setToolTip("THE COPIES MADE WITH XBR HAVE NEW COLORS AND ARE ALWAYS SAVED AS RGBA")
+        self.indexed.setStyleSheet(css(
+            f"QCheckBox#{self.indexed.objectName()}",
+            "font-size: 13px",
+            f"color: {COLOR}"
+        ))
+
+        # Set the style to the choices
+        self.scaler.setToolTip("THE FILTER USED FOR THE COPIES BIGGER THAN 1X")
+        self.png_filter.setToolTip("THE PNG FILTER APPLIED TO THE ROWS BEFORE THEY ARE COMPRESSED")
+        for combobox in (self.scaler, self.compression, self.png_filter):
+            combobox.setStyleSheet(merge_css(
+                css(
+                    f"QComboBox#{combobox.objectName()}",
+                    "border-style: solid",
+                    "border-width: 1px",
+                    f"border-color: {COLOR}",
+                    "border-radius: 0px",
+                    "height: 25px",
+                    "font-size: 13px",
+                    f"color: {COLOR}",
+                    "background-color: rgba(153, 170, 181, 0.1)"
+                ),
+                css(
+                    f"QComboBox#{combobox.objectName()}:hover, QComboBox#{combobox.objectName()}:on",
+                    f"border-color: {COLOR_HOVER}",
+                    "background-color: rgba(64, 78, 237, 0.1)"
+                ),
+                css(
+                    f"QComboBox#{combobox.objectName()}:disabled",
+                    "color: rgba(153, 170, 181, 0.3)",
+                    "border-color: rgba(153, 170, 181, 0.3)"
+                ),
+                css(
+                    f"QComboBox#{combobox.objectName()} QListView",
+                    "outline: none",
+                    f"background-color: {BACKGROUND}",
+                    f"color: {COLOR}",
+                    f"selection-background-color: {BACKGROUND_DARK}",
+                    f"selection-color: {COLOR_HOVER}",
+                )))
+
+        # Set the style and geometry to the buttons
+        self.accept_button.setFixedSize(QSize(90, 35))
+        self.cancel_button.setFixedSize(QSize(90, 35))
+        css_temp = merge_css(
+            css(
+                f"QPushButton#{self.accept_button.objectName()}, QPushButton#{self.cancel_button.objectName()}",
+                "background-color: rgba(153, 170, 181, 0.1)",
+                "border-style: solid",
+                "border-width: 2px",
+                "border-radius: 3px",
+                f"border-color: {COLOR}",
+                "font-size: 20px",
+                f"color: {COLOR}"
+            ),
+            css(
+                f"QPushButton#{self.accept_button.objectName()}:hover, QPushButton#{self.cancel_button.objectName()}:hover",
+                "background-color: rgba(64, 78, 237, 0.1)",
+                f"border-color: {COLOR_HOVER}",
+                f"color: {COLOR_HOVER}"
+            ),
+            css(
+                f"QPushButton#{self.accept_button.objectName()}:disabled",
+                "background-color: rgba(139, 0, 0, 0.1)",
+                f"border-color: rgb(139, 0, 0)",
+                f"color: rgb(139, 0, 0)"
+            )
+        )
+        self.accept_button.setStyleSheet(css_temp)
+        self.cancel_button.setStyleSheet(css_temp)
+
+    def update_choices(self) -> None:
+        """
+        Function used to allow saving only if a scale is checked, the smallest file tries every filter.
+
+        :return: None
+        """
+
+        self.accept_button.setEnabled(any(box.isChecked() for box in self.scale_boxes))
+        self.png_filter.setEnabled(self.compression.currentData() is not None)
+
+    def close_dialog(self) -> None:
+        """
+        Function used to keep the chosen scales and encoding and close the dialog window.
+
+        :return: None
+        """
+
+        self.scales = tuple(scale for scale, box in zip(EXPORT_SCALES, self.scale_boxes) if box.isChecked())
+
+        level = self.compression.currentData()
+
+        self.encoding = {
+            "indexed": self.indexed.isChecked(),
+            "level": COMPRESSION_LEVEL if level is None else level,
+            "png_filter": self.png_filter.currentData(),
+            "optimize": level is None
+        }
+
+        self.accept()
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:
+        """
+        Function used to change the css when is hovered.
+
+        :param obj: the object
+        :param event: the event
+        :return: True or False if the events we wanted have occurred
+        """
+
+        # Check if the cursor is above the widget
+        if event.type() == QEvent.Enter:
+            self.setStyleSheet(css(
+                f"QDialog#{self.objectName()}",
+                f"background-color: {BACKGROUND_DARK}",
+                "border-style: solid",
+                "border-width: 2px",
+                f"border-color: {COLOR_HOVER}",
+                "border-radius: 3px"
+            ))
+            return True
+
+        # Check if cursor left the widget
+        elif event.type() == QEvent.Leave:
+            self.setStyleSheet(css(
+                f"QDialog#{self.objectName()}",
+                f"background-color: {BACKGROUND_DARK}",
+                "border-style: solid",
+                "border-width: 2px",
+                f"border-color: {COLOR}",
+                "border-radius: 3px"
+            ))
+            return True
+
+        return False
@@ -13,7 +13,13 @@ TOOLS = {
     Tools.CIRCLE: "circle",
     Tools.BRUSH: "text",
     Tools.FILL: "fill",
-    Tools.PICKER: "picker"
+    Tools.PICKER: "picker",
+    Tools.FILLED_SQUARE: "filled square",
+    Tools.FILLED_CIRCLE: "filled circle",
+    Tools.SELECT: "select",
+    Tools.MAGIC_WAND: "magic wand",
+    Tools.MOVE: "move",
+    Tools.LASSO: "lasso"
 
 }
 
@@ -35,8 +41,8 @@ class StatusWidget(QWidget):
         self.canvas_width = 500
         self.canvas_height = 250
         self.tool = Tools.PEN
-        self.pos_x = "000"
-        self.pos_y = "000"
+        self.pos_x = "0000"
+        self.pos_y = "0000"
         self.zoom = "0.00"
         self.position_label = QLabel(f"ZOOM: {self.zoom} | POSITION: X: {self.pos_x} Y: {self.pos_y}")
         self.color_label = QLabel(f"000000")
@@ -127,8 +133,8 @@ class StatusWidget(QWidget):
 
         # Update the position
         if x is not None and y is not None:
-            self.pos_x = ("00" + str(x))[-3:]
-            self.pos_y = ("00" + str(y))[-3:]
+            self.pos_x = str(x).zfill(4)
+            self.pos_y = str(y).zfill(4)
 
         # Update the zoom
         if zoom is not None:
@@ -0,0 +1,505 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from queue import SimpleQueue
+from weakref import WeakKeyDictionary
+
+import numpy as np
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+from PyQt5.QtWidgets import *
+
+from Source.Tiles import TiledImage
+from Source.UI.CanvasWidget import Canvas, array_to_image
+from Source.UI.FrameReader import FrameReader
+from Source.Utils import *
+
+# The side of the thumbnails of the frames, in pixels
+THUMBNAIL_SIZE = 32
+
+# How often the thumbnails made in the background are shown, in milliseconds
+THUMBNAIL_POLL = 100
+
+
+def sample_pixels(pixels: np.ndarray, size: int) -> np.ndarray:
+    """
+    Function used to keep evenly spaced pixels of an image, enough for a thumbnail.
+
+    :param pixels: an array with the shape (height, width, 4)
+    :param size: the side of the thumbnail
+    :return: an array with the shape (rows, columns, 4)
+    """
+
+    step = max(1, -(-max(pixels.shape[:2]) // size))
+
+    return pixels[::step, ::step]
+
+
+def sample_tiles(image: TiledImage, size: int) -> np.ndarray:
+    """
+    Function used to keep evenly spaced pixels of a tiled image, enough for a thumbnail.
+    Only the allocated tiles are looked at and only the kept pixels are copied.
+
+    :param image: the RGBA tiled image
+    :param size: the side of the thumbnail
+    :return: an array with the shape (rows, columns, 4)
+    """
+
+    step = max(1, -(-max(image.width, image.height) // size))
+
+    pixels = np.zeros((-(-image.height // step), -(-image.width // step), 4), np.uint8)
+
+    for tx, ty in list(image.tiles):
+        x, y, width, height = image.tile_bounds(tx, ty)
+
+        # The first kept row and column inside the tile
+        top, left = -(-y // step) * step, -(-x // step) * step
+
+        sampled = image.tiles[(tx, ty)][top - y:height:step, left - x:width:step]
+        pixels[top // step:top // step + sampled.shape[0], left // step:left // step + sampled.shape[1]] = sampled
+
+    return pixels
+
+
+def thumbnail_image(pixels: np.ndarray) -> QImage:
+    """
+    Function used to make the thumbnail of a frame from its sampled pixels, without smearing them.
+
+    :param pixels: an array with the shape (rows, columns, 4)
+    :return: the image, made on any thread
+    """
+
+    return array_to_image(pixels).scaled(THUMBNAIL_SIZE, THUMBNAIL_SIZE, Qt.KeepAspectRatio, Qt.FastTransformation)
+
+
+class TimelineWidget(QWidget):
+    """
+    This class will hold the frames of the animation and the controls to add, delete, move and play them.
+    The first frame is the first in the list, from the left.
+    """
+
+    def __init__(self, canvas: Canvas):
+        """
+        Class constructor.
+
+        :param canvas: the canvas to bind it to the controls in order to change its frames
+        """
+
+        super(TimelineWidget, self).__init__()
+
+        self.layout = QHBoxLayout()
+
+        self.main_frame = QFrame()
+        self.main_frame_layout = QGridLayout()
+
+        self.title = QLabel("FRAMES")
+
+        self.frames_list = QListWidget()
+
+        self.copy_button = QPushButton("+")
+        self.empty_button = QPushButton("□")
+        self.remove_button = QPushButton("-")
+        self.left_button = QPushButton("◀")
+        self.right_button = QPushButton("▶")
+        self.play_button = QPushButton("►")
+
+        self.duration_label = QLabel("DURATION")
+        self.duration = QSpinBox()
+
+        self.onion_skin = QCheckBox("ONION SKIN")
+
+        # Shows the next frame when the current one was shown for its duration
+        self.timer = QTimer()
+
+        # The thumbnail of every frame and the version of its layers it was made from, None if it was decoded
+        self.icons = WeakKeyDictionary()
+
+        # The thumbnails of the frames of an opened image are made on another thread and shown from time to time
+        self.pool = ThreadPoolExecutor(max_workers=1)
+        self.thumbnails = SimpleQueue()
+        self.thumbnail_job = None
+        self.cancelled = threading.Event()
+        self.thumbnail_timer = QTimer()
+
+        self.canvas = canvas
+
+        self.setup()
+
+    def setup(self) -> None:
+        """
+        Function used to initialize the entire widget, set variables or add another widgets to it.
+
+        :return: None
+        """
+
+        # Setup the main widget
+        self.setObjectName("timeline_widget")
+        self.setFixedHeight(100)
+        self.installEventFilter(self)
+        self.setLayout(self.layout)
+        self.layout.addWidget(self.main_frame)
+
+        # Setup the main frame
+        self.main_frame.setObjectName("main_frame")
+        self.main_frame.setLayout(self.main_frame_layout)
+        self.main_frame.setStyleSheet(css(
+            f"QWidget#{self.main_frame.objectName()}",
+            "border-style: solid",
+            "border-width: 1px",
+            f"border-color: {COLOR}",
+            "border-radius: 3px",
+            f"background-color: {BACKGROUND_DARK}"
+        ))
+
+        # Add the widgets to main frame
+        self.main_frame_layout.addWidget(self.title, 0, 0)
+        self.main_frame_layout.addWidget(self.frames_list, 0, 1)
+        self.main_frame_layout.addWidget(self.copy_button, 0, 2)
+        self.main_frame_layout.addWidget(self.empty_button, 0, 3)
+        self.main_frame_layout.addWidget(self.remove_button, 0, 4)
+        self.main_frame_layout.addWidget(self.left_button, 0, 5)
+        self.main_frame_layout.addWidget(self.right_button, 0, 6)
+        self.main_frame_layout.addWidget(self.play_button, 0, 7)
+        self.main_frame_layout.addWidget(self.duration_label, 0, 8)
+        self.main_frame_layout.addWidget(self.duration, 0, 9)
+        self.main_frame_layout.addWidget(self.onion_skin, 0, 10)
+        self.main_frame_layout.setColumnStretch(1, 1)
+
+        # Set the name of the objects
+        self.title.setObjectName("frames_title")
+        self.frames_list.setObjectName("frames_list")
+        self.copy_button.setObjectName("frames_copy")
+        self.empty_button.setObjectName("frames_empty")
+        self.remove_button.setObjectName("frames_remove")
+        self.left_button.setObjectName("frames_left")
+        self.right_button.setObjectName("frames_right")
+        self.play_button.setObjectName("frames_play")
+        self.duration_label.setObjectName("frames_duration_label")
+        self.duration.setObjectName("frames_duration")
+        self.onion_skin.setObjectName("frames_onion_skin")
+
+        # Setup the controls
+        self.frames_list.setFlow(QListView.LeftToRight)
+        self.frames_list.setFixedHeight(52)
+        self.frames_list.setIconSize(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        self.frames_list.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.frames_list.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+
+        self.duration.setRange(10, 10000)
+        self.duration.setSingleStep(10)
+        self.duration.setSuffix(" ms")
+        self.duration.setFixedSize(QSize(90, 25))
+
+        self.timer.setSingleShot(True)
+
+        self.copy_button.setToolTip("ADD A COPY OF THE FRAME")
+        self.empty_button.setToolTip("ADD AN EMPTY FRAME")
+        self.remove_button.setToolTip("DELETE FRAME")
+        self.left_button.setToolTip("MOVE FRAME LEFT")
+        self.right_button.setToolTip("MOVE FRAME RIGHT")
+        self.play_button.setToolTip("PLAY")
+        self.onion_skin.setToolTip("SHOW THE PREVIOUS AND NEXT FRAMES UNDER THIS ONE")
+
+        # Set the response functions to the controls
+        self.frames_list.currentRowChanged.connect(self.change_frame)
+        self.copy_button.clicked.connect(lambda: self.canvas.add_frame(True))
+        self.empty_button.clicked.connect(lambda: self.canvas.add_frame(False))
+        self.remove_button.clicked.connect(lambda: self.canvas.remove_frame())
+        self.left_button.clicked.connect(lambda: self.canvas.move_frame(-1))
+        self.right_button.clicked.connect(lambda: self.canvas.move_frame(1))
+        self.play_button.clicked.connect(self.toggle_playing)
+        self.duration.valueChanged.connect(self.canvas.set_frame_duration)
+        self.onion_skin.toggled.connect(self.canvas.set_onion_skin)
+        self.timer.timeout.connect(self.next_frame)
+        self.thumbnail_timer.timeout.connect(self.show_thumbnails)
+
+        # Set the style to the labels and the check box
+        css_temp = css(
+            f"QLabel#{self.title.objectName()}, QLabel#{self.duration_label.objectName()}, "
+            f"QCheckBox#{self.onion_skin.objectName()}",
+            "font-size: 13px",
+            "font-weight: bold",
+            f"color: {COLOR}"
+        )
+        self.title.setStyleSheet(css_temp)
+        self.duration_label.setStyleSheet(css_temp)
+        self.onion_skin.setStyleSheet(css_temp)
+
+        # Set the style to the list
+        self.frames_list.setStyleSheet(merge_css(
+            css(
+                f"QListWidget#{self.frames_list.objectName()}",
+                "border-style: solid",
+                "border-width: 1px",
+                f"border-color: {COLOR}",
+                "border-radius: 3px",
+                "font-size: 13px",
+                f"color: {COLOR}",
+                "background-color: rgba(153, 170, 181, 0.1)"
+            ),
+            css(
+                f"QListWidget#{self.frames_list.objectName()}::item",
+                "padding: 4px 10px"
+            ),
+            css(
+                f"QListWidget#{self.frames_list.objectName()}::item:selected",
+                f"color: {COLOR_HOVER}",
+                "background-color: rgba(64, 78, 237, 0.1)"
+            )))
+
+        # Set the style to the duration
+        self.duration.setStyleSheet(merge_css(
+            css(
+                f"QSpinBox#{self.duration.objectName()}",
+                "border-style: solid",
+                "border-width: 1px",
+                f"border-color: {COLOR}",
+                "border-radius: 0px",
+                "font-size: 13px",
+                f"color: {COLOR}",
+                "background-color: rgba(153, 170, 181, 0.1)"
+            ),
+            css(
+                f"QSpinBox#{self.duration.objectName()}:hover",
+                f"border-color: {COLOR_HOVER}",
+                "background-color: rgba(64, 78, 237, 0.1)"
+            )))
+
+        # Set the style and geometry to the buttons
+        css_temp = merge_css(
+            css(
+                "QPushButton",
+                "background-color: rgba(153, 170, 181, 0.1)",
+                "border-style: solid",
+                "border-width: 1px",
+                "border-radius: 3px",
+                f"border-color: {COLOR}",
+                "font-size: 15px",
+                f"color: {COLOR}"
+            ),
+            css(
+                "QPushButton:hover",
+                "background-color: rgba(64, 78, 237, 0.1)",
+                f"border-color: {COLOR_HOVER}",
+                f"color: {COLOR_HOVER}"
+            )
+        )
+        for button in (self.copy_button, self.empty_button, self.remove_button, self.left_button,
+                       self.right_button, self.play_button):
+            button.setFixedSize(QSize(35, 25))
+            button.setCursor(QCursor(Qt.PointingHandCursor))
+            button.setStyleSheet(css_temp)
+
+        # Bind the panel to the canvas so it is updated when the frames change
+        self.canvas.timeline_widget = self
+
+        self.refresh_frames()
+
+    def refresh_frames(self) -> None:
+        """
+        Function used to show again the frames of the canvas and the duration of the current one.
+
+        :return: None
+        """
+
+        animation = self.canvas.animation
+
+        # Don't send the changes back to the canvas while the list is filled
+        self.frames_list.blockSignals(True)
+        self.frames_list.clear()
+
+        for index, frame in enumerate(animation.frames):
+            item = QListWidgetItem(str(index + 1))
+
+            icon = self.frame_icon(frame)
+            if icon is not None:
+                item.setIcon(icon)
+
+            self.frames_list.addItem(item)
+
+        self.frames_list.setCurrentRow(animation.current)
+        self.frames_list.blockSignals(False)
+
+        self.duration.blockSignals(True)
+        self.duration.setValue(animation.frames[animation.current].duration)
+        self.duration.blockSignals(False)
+
+        self.onion_skin.blockSignals(True)
+        self.onion_skin.setChecked(animation.onion_skin)
+        self.onion_skin.blockSignals(False)
+
+    def frame_icon(self, frame):
+        """
+        Function used to get the thumbnail of a frame, made again from its layers if they changed.
+        A frame that wasn't loaded yet keeps the thumbnail made in the background, if it is ready.
+
+        :param frame: the frame
+        :return: the icon or None if there is no thumbnail yet
+        """
+
+        if frame.loaded:
+            version = frame.layers.version
+            cached = self.icons.get(frame)
+
+            if cached is None or cached[0] != version:
+                image = thumbnail_image(sample_tiles(frame.layers.composite, THUMBNAIL_SIZE))
+                self.icons[frame] = version, QIcon(QPixmap.fromImage(image))
+
+        cached = self.icons.get(frame)
+
+        return None if cached is None else cached[1]
+
+    def load_thumbnails(self, frames: FrameReader) -> None:
+        """
+        Function used to make the thumbnails of the frames of an opened image on another thread, one frame at a time.
+        The frames are read by their own reader, the frames of the canvas are loaded only when they are shown.
+
+        :param frames: the reader of the frames, in the order of the frames of the canvas
+        :return: None
+        """
+
+        self.cancel_thumbnails()
+        self.cancelled = threading.Event()
+
+        self.thumbnail_job = self.pool.submit(self.make_thumbnails, frames.copy(), list(self.canvas.animation.frames),
+                                              self.cancelled, self.thumbnails)
+        self.thumbnail_timer.start(THUMBNAIL_POLL)
+
+    @staticmethod
+    def make_thumbnails(frames: FrameReader, targets: list, cancelled: threading.Event, results: SimpleQueue) -> None:
+        """
+        Function used to make the thumbnails of some frames, it runs on another thread.
+
+        :param frames: the reader of the frames, used only by this thread
+        :param targets: the frames of the canvas, in the same order
+        :param cancelled: tells to stop, another image was opened or the window is closing
+        :param results: where the (frame, image) thumbnails are put
+        :return: None
+        """
+
+        for index, frame in enumerate(targets):
+            if cancelled.is_set():
+                return
+
+            # A loaded frame gets its thumbnail from its layers
+            if not frame.loaded:
+                results.put((frame, thumbnail_image(sample_pixels(frames.frame(index), THUMBNAIL_SIZE))))
+
+    def show_thumbnails(self) -> None:
+        """
+        Function used to show the thumbnails made in the background since the last time.
+
+        :return: None
+        """
+
+        rows = {frame: row for row, frame in enumerate(self.canvas.animation.frames)}
+
+        while not self.thumbnails.empty():
+            frame, image = self.thumbnails.get()
+
+            if frame in rows and frame not in self.icons:
+                self.icons[frame] = None, QIcon(QPixmap.fromImage(image))
+                self.frames_list.item(rows[frame]).setIcon(self.icons[frame][1])
+
+        if self.thumbnail_job is None or self.thumbnail_job.done():
+            self.thumbnail_timer.stop()
+
+    def cancel_thumbnails(self) -> None:
+        """
+        Function used to stop making the thumbnails in the background.
+
+        :return: None
+        """
+
+        self.cancelled.set()
+
+    def change_frame(self, row: int) -> None:
+        """
+        Function used to change the frame that is shown and drawn on.
+
+        :param row: the row of the frame in the list
+        :return: None
+        """
+
+        if row >= 0:
+            self.canvas.set_frame(row)
+
+    def step_frame(self, offset: int) -> None:
+        """
+        Function used to show the previous or the next frame, wrapping around.
+
+        :param offset: -1 for the previous frame, +1 for the next one
+        :return: None
+        """
+
+        animation = self.canvas.animation
+
+        self.canvas.set_frame((animation.current + offset) % len(animation.frames))
+
+    def toggle_playing(self) -> None:
+        """
+        Function used to start or stop the animation, every frame is shown for its own duration.
+
+        :return: None
+        """
+
+        playing = not self.canvas.playing
+
+        self.canvas.set_playing(playing)
+        self.play_button.setText("❚❚" if playing else "►")
+        self.play_button.setToolTip("PAUSE" if playing else "PLAY")
+
+        if playing:
+            animation = self.canvas.animation
+            self.timer.start(animation.frames[animation.current].duration)
+        else:
+            self.timer.stop()
+
+    def next_frame(self) -> None:
+        """
+        Function used to show the next frame while the animation plays.
+
+        :return: None
+        """
+
+        if not self.canvas.playing:
+            return
+
+        self.step_frame(1)
+
+        animation = self.canvas.animation
+        self.timer.start(animation.frames[animation.current].duration)
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:
+        """
+        Function used to change the css when is hovered.
+
+        :param obj: the object
+        :param event: the event
+        :return: True or False if the events we wanted have occurred
+        """
+
+        # Check if the cursor is above the widget
+        if event.type() == QEvent.Enter:
+            self.main_frame.setStyleSheet(css(
+                f"QWidget#{self.main_frame.objectName()}",
+                "border-style: solid",
+                "border-width: 1px",
+                f"border-color: {COLOR_HOVER}",
+                "border-radius: 3px",
+                f"background-color: {BACKGROUND_DARK}"
+            ))
+            return True
+
+        # Check if cursor left the widget
+        elif event.type() == QEvent.Leave:
+            self.main_frame.setStyleSheet(css(
+                f"QWidget#{self.main_frame.objectName()}",
+                "border-style: solid",
+                "border-width: 1px",
+                f"border-color: {COLOR}",
+                "border-radius: 3px",
+                f"background-color: {BACKGROUND_DARK}"
+            ))
+            return True
+
+        return False
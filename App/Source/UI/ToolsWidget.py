@@ -28,6 +28,7 @@ class ToolsWidget(QWidget):
         self.main_frame_layout = QHBoxLayout()
 
         self.pen_size = QComboBox()
+        self.tolerance = QComboBox()
 
         self.canvas = canvas
 
@@ -50,7 +51,7 @@ class ToolsWidget(QWidget):
         # Setup the main frame
         self.main_frame.setObjectName("main_frame")
         self.main_frame.setLayout(self.main_frame_layout)
-        self.main_frame_layout.setSpacing(25)
+        self.main_frame_layout.setSpacing(15)
         self.main_frame_layout.setContentsMargins(25, 0, 25, 0)
         self.main_frame.setStyleSheet(css(
             f"QWidget#{self.main_frame.objectName()}",
@@ -94,12 +95,29 @@ class ToolsWidget(QWidget):
                 f"selection-color: {COLOR_HOVER}",
             )))
 
+        # Setup the tolerance combobox, it has the same style as the pen size
+        self.tolerance.setObjectName("tolerance_combobox")
+        self.tolerance.setToolTip("FILL TOLERANCE")
+        for i in (0, 8, 16, 32, 64, 128):
+            self.tolerance.addItem(str(i))
+        self.tolerance.currentTextChanged.connect(self.change_tolerance)
+        self.tolerance.setEditable(True)
+        self.tolerance.setStyleSheet(self.pen_size.styleSheet().replace(self.pen_size.objectName(),
+                                                                         self.tolerance.objectName()))
+
         # Add the buttons to main frame
         self.main_frame_layout.addWidget(self.pen_size)
+        self.main_frame_layout.addWidget(self.tolerance)
+        self.main_frame_layout.addWidget(ToolButton(self, Tools.MOVE))
+        self.main_frame_layout.addWidget(ToolButton(self, Tools.MAGIC_WAND))
+        self.main_frame_layout.addWidget(ToolButton(self, Tools.LASSO))
+        self.main_frame_layout.addWidget(ToolButton(self, Tools.SELECT))
         self.main_frame_layout.addWidget(ToolButton(self, Tools.PICKER))
         self.main_frame_layout.addWidget(ToolButton(self, Tools.FILL))
         self.main_frame_layout.addWidget(ToolButton(self, Tools.BRUSH))
+        self.main_frame_layout.addWidget(ToolButton(self, Tools.FILLED_CIRCLE))
         self.main_frame_layout.addWidget(ToolButton(self, Tools.CIRCLE))
+        self.main_frame_layout.addWidget(ToolButton(self, Tools.FILLED_SQUARE))
         self.main_frame_layout.addWidget(ToolButton(self, Tools.SQUARE))
         self.main_frame_layout.addWidget(ToolButton(self, Tools.LINE))
         self.main_frame_layout.addWidget(ToolButton(self, Tools.ERASER))
@@ -125,6 +143,23 @@ class ToolsWidget(QWidget):
 
         self.canvas.set_pen_size(value)
 
+    def change_tolerance(self, value: str) -> None:
+        """
+        Function used to change the tolerance of the fill.
+
+        :param value: the value from combobox
+        :return: None
+        """
+
+        if not value.isdigit():
+            return
+
+        if int(value) > 255:
+            self.tolerance.setCurrentIndex(0)
+            return
+
+        self.canvas.set_tolerance(value)
+
     def change_tool(self, tool: Tools) -> None:
         """
         Function used to change the tool used to draw on canvas.
@@ -238,6 +273,36 @@ class ToolButton(QPushButton):
             self.icon = "../Resources/tools/circle"
             self.setToolTip("CIRCLE")
 
+        elif self.tool == Tools.FILLED_SQUARE:
+            self.setObjectName("filled_square_button")
+            self.icon = "../Resources/tools/square_fill"
+            self.setToolTip("FILLED SQUARE")
+
+        elif self.tool == Tools.FILLED_CIRCLE:
+            self.setObjectName("filled_circle_button")
+            self.icon = "../Resources/tools/circle_fill"
+            self.setToolTip("FILLED CIRCLE")
+
+        elif self.tool == Tools.SELECT:
+            self.setObjectName("select_button")
+            self.icon = "../Resources/tools/select"
+            self.setToolTip("SELECT (SHIFT: ADD, CTRL: SUBTRACT, BOTH: INTERSECT)")
+
+        elif self.tool == Tools.MAGIC_WAND:
+            self.setObjectName("magic_wand_button")
+            self.icon = "../Resources/tools/magic_wand"
+            self.setToolTip("MAGIC WAND (SHIFT: ADD, CTRL: SUBTRACT, BOTH: INTERSECT)")
+
+        elif self.tool == Tools.MOVE:
+            self.setObjectName("move_button")
+            self.icon = "../Resources/tools/move"
+            self.setToolTip("MOVE SELECTION (CTRL+X: CUT, CTRL+C: COPY, CTRL+V: PASTE, ESC: DESELECT)")
+
+        elif self.tool == Tools.LASSO:
+            self.setObjectName("lasso_button")
+            self.icon = "../Resources/tools/lasso"
+            self.setToolTip("LASSO (SHIFT: ADD, CTRL: SUBTRACT, BOTH: INTERSECT)")
+
         elif self.tool == Tools.BRUSH:
             self.setObjectName("text_button")
             self.icon = "../Resources/tools/brush"
@@ -246,7 +311,7 @@ class ToolButton(QPushButton):
         elif self.tool == Tools.FILL:
             self.setObjectName("fill_button")
             self.icon = "../Resources/tools/fill"
-            self.setToolTip("FILL")
+            self.setToolTip("FILL (SHIFT: REPLACE EVERYWHERE)")
 
         elif self.tool == Tools.PICKER:
             self.setObjectName("picker_button")